@@ -1,18 +1,26 @@
 """
 Collection of data structure examples
 """
+from . import array_file
+from . import connected_components
+from . import disjoint_set
 from . import graph
 from . import heap
 from . import linked_list
+from . import process_pool
 from . import queue
 from . import stack
 from . import tree
 from . import trie
 
 __all__ = [
+    'array_file',
+    'connected_components',
+    'disjoint_set',
     'graph',
     'heap',
     'linked_list',
+    'process_pool',
     'queue',
     'stack',
     'tree',
@@ -0,0 +1,171 @@
+"""
+Array File
+
+Reads and writes the files that CSRGraph, LandmarkHeuristic and
+ContractionHierarchy save their flat arrays to, so that loading one
+memory-maps the arrays instead of rebuilding or copying them. A file
+is laid out as:
+
+- an 8 byte magic number naming what the file holds
+- the length of the header as a little-endian 64-bit integer
+- the header, as UTF-8 JSON
+- padding to a multiple of 8 bytes
+- each array, as little-endian 64-bit integers or doubles
+
+The header is JSON rather than pickle, so loading a file never runs
+code from it. Tuples (such as GridGraph cells) are written as
+{"tuple": [...]} so they come back as tuples.
+"""
+from array import array
+import inspect
+import json
+import mmap
+import struct
+import sys
+
+_PREFIX = struct.Struct('<8sQ')
+_TYPECODES = ('q', 'd')
+
+
+def _encode(value):
+    """
+    Converts value to something json can write, marking tuples so
+    they are read back as tuples. Meant for internal use.
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, tuple):
+        return {'tuple': [_encode(item) for item in value]}
+    if isinstance(value, list):
+        return [_encode(item) for item in value]
+    if isinstance(value, dict):
+        return dict((key, _encode(item)) for key, item in value.items())
+    raise TypeError('cannot save a {} to an array file'.format(type(value).__name__))
+
+
+def _decode(value):
+    """
+    The json object hook undoing _encode. Meant for internal use.
+    """
+    if len(value) == 1 and 'tuple' in value:
+        return tuple(value['tuple'])
+    return value
+
+
+def save(path, magic, header, arrays):
+    """
+    Writes a header and arrays to a file
+
+    :param path: the file name
+    :param magic: 8 bytes naming what the file holds
+    :param header: dict of values to keep with the arrays; may contain None, bools,
+                   numbers, strings, and lists, tuples and dicts (with string keys) of them
+    :param arrays: list of arrays (or memoryviews) with typecode 'q' or 'd'
+    """
+    typecodes = []
+    for values in arrays:
+        typecode = values.typecode if isinstance(values, array) else values.format
+        if typecode not in _TYPECODES:
+            raise ValueError('arrays must hold 64-bit integers or doubles, not {}'.format(typecode))
+        typecodes.append([typecode, len(values)])
+
+    encoded = json.dumps({'header': _encode(header), 'arrays': typecodes}).encode('utf-8')
+    padding = b'\x00' * (-(_PREFIX.size + len(encoded)) % 8)
+    with open(path, 'wb') as out:
+        out.write(_PREFIX.pack(magic, len(encoded)))
+        out.write(encoded)
+        out.write(padding)
+        for values, (typecode, _) in zip(arrays, typecodes):
+            values = array(typecode, values)
+            if sys.byteorder != 'little':
+                values.byteswap()
+            out.write(values.tobytes())
+
+
+def load(path, magic, description):
+    """
+    Reads a file written by save. On little-endian machines the arrays are
+    memoryviews of the file, memory-mapped, so they are only read as they
+    are used and are shared between processes that load the same file;
+    otherwise they are read into arrays.
+
+    :param path: the file name
+    :param magic: the 8 bytes the file must start with
+    :param description: what the file holds, for the error message
+    :return: (header, arrays, mapping) where mapping is the mmap the arrays are views
+             of, or None. Pass arrays and mapping to close when done
+    :raises ValueError: if the file was not written by save with magic
+    """
+    with open(path, 'rb') as source:
+        prefix = source.read(_PREFIX.size)
+        if len(prefix) != _PREFIX.size:
+            raise ValueError('{} is not a {}'.format(path, description))
+        file_magic, encoded_size = _PREFIX.unpack(prefix)
+        if file_magic != magic:
+            raise ValueError('{} is not a {}'.format(path, description))
+        try:
+            contents = json.loads(source.read(encoded_size).decode('utf-8'), object_hook=_decode)
+            header = contents['header']
+            typecodes = [(typecode, int(count)) for typecode, count in contents['arrays']]
+        except (ValueError, KeyError, TypeError):
+            raise ValueError('{} is not a {}'.format(path, description))
+        if any(typecode not in _TYPECODES for typecode, _ in typecodes):
+            raise ValueError('{} is not a {}'.format(path, description))
+        offset = _PREFIX.size + encoded_size
+        offset += -offset % 8
+
+        arrays = []
+        if sys.byteorder != 'little':
+            source.seek(offset)
+            for typecode, count in typecodes:
+                values = array(typecode)
+                values.frombytes(source.read(count * 8))
+                values.byteswap()
+                arrays.append(values)
+            return header, arrays, None
+
+        mapping = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(mapping)
+        if offset + sum(count for _, count in typecodes) * 8 > len(view):
+            view.release()
+            mapping.close()
+            raise ValueError('{} is not a {}'.format(path, description))
+        for typecode, count in typecodes:
+            arrays.append(view[offset:offset + count * 8].cast(typecode))
+            offset += count * 8
+        view.release()
+        return header, arrays, mapping
+
+
+def close(arrays, mapping):
+    """
+    Releases the arrays returned by load and the file they were mapped
+    from, if they were. The arrays can't be used afterward.
+
+    :param arrays: the arrays returned by load
+    :param mapping: the mapping returned by load, or None
+    """
+    if mapping is None:
+        return
+    for values in arrays:
+        values.release()
+    mapping.close()
+
+
+def copy(values):
+    """
+    Copies an array returned by load into a new array, which can be
+    pickled and outlives the file
+
+    :param values: array or memoryview
+    :return: array
+    """
+    return array(values.typecode if isinstance(values, array) else values.format, values)
+
+
+def get_code():
+    """
+    easily retrieve the source code
+    of the save and load functions
+    """
+    return inspect.getsource(save) + '\n\n' + inspect.getsource(load)
@@ -0,0 +1,111 @@
+"""
+Connected Components
+
+Finds the connected components of an undirected graph, and whether it
+has a cycle, from its list of edges or from a graph object. The edges
+are split into chunks, each chunk is reduced to a forest with a
+disjoint set (optionally in several worker processes), and the forests
+are merged. A graph has a
+cycle exactly when it has more edges than a spanning forest of it,
+which has one edge fewer than vertices per component.
+https://en.wikipedia.org/wiki/Component_(graph_theory)
+"""
+import inspect
+
+from pygorithm.data_structures import disjoint_set
+from pygorithm.data_structures import graph as graph_module
+from pygorithm.data_structures import process_pool
+
+
+def _chunk_forest(edges, bounds):
+    """
+    Reduces edges[start:end] to a forest. Meant for internal use.
+
+    :return: list of (vertex, root of its tree), one for each vertex of the chunk
+    """
+    start, end = bounds
+    forest = disjoint_set.DisjointSet()
+    for i in range(start, end):
+        edge = edges[i]
+        forest.union(edge[0], edge[1])
+    return [(vertex, forest.find(vertex)) for vertex in forest.parent]
+
+
+def find_components(edges, vertices=(), workers=1, chunksize=None):
+    """
+    Finds the connected components of an undirected graph
+
+    :param edges: a sequence (supporting len and indexing) of (u, v) or (u, v, weight)
+                  edges, each listed once; an edge listed twice counts as a cycle,
+                  and so does an edge from a vertex to itself. To use a graph
+                  object, see find_graph_components
+    :param vertices: vertices to include even if they have no edges
+    :param workers: the number of processes to use, or None for one per CPU. 1 works in this process
+    :param chunksize: the number of edges reduced at a time, defaults to an even split
+    :return: (components, has_cycle) where components is a list of lists of vertices
+    """
+    workers = process_pool.worker_count(workers)
+    if chunksize is None:
+        chunksize = process_pool.default_chunksize(len(edges), workers)
+    chunks = [(start, min(start + chunksize, len(edges))) for start in range(0, len(edges), chunksize)]
+
+    forest = disjoint_set.DisjointSet(vertices)
+    # the forests of the chunks only need merging, so take them in
+    # whatever order they finish
+    for partial in process_pool.imap(_chunk_forest, edges, chunks, workers, 1, ordered=False):
+        for vertex, root in partial:
+            forest.union(vertex, root)
+
+    has_cycle = len(edges) > len(forest) - forest.count
+    return forest.sets(), has_cycle
+
+
+def _undirected_edges(adjacency):
+    """
+    Lists each edge of an undirected adjacency mapping once, although
+    it's listed from both of its ends. Meant for internal use.
+    """
+    index = dict((vertex, i) for i, vertex in enumerate(adjacency))
+    edges = []
+    for vertex in adjacency:
+        i = index[vertex]
+        loops = 0
+        for neighbor in adjacency[vertex]:
+            j = index[neighbor]
+            if i < j:
+                edges.append((vertex, neighbor))
+            elif i == j:
+                loops += 1
+        # an edge from a vertex to itself is listed from both of its ends too
+        edges.extend([(vertex, vertex)] * ((loops + 1) // 2))
+    return edges
+
+
+def find_graph_components(graph, workers=1, chunksize=None):
+    """
+    Finds the connected components of a graph, and whether it has a
+    cycle, with find_components
+
+    :param graph: a CSRGraph, whose edges() are used (a directed one is treated as
+                  undirected, so u -> v and v -> u together are a cycle), or an undirected
+                  graph whose `graph` lists each edge from both ends, such as
+                  CheckCycleUndirectedGraph, WeightedUndirectedGraph or GridGraph
+    :param workers: the number of processes to use, or None for one per CPU. 1 works in this process
+    :param chunksize: the number of edges reduced at a time, defaults to an even split
+    :return: (components, has_cycle) where components is a list of lists of vertices
+    """
+    if isinstance(graph, graph_module.CSRGraph):
+        edges = list(graph.edges())
+        vertices = graph.vertices
+    else:
+        edges = _undirected_edges(graph.graph)
+        vertices = list(graph.graph)
+    return find_components(edges, vertices, workers, chunksize)
+
+
+def get_code():
+    """
+    easily retrieve the source code
+    of the find_components function
+    """
+    return inspect.getsource(find_components)
@@ -0,0 +1,122 @@
+"""
+Disjoint Set
+
+A disjoint set (union-find) keeps track of elements partitioned into
+sets that only ever get merged. Each set is a tree whose root is the
+representative of the set; finding the root compresses the path to it
+and merging hangs the shallower tree under the deeper one, which makes
+both operations take practically constant amortized time.
+https://en.wikipedia.org/wiki/Disjoint-set_data_structure
+"""
+import inspect
+
+
+class DisjointSet(object):
+    """DisjointSet object
+    Disjoint sets of hashable elements with path compression and
+    union by rank
+    """
+
+    def __init__(self, elements=()):
+        """
+        :param elements: the initial elements, each in a set of its own
+        """
+        self.parent = {}
+        self.rank = {}
+        self.count = 0
+        for element in elements:
+            self.make_set(element)
+
+    def __len__(self):
+        return len(self.parent)
+
+    def __contains__(self, element):
+        return element in self.parent
+
+    def make_set(self, element):
+        """
+        Adds element in a set of its own, if it isn't in a set already
+        :param element: the element to add
+        :return: True if element was added
+        """
+        if element in self.parent:
+            return False
+        self.parent[element] = element
+        self.rank[element] = 0
+        self.count += 1
+        return True
+
+    def find(self, element):
+        """
+        Finds the representative of the set containing element, pointing
+        every element on the way directly at it
+        :param element: an element in one of the sets
+        :return: the representative element
+        """
+        parent = self.parent
+        root = element
+        while parent[root] != root:
+            root = parent[root]
+        while parent[element] != root:
+            parent[element], element = root, parent[element]
+        return root
+
+    def union(self, first, second):
+        """
+        Merges the sets containing first and second, adding either of
+        them that isn't in a set yet
+        :param first: an element
+        :param second: another element
+        :return: True if they were in different sets
+        """
+        self.make_set(first)
+        self.make_set(second)
+        first_root = self.find(first)
+        second_root = self.find(second)
+        if first_root == second_root:
+            return False
+
+        rank = self.rank
+        if rank[first_root] < rank[second_root]:
+            first_root, second_root = second_root, first_root
+        self.parent[second_root] = first_root
+        if rank[first_root] == rank[second_root]:
+            rank[first_root] += 1
+        self.count -= 1
+        return True
+
+    def connected(self, first, second):
+        """
+        Determines if two elements are in the same set
+        :param first: an element
+        :param second: another element
+        :return: bool, False if either isn't in a set
+        """
+        if first not in self.parent or second not in self.parent:
+            return False
+        return self.find(first) == self.find(second)
+
+    def sets(self):
+        """
+        Lists the elements of every set
+        :return: list of lists of elements
+        """
+        result = {}
+        for element in self.parent:
+            result.setdefault(self.find(element), []).append(element)
+        return list(result.values())
+
+    @staticmethod
+    def time_complexities():
+        """
+        Return time complexity of find and union
+        :return: string
+        """
+        return "Amortized O(alpha(n)) for find and union, where alpha is the inverse Ackermann function"
+
+    @staticmethod
+    def get_code():
+        """
+        returns the code for the current class
+        """
+        return inspect.getsource(DisjointSet)
@@ -2,9 +2,17 @@
 Author: OMKAR PATHAK
 Created On: 12th August 2017
 """
-from collections import defaultdict
+from array import array
+from collections import defaultdict, deque
 import inspect
 import math
+import mmap
+import os
+import struct
+
+from pygorithm.data_structures import array_file
+from pygorithm.data_structures import disjoint_set
+from pygorithm.data_structures import heap
 
 class Graph(object):
     """Graph object
@@ -44,7 +52,6 @@ class WeightedGraph(object):
     def __init__(self):
         self.vertexes = set()
         self.graph = {}
-        self._forest = None
 
     def get_weight(self, u, v):
         """
@@ -74,28 +81,6 @@ class WeightedGraph(object):
         for (u, v) in self.graph:
             print("%d -> %d weight: %d" % (u, v, self.graph[(u, v)]))
 
-    def _set_of(self, vertex):
-        """
-        Helper method
-        :param vertex:
-        :return:
-        """
-        for tree in self._forest:
-            if vertex in tree:
-                return tree
-        return None
-
-    def _union(self, u_set, v_set):
-        """
-        Helper method
-        :param u_set:
-        :param v_set:
-        :return:
-        """
-        self._forest.remove(u_set)
-        self._forest.remove(v_set)
-        self._forest.append(v_set + u_set)
-
     def kruskal_mst(self):
         """
         Kruskal algorithm for finding the minimum spanning tree of a weighted graph.
@@ -106,12 +91,47 @@ class WeightedGraph(object):
         # sort by weight
         self.graph = {k: self.graph[k] for k in sorted(self.graph, key=self.graph.get, reverse=False)}
         edges_explored = []
-        self._forest = [[v] for v in self.vertexes]
+        forest = disjoint_set.DisjointSet(self.vertexes)
         for (u, v) in self.graph:
-            u_set, v_set = self._set_of(u), self._set_of(v)
-            if u_set != v_set:
-                self._union(u_set, v_set)
+            if forest.union(u, v):
                 edges_explored.append(((u, v), self.graph[u, v]))
+                if forest.count == 1:
+                    break
+        return edges_explored
+
+    def prim_mst(self):
+        """
+        Prim algorithm for finding the minimum spanning tree of a weighted graph
+        (a tree for each connected part, if there is more than one). Grows the
+        tree from one vertex, always adding the cheapest edge leaving it, with
+        the candidate edges on an indexed heap. Returns the same edges as
+        kruskal_mst, in the order they were added.
+        More detailed info here: https://en.wikipedia.org/wiki/Prim%27s_algorithm
+        """
+        adjacency = defaultdict(list)
+        for (u, v), weight in self.graph.items():
+            adjacency[u].append((v, weight, (u, v)))
+            adjacency[v].append((u, weight, (u, v)))
+
+        edges_explored = []
+        in_tree = set()
+        # vertex -> the edge it would be added to the tree with
+        best_edge = {}
+        for root in self.vertexes:
+            if root in in_tree:
+                continue
+            candidates = heap.IndexedHeap()
+            candidates.push(root, 0)
+            while len(candidates) > 0:
+                vertex, weight = candidates.pop()
+                in_tree.add(vertex)
+                if vertex in best_edge:
+                    edges_explored.append((best_edge.pop(vertex), weight))
+                for neighbor, neighbor_weight, edge in adjacency[vertex]:
+                    if neighbor in in_tree:
+                        continue
+                    if candidates.push_or_decrease(neighbor, neighbor_weight):
+                        best_edge[neighbor] = edge
         return edges_explored
 
     # TODO: Is this necessary?
@@ -130,15 +150,34 @@ class WeightedGraph(object):
         """
         return inspect.getsource(cls.kruskal_mst)
 
+    @staticmethod
+    def prim_time_complexity():
+        """
+        Return time complexity of prim
+        :return: string
+        """
+        return "Worst case: O(E log(V)) where E in the number of edges and V the number of vertexes"
+
+    @classmethod
+    def prim_code(cls):
+        """
+        Returns the code for current class
+        """
+        return inspect.getsource(cls.prim_mst)
+
 class WeightedUndirectedGraph(object):
     """WeightedUndirectedGraph object
     A graph with a numerical value (weight) on edges, which
     is the same for both directions in an undirected graph.
+    
+    `version` is incremented every time the graph is modified, so
+    anything computed from the graph can tell when it is out of date.
     """
     
     def __init__(self):
         self.graph = {}
         self.weights = {}
+        self.version = 0
         
     def add_edge(self, u, v, weight):
         """
@@ -151,6 +190,7 @@ class WeightedUndirectedGraph(object):
         
         changing_weight = (u, v) in self.weights.keys()
         
+        self.version += 1
         self.weights[(u, v)] = weight
         self.weights[(v, u)] = weight
         
@@ -167,6 +207,27 @@ class WeightedUndirectedGraph(object):
         else:
             self.graph[v] = [u]
     
+    @staticmethod
+    def from_edges(edges):
+        """
+        Builds a graph from many edges at once, without the work add_edge
+        repeats for every edge. As with add_edge, an edge listed again
+        only changes the weight.
+        :param edges: iterable of (u, v, weight), such as CSRGraph.read_edge_file
+        :return: WeightedUndirectedGraph
+        """
+        result = WeightedUndirectedGraph()
+        graph = result.graph
+        weights = result.weights
+        for u, v, weight in edges:
+            if (u, v) not in weights:
+                graph.setdefault(u, []).append(v)
+                graph.setdefault(v, []).append(u)
+            weights[(u, v)] = weight
+            weights[(v, u)] = weight
+        result.version = 1
+        return result
+
     def get_edge_weight(self, u, v):
         """
         Gets the weight between u and v if such an edge
@@ -187,6 +248,7 @@ class WeightedUndirectedGraph(object):
         :param other_edge_or_none: an edge connected to edge or none
         """
         
+        self.version += 1
         if other_edge_or_none is not None:
             del self.weights[(edge, other_edge_or_none)]
             del self.weights[(other_edge_or_none, edge)]
@@ -241,40 +303,709 @@ class WeightedUndirectedGraph(object):
                     if nx >= 0 and ny >= 0 and nx < size and ny < size:
                         self.add_edge((x, y), (nx, ny), weight * offset[2])     
                         
+class GridGraph(object):
+    """GridGraph object
+    An 8-connected grid of cells stored in flat arrays rather than
+    as adjacency lists. Each cell (x, y) has a cost; moving between
+    two adjacent cells costs the average of their costs, times sqrt(2)
+    for diagonal moves. Blocked cells have no connections at all.
+    
+    Neighbors and edge weights are computed on the fly, so a grid uses
+    about 9 bytes per cell no matter how many connections there are.
+    `graph[v]` and `get_edge_weight` behave like they do on a
+    WeightedUndirectedGraph built with gridify, so the pathfinding
+    algorithms can be used on either. Like WeightedUndirectedGraph,
+    `version` is incremented every time a cell is modified.
+    """
+    
+    # the (dx, dy) from a cell to each of its neighbors, in the order
+    # neighbors returns them
+    NEIGHBOR_OFFSETS = (
+        (-1, -1), (-1, 0), (-1, 1),
+        (0, -1), (0, 1),
+        (1, -1), (1, 0), (1, 1)
+    )
+    
+    class _Adjacency(object):
+        """_Adjacency object
+        Read-only mapping of vertex -> list of neighbors for a
+        GridGraph, for use as `graph` by the pathfinding algorithms.
+        """
+        
+        def __init__(self, grid):
+            self.grid = grid
+            
+        def __getitem__(self, vertex):
+            if vertex not in self:
+                raise KeyError(vertex)
+            return self.grid.neighbors(vertex)
+        
+        def __contains__(self, vertex):
+            return self.grid.in_bounds(vertex) and not self.grid.is_blocked(vertex)
+        
+        def __iter__(self):
+            grid = self.grid
+            for x in range(grid.width):
+                for y in range(grid.height):
+                    if not grid.blocked[x * grid.height + y]:
+                        yield (x, y)
+        
+        def __len__(self):
+            grid = self.grid
+            return grid.width * grid.height - grid.blocked.count(1)
+        
+        def keys(self):
+            return iter(self)
+        
+        def get(self, vertex, default=None):
+            if vertex not in self:
+                return default
+            return self.grid.neighbors(vertex)
+    
+    def __init__(self, width, height=None, weight=1):
+        """
+        :param width: the number of cells along x - type : integer
+        :param height: the number of cells along y, defaults to width - type : integer
+        :param weight: the initial cost of every cell - type : numeric
+        """
+        if height is None:
+            height = width
+        self.width = width
+        self.height = height
+        self.costs = array('d', [weight]) * (width * height)
+        self.blocked = bytearray(width * height)
+        self.graph = GridGraph._Adjacency(self)
+        self.version = 0
+        
+    def index(self, vertex):
+        """
+        Gets the position of a cell in costs and blocked, so that
+        other arrays can be laid out like the grid
+        :param vertex: (x, y) inside the grid
+        :return: the offset of vertex in costs and blocked
+        """
+        return vertex[0] * self.height + vertex[1]
+    
+    def in_bounds(self, vertex):
+        """
+        Determines if vertex is a cell of this grid
+        :param vertex: (x, y)
+        :return: bool
+        """
+        x, y = vertex
+        return 0 <= x < self.width and 0 <= y < self.height
+    
+    def is_blocked(self, vertex):
+        """
+        Determines if vertex is blocked
+        :param vertex: (x, y) inside the grid
+        :return: bool
+        """
+        return self.blocked[self.index(vertex)] == 1
+    
+    def set_blocked(self, vertex, blocked=True):
+        """
+        Blocks or unblocks the specified cell. Blocking a cell removes
+        all of its connections, like WeightedUndirectedGraph.remove_edge(vertex)
+        does on a gridified graph. The cost of the cell is kept.
+        :param vertex: (x, y) inside the grid
+        :param blocked: True to block the cell, False to unblock it
+        """
+        self.blocked[self.index(vertex)] = 1 if blocked else 0
+        self.version += 1
+        
+    def get_cost(self, vertex):
+        """
+        Gets the cost of the specified cell
+        :param vertex: (x, y) inside the grid
+        :return: numeric
+        """
+        return self.costs[self.index(vertex)]
+    
+    def set_cost(self, vertex, cost):
+        """
+        Sets the cost of the specified cell
+        :param vertex: (x, y) inside the grid
+        :param cost: the new cost - type : numeric
+        """
+        self.costs[self.index(vertex)] = cost
+        self.version += 1
+    
+    def neighbors(self, vertex):
+        """
+        Gets the unblocked cells adjacent (including diagonally)
+        to the specified cell, in the same order as gridify.
+        :param vertex: (x, y) inside the grid
+        :return: list of (x, y)
+        """
+        x, y = vertex
+        width = self.width
+        height = self.height
+        blocked = self.blocked
+        result = []
+        for dx, dy in self.NEIGHBOR_OFFSETS:
+            nx = x + dx
+            ny = y + dy
+            if 0 <= nx < width and 0 <= ny < height and not blocked[nx * height + ny]:
+                result.append((nx, ny))
+        return result
+    
+    def get_edge_weight(self, u, v):
+        """
+        Gets the weight between u and v if such an edge
+        exists, or None if it does not.
+        :param u: one edge
+        :param v: the other edge
+        :return: numeric or None
+        """
+        dx = abs(u[0] - v[0])
+        dy = abs(u[1] - v[1])
+        if dx > 1 or dy > 1 or (dx == 0 and dy == 0):
+            return None
+        if not self.in_bounds(u) or not self.in_bounds(v):
+            return None
+        u_idx = self.index(u)
+        v_idx = self.index(v)
+        if self.blocked[u_idx] or self.blocked[v_idx]:
+            return None
+        weight = (self.costs[u_idx] + self.costs[v_idx]) / 2
+        if dx == 1 and dy == 1:
+            return weight * math.sqrt(2)
+        return weight
+    
+    def get_code(self):
+        """
+        returns the code for the current class
+        """
+        return inspect.getsource(GridGraph)
+                        
+class CSRGraph(object):
+    """CSRGraph object
+    A frozen graph in compressed sparse row form: the vertices are
+    numbered in the order of `vertices`, and the edges leaving vertex
+    number i are entries offsets[i] to offsets[i + 1] of the flat
+    `targets` (vertex numbers) and `weights` arrays. That's 16 bytes
+    per edge, with the edges of each vertex next to each other.
+    
+    `graph[v]` and `get_edge_weight` behave like they do on a
+    WeightedUndirectedGraph, so the traversals and pathfinding
+    algorithms can be used on it. A CSRGraph can't be modified, so its
+    `version` never changes; convert it back to change it.
+    
+    Graph and directed edge lists are kept directed. WeightedGraph
+    and WeightedUndirectedGraph are undirected: every edge is stored
+    in both directions and `directed` is False.
+    """
+    
+    # the magic number of files written by save; the header holds the
+    # vertices and whether the graph is directed, and the arrays are the
+    # offsets, targets and weights
+    _MAGIC = b'PGCSR2\x00\x00'
+    
+    class _Adjacency(object):
+        """_Adjacency object
+        Read-only mapping of vertex -> list of neighbors for a
+        CSRGraph, for use as `graph` by the traversals and
+        pathfinding algorithms.
+        """
+        
+        def __init__(self, csr):
+            self.csr = csr
+        
+        def __getitem__(self, vertex):
+            return self.csr.neighbors(vertex)
+        
+        def __contains__(self, vertex):
+            return vertex in self.csr.index
+        
+        def __iter__(self):
+            return iter(self.csr.vertices)
+        
+        def __len__(self):
+            return len(self.csr.vertices)
+        
+        def keys(self):
+            return iter(self)
+        
+        def get(self, vertex, default=None):
+            if vertex not in self.csr.index:
+                return default
+            return self.csr.neighbors(vertex)
+    
+    def __init__(self):
+        self.vertices = []
+        self.index = {}
+        self.offsets = array('q', [0])
+        self.targets = array('q')
+        self.weights = array('d')
+        self.directed = True
+        self.graph = CSRGraph._Adjacency(self)
+        self.version = 0
+        self._mmap = None
+    
+    def __len__(self):
+        return len(self.vertices)
+    
+    @staticmethod
+    def from_edges(edges, directed=True, vertices=None, deduplicate=False):
+        """
+        Builds a CSRGraph from a list of edges
+        :param edges: iterable of (u, v) or (u, v, weight); the weight defaults to 1
+        :param directed: False to also add every edge from v to u
+        :param vertices: the vertices in the order to number them, which must include
+                         every vertex of an edge; by default in order of appearance
+        :param deduplicate: True to keep each edge once, with the weight it was last
+                            listed with (on an undirected graph, v to u is the same edge)
+        :return: CSRGraph
+        """
+        result = CSRGraph()
+        result.directed = directed
+        index = result.index
+        if vertices is not None:
+            result.vertices = list(vertices)
+            for i, vertex in enumerate(result.vertices):
+                index[vertex] = i
+        
+        vertices = result.vertices
+        sources = array('q')
+        targets = array('q')
+        weights = array('d')
+        for edge in edges:
+            u = edge[0]
+            v = edge[1]
+            weight = edge[2] if len(edge) > 2 else 1
+            i = index.get(u, None)
+            if i is None:
+                i = index[u] = len(vertices)
+                vertices.append(u)
+            j = index.get(v, None)
+            if j is None:
+                j = index[v] = len(vertices)
+                vertices.append(v)
+            sources.append(i)
+            targets.append(j)
+            weights.append(weight)
+            if not directed and i != j:
+                sources.append(j)
+                targets.append(i)
+                weights.append(weight)
+        
+        result._fill(sources, targets, weights)
+        if deduplicate:
+            # the edges in listed order aren't needed anymore
+            del sources, targets, weights
+            result._deduplicate()
+        return result
+    
+    def _fill(self, sources, targets, weights):
+        """
+        Sorts edges into rows by source (keeping their order within a
+        row) and sets offsets, targets and weights. Meant for internal use.
+        """
+        counts = array('q', [0]) * (len(self.vertices) + 1)
+        for source in sources:
+            counts[source + 1] += 1
+        for i in range(len(self.vertices)):
+            counts[i + 1] += counts[i]
+        self.offsets = array('q', counts)
+        
+        self.targets = array('q', [0]) * len(targets)
+        self.weights = array('d', [0]) * len(targets)
+        for source, target, weight in zip(sources, targets, weights):
+            position = counts[source]
+            counts[source] += 1
+            self.targets[position] = target
+            self.weights[position] = weight
+    
+    def _deduplicate(self):
+        """
+        Keeps the first of each target in every row, with the weight of
+        its last copy, a row at a time so only one row's targets are
+        held in a dict. Meant for internal use.
+        """
+        offsets = self.offsets
+        targets = self.targets
+        weights = self.weights
+        start = end = 0
+        for i in range(len(self.vertices)):
+            # target -> its position in the deduplicated row
+            seen = {}
+            row_end = offsets[i + 1]
+            for edge in range(start, row_end):
+                target = targets[edge]
+                position = seen.get(target, None)
+                if position is None:
+                    position = seen[target] = end
+                    targets[end] = target
+                    end += 1
+                weights[position] = weights[edge]
+            start = row_end
+            offsets[i + 1] = end
+        del targets[end:]
+        del weights[end:]
+    
+    @staticmethod
+    def from_graph(graph):
+        """
+        Builds a CSRGraph with the same vertices and edges as another graph
+        :param graph: a Graph, WeightedGraph, WeightedUndirectedGraph or GridGraph, another
+                      object with `graph` and `get_edge_weight`, or a dict of vertex -> neighbors
+        :return: CSRGraph
+        """
+        if isinstance(graph, CSRGraph):
+            return CSRGraph.from_edges(graph.edges(), graph.directed, graph.vertices)
+        if isinstance(graph, WeightedGraph):
+            return CSRGraph.from_edges(((u, v, weight) for (u, v), weight in graph.graph.items()), False)
+        
+        if isinstance(graph, dict):
+            adjacency = graph
+            weight_fn = None
+        else:
+            adjacency = graph.graph
+            weight_fn = getattr(graph, 'get_edge_weight', None)
+        
+        vertices = list(adjacency)
+        # vertices of a Graph that only have edges into them aren't keys
+        known = set(vertices)
+        for vertex in list(vertices):
+            for neighbor in adjacency[vertex]:
+                if neighbor not in known:
+                    known.add(neighbor)
+                    vertices.append(neighbor)
+        
+        def edges():
+            for vertex in list(adjacency):
+                for neighbor in adjacency[vertex]:
+                    if weight_fn is None:
+                        yield vertex, neighbor
+                    else:
+                        yield vertex, neighbor, weight_fn(vertex, neighbor)
+        
+        # every edge of an undirected graph is already listed from both ends
+        result = CSRGraph.from_edges(edges(), True, vertices)
+        result.directed = weight_fn is None
+        return result
+    
+    @staticmethod
+    def read_edge_file(path, delimiter=None, vertex_type=int, header=False):
+        """
+        Reads the edges of a text file with one edge per line, "u v" or
+        "u v weight", a line at a time. Empty lines and lines starting with
+        # or % are skipped.
+        :param path: the file name
+        :param delimiter: the separator between the fields, such as ',' for CSV,
+                          or None for any whitespace
+        :param vertex_type: called with the text of each vertex
+        :param header: True to skip the first line, such as the column names of a CSV file
+        :return: generator of (u, v, weight); the weight defaults to 1
+        """
+        with open(path, 'r') as source:
+            if header:
+                next(source, None)
+            for line in source:
+                fields = line.split(delimiter)
+                if not fields or not fields[0].strip() or fields[0].lstrip()[0] in '#%':
+                    continue
+                weight = float(fields[2]) if len(fields) > 2 else 1
+                yield vertex_type(fields[0].strip()), vertex_type(fields[1].strip()), weight
+    
+    @staticmethod
+    def from_edge_file(path, directed=True, delimiter=None, vertex_type=int, header=False, deduplicate=True):
+        """
+        Builds a CSRGraph from a text file of edges (see read_edge_file),
+        without keeping the edges in memory along the way
+        :param path: the file name
+        :param directed: False to also add every edge from v to u
+        :param delimiter: the separator between the fields, or None for any whitespace
+        :param vertex_type: called with the text of each vertex
+        :param header: True to skip the first line
+        :param deduplicate: True to keep each edge once (see from_edges)
+        :return: CSRGraph
+        """
+        return CSRGraph.from_edges(CSRGraph.read_edge_file(path, delimiter, vertex_type, header),
+                                   directed, deduplicate=deduplicate)
+    
+    @staticmethod
+    def _binary_edge_record(weighted):
+        """
+        The layout of one edge in a binary edge file: two little-endian
+        64-bit integers and, if weighted, a little-endian double.
+        Meant for internal use.
+        """
+        return struct.Struct('<qqd' if weighted else '<qq')
+    
+    @staticmethod
+    def write_binary_edge_file(path, edges, weighted=True):
+        """
+        Writes edges between integer vertices to a binary edge file
+        :param path: the file name
+        :param edges: iterable of (u, v) or (u, v, weight); the weight defaults to 1
+        :param weighted: False to leave the weights out
+        """
+        record = CSRGraph._binary_edge_record(weighted)
+        with open(path, 'wb') as out:
+            for edge in edges:
+                if weighted:
+                    out.write(record.pack(edge[0], edge[1], edge[2] if len(edge) > 2 else 1))
+                else:
+                    out.write(record.pack(edge[0], edge[1]))
+    
+    @staticmethod
+    def read_binary_edge_file(path, weighted=True):
+        """
+        Reads the edges of a binary edge file (see write_binary_edge_file).
+        The file is memory-mapped and the edges are unpacked straight from
+        the map as they are used, without reading the file into memory.
+        :param path: the file name
+        :param weighted: False if the file has no weights
+        :return: generator of (u, v, weight); the weight is 1 without weights
+        """
+        record = CSRGraph._binary_edge_record(weighted)
+        with open(path, 'rb') as source:
+            size = os.fstat(source.fileno()).st_size
+            if size % record.size != 0:
+                raise ValueError('{} is not a binary edge file'.format(path))
+            if size == 0:
+                return
+            mapped = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            view = memoryview(mapped)
+            records = record.iter_unpack(view)
+            try:
+                if weighted:
+                    for edge in records:
+                        yield edge
+                else:
+                    for u, v in records:
+                        yield u, v, 1
+            finally:
+                # the iterator holds on to the view until it is gone
+                del records
+                view.release()
+        finally:
+            mapped.close()
+    
+    @staticmethod
+    def from_binary_edge_file(path, directed=True, weighted=True, deduplicate=True):
+        """
+        Builds a CSRGraph from a binary edge file (see read_binary_edge_file)
+        :param path: the file name
+        :param directed: False to also add every edge from v to u
+        :param weighted: False if the file has no weights
+        :param deduplicate: True to keep each edge once (see from_edges)
+        :return: CSRGraph
+        """
+        return CSRGraph.from_edges(CSRGraph.read_binary_edge_file(path, weighted),
+                                   directed, deduplicate=deduplicate)
+    
+    def edges(self):
+        """
+        Lists the edges of this graph, each edge of an undirected graph once
+        :return: generator of (u, v, weight)
+        """
+        vertices = self.vertices
+        offsets = self.offsets
+        targets = self.targets
+        weights = self.weights
+        for i in range(len(vertices)):
+            for edge in range(offsets[i], offsets[i + 1]):
+                target = targets[edge]
+                if self.directed or target >= i:
+                    yield vertices[i], vertices[target], weights[edge]
+    
+    def to_graph(self):
+        """
+        Converts this graph to a Graph, which is unweighted and directed;
+        an undirected graph gets an edge in each direction
+        :return: Graph
+        """
+        result = Graph()
+        for vertex in self.vertices:
+            for neighbor in self.neighbors(vertex):
+                result.add_edge(vertex, neighbor)
+        return result
+    
+    def to_weighted_graph(self):
+        """
+        Converts this graph to a WeightedGraph. WeightedGraph is
+        undirected, so of two directed edges between the same vertices
+        only the first is kept.
+        :return: WeightedGraph
+        """
+        result = WeightedGraph()
+        for u, v, weight in self.edges():
+            if result.get_weight(u, v) is None:
+                result.add_edge(u, v, weight)
+        return result
+    
+    def to_weighted_undirected_graph(self):
+        """
+        Converts this graph to a WeightedUndirectedGraph. Of two directed
+        edges between the same vertices, the weight of the last is kept.
+        Vertices without edges are left out.
+        :return: WeightedUndirectedGraph
+        """
+        return WeightedUndirectedGraph.from_edges(self.edges())
+    
+    def neighbors(self, vertex):
+        """
+        Gets the vertices the edges leaving vertex lead to
+        :param vertex: a vertex of this graph
+        :return: list of vertices
+        """
+        i = self.index[vertex]
+        vertices = self.vertices
+        targets = self.targets
+        return [vertices[targets[edge]] for edge in range(self.offsets[i], self.offsets[i + 1])]
+    
+    def get_edge_weight(self, u, v):
+        """
+        Gets the weight between u and v if such an edge
+        exists, or None if it does not.
+        :param u: one edge
+        :param v: the other edge
+        :return: numeric or None
+        """
+        i = self.index.get(u, None)
+        j = self.index.get(v, None)
+        if i is None or j is None:
+            return None
+        targets = self.targets
+        for edge in range(self.offsets[i], self.offsets[i + 1]):
+            if targets[edge] == j:
+                return self.weights[edge]
+        return None
+    
+    def save(self, path):
+        """
+        Writes this graph to a file (see array_file). The vertices must be
+        None, bools, numbers, strings or tuples of them.
+        :param path: the file name
+        """
+        array_file.save(path, self._MAGIC, {'vertices': self.vertices, 'directed': self.directed},
+                        [self.offsets, self.targets, self.weights])
+    
+    @staticmethod
+    def load(path):
+        """
+        Reads a graph written by save. The arrays are memory-mapped, so
+        they are only read from the file as they are used and are shared
+        between processes that load the same file.
+        :param path: the file name
+        :return: CSRGraph
+        :raises ValueError: if the file wasn't written by CSRGraph.save
+        """
+        header, arrays, mapping = array_file.load(path, CSRGraph._MAGIC, 'CSR graph')
+        result = CSRGraph()
+        result.directed = header['directed']
+        result.vertices = header['vertices']
+        result.offsets, result.targets, result.weights = arrays
+        result._mmap = mapping
+        result.index = dict((vertex, i) for i, vertex in enumerate(result.vertices))
+        return result
+    
+    def close(self):
+        """
+        Releases the memory-mapped file, if the graph was loaded
+        from one. The graph is empty afterward.
+        """
+        if self._mmap is not None:
+            array_file.close([self.offsets, self.targets, self.weights], self._mmap)
+            self.vertices = []
+            self.index = {}
+            self.offsets = array('q', [0])
+            self.targets = array('q')
+            self.weights = array('d')
+            self._mmap = None
+    
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if self._mmap is not None:
+            for name in ('offsets', 'targets', 'weights'):
+                state[name] = array_file.copy(state[name])
+            state['_mmap'] = None
+        return state
+    
+    def get_code(self):
+        """
+        returns the code for the current class
+        """
+        return inspect.getsource(CSRGraph)
+
 class TopologicalSort(Graph):
 
+    def _vertices(self):
+        """
+        Helper method
+        :return: the vertices 0 to count - 1 (as the original examples use),
+                 then every other vertex with or leading to an edge
+        """
+        seen = set()
+        for vertex in range(self.count):
+            seen.add(vertex)
+            yield vertex
+        for vertex in list(self.graph):
+            for candidate in [vertex] + self.graph[vertex]:
+                if candidate not in seen:
+                    seen.add(candidate)
+                    yield candidate
+
     def topological_sort(self):
         """
         function for sorting graph elements using topological sort
         """
         # Marking all vertices as not visited
-        visited = [False] * self.count
-        # Stack for storing the vertex
-        stack = []
-        for vertex in range(self.count):
-            # Call the recursive function only if not visited
-            if not visited[vertex]:
-                self.__topological_sort_rec(vertex, visited, stack)
+        visited = set()
+        # Vertices in the order they are finished; reversed at the end
+        finished = []
+        for vertex in self._vertices():
+            if vertex in visited:
+                continue
+            # an explicit stack of (vertex, its adjacent nodes left to visit)
+            # rather than recursion, so deep graphs don't hit the recursion limit
+            visited.add(vertex)
+            stack = [(vertex, iter(self.graph.get(vertex, ())))]
+            while stack:
+                current, adjacent_nodes = stack[-1]
+                for adjacent_node in adjacent_nodes:
+                    if adjacent_node not in visited:
+                        visited.add(adjacent_node)
+                        stack.append((adjacent_node, iter(self.graph.get(adjacent_node, ()))))
+                        break
+                else:
+                    stack.pop()
+                    finished.append(current)
 
-        return stack
+        finished.reverse()
+        return finished
 
-    def __topological_sort_rec(self, vertex, visited, stack):
+    def topological_order(self):
         """
-        Recursive function for topological Sort
+        Generator for the vertices in topological order (Kahn's algorithm):
+        each vertex is yielded as soon as every vertex with an edge to it
+        has been, so the caller can stop early. The order may differ from
+        topological_sort.
+        Raises ValueError once no more vertices can be yielded if the graph has a cycle.
         """
-        # Mark the current node in visited
-        visited[vertex] = True
+        in_degree = {}
+        for vertex in self._vertices():
+            in_degree.setdefault(vertex, 0)
+            for adjacent_node in self.graph.get(vertex, ()):
+                in_degree[adjacent_node] = in_degree.get(adjacent_node, 0) + 1
 
-        # mark all adjacent nodes of the current node
-        try:
-            for adjacent_node in self.graph[vertex]:
-                if not visited[adjacent_node]:
-                    self.__topological_sort_rec(adjacent_node, visited, stack)
-        except KeyError:
-            return
+        ready = deque(vertex for vertex, degree in in_degree.items() if degree == 0)
+        remaining = len(in_degree)
+        while ready:
+            vertex = ready.popleft()
+            remaining -= 1
+            yield vertex
+            for adjacent_node in self.graph.get(vertex, ()):
+                in_degree[adjacent_node] -= 1
+                if in_degree[adjacent_node] == 0:
+                    ready.append(adjacent_node)
 
-        # Push current vertex to stack which stores the result
-        stack.insert(0, vertex)
+        if remaining > 0:
+            raise ValueError('graph has a cycle')
 
     def get_code(self):
         """
@@ -283,6 +1014,232 @@ class TopologicalSort(Graph):
         return inspect.getsource(TopologicalSort)
 
 
+class DynamicTopologicalSort(Graph):
+    """DynamicTopologicalSort
+    Keeps a topological order of a directed acyclic graph up to date as
+    edges are added (Pearce-Kelly), instead of sorting the whole graph
+    again. Only an edge against the current order does any work, and
+    then only the vertices between its two ends in the order, that
+    are reachable from one or reach the other, are searched and moved.
+    An edge that would make a cycle is refused.
+
+    New vertices go at the end of the order, so to start from an
+    existing graph add its vertices in topological order (see
+    TopologicalSort) before its edges.
+    """
+
+    def __init__(self):
+        super(DynamicTopologicalSort, self).__init__()
+        # the edges into each vertex, for the backward search
+        self.reverse = defaultdict(list)
+        # order[i] is the vertex at position i, position[vertex] is i
+        self.order = []
+        self.position = {}
+
+    def add_vertex(self, vertex):
+        """
+        Adds a vertex, without edges, at the end of the order
+        :param vertex: the vertex, ignored if it is already in the graph
+        """
+        if vertex not in self.position:
+            self.position[vertex] = len(self.order)
+            self.order.append(vertex)
+
+    def add_edge(self, from_vertex, to_vertex):
+        """
+        Adds an edge in the graph, adding either vertex not yet in it,
+        and moves vertices in the order if needed.
+        Raises ValueError, leaving the graph and order as they were, if
+        the edge would make a cycle.
+        """
+        # checked before adding the vertices, which can't otherwise be
+        # on a cycle when either is new
+        if from_vertex == to_vertex:
+            raise ValueError('edge from {} to {} makes a cycle'.format(from_vertex, to_vertex))
+        self.add_vertex(from_vertex)
+        self.add_vertex(to_vertex)
+        position = self.position
+        lower = position[to_vertex]
+        upper = position[from_vertex]
+        if lower <= upper:
+            # only the vertices from to_vertex to from_vertex in the
+            # order can be out of order after adding the edge
+            forward = self._search(self.graph, to_vertex, lambda vertex: position[vertex] <= upper)
+            if from_vertex in forward:
+                raise ValueError('edge from {} to {} makes a cycle'.format(from_vertex, to_vertex))
+            backward = self._search(self.reverse, from_vertex, lambda vertex: position[vertex] > lower)
+            self._reorder(backward, forward)
+
+        self.graph[from_vertex].append(to_vertex)
+        self.reverse[to_vertex].append(from_vertex)
+        self.count += 1
+
+    @staticmethod
+    def _search(adjacency, start, within):
+        """
+        Finds the vertices reachable from start through the vertices
+        for which within is true. Meant for internal use.
+        :return: set of the vertices found, including start
+        """
+        found = {start}
+        stack = [start]
+        while stack:
+            vertex = stack.pop()
+            for adjacent_node in adjacency.get(vertex, ()):
+                if adjacent_node not in found and within(adjacent_node):
+                    found.add(adjacent_node)
+                    stack.append(adjacent_node)
+        return found
+
+    def _reorder(self, backward, forward):
+        """
+        Moves the backward vertices in front of the forward vertices,
+        reusing the positions they held between them and keeping the
+        order within each group. Meant for internal use.
+        """
+        position = self.position
+        backward = sorted(backward, key=position.__getitem__)
+        forward = sorted(forward, key=position.__getitem__)
+        slots = sorted(position[vertex] for vertex in backward + forward)
+        for slot, vertex in zip(slots, backward + forward):
+            position[vertex] = slot
+            self.order[slot] = vertex
+
+    def topological_sort(self):
+        """
+        The current topological order, without sorting again
+        :return: list of every vertex, each before the vertices it has edges to
+        """
+        return list(self.order)
+
+    def precedes(self, first, second):
+        """
+        Determines if first comes before second in the current order,
+        which it must if there is a path from first to second
+        :param first: a vertex in the graph
+        :param second: another vertex in the graph
+        :return: bool
+        """
+        return self.position[first] < self.position[second]
+
+    def get_code(self):
+        """
+        returns the code for the current class
+        """
+        return inspect.getsource(DynamicTopologicalSort)
+
+
+class StronglyConnectedComponents(Graph):
+    """StronglyConnectedComponents
+    Splits a directed graph into strongly connected components, the
+    largest groups of vertices that can each reach every other vertex
+    in the group, with Tarjan's algorithm in linear time. Every cycle
+    lies within one component, so the graph of the components
+    (the condensation) has none.
+    """
+
+    def _vertices(self):
+        """
+        Helper method
+        :return: every vertex with or leading to an edge, in the order first added
+        """
+        seen = set()
+        for vertex in list(self.graph):
+            for candidate in [vertex] + self.graph[vertex]:
+                if candidate not in seen:
+                    seen.add(candidate)
+                    yield candidate
+
+    def strongly_connected_components(self):
+        """
+        Finds the strongly connected components with a depth first search
+        that uses an explicit stack, so deep graphs don't hit the recursion
+        limit
+        :return: list of lists of vertices, with every edge between two
+                 components going from an earlier one to a later one
+        """
+        # the order each vertex was reached in, and the earliest vertex
+        # reachable from it that is still on the component stack
+        index = {}
+        low = {}
+        component_stack = []
+        on_stack = set()
+        components = []
+        for vertex in self._vertices():
+            if vertex in index:
+                continue
+            index[vertex] = low[vertex] = len(index)
+            component_stack.append(vertex)
+            on_stack.add(vertex)
+            stack = [(vertex, iter(self.graph.get(vertex, ())))]
+            while stack:
+                current, adjacent_nodes = stack[-1]
+                for adjacent_node in adjacent_nodes:
+                    if adjacent_node not in index:
+                        index[adjacent_node] = low[adjacent_node] = len(index)
+                        component_stack.append(adjacent_node)
+                        on_stack.add(adjacent_node)
+                        stack.append((adjacent_node, iter(self.graph.get(adjacent_node, ()))))
+                        break
+                    if adjacent_node in on_stack and index[adjacent_node] < low[current]:
+                        low[current] = index[adjacent_node]
+                else:
+                    stack.pop()
+                    if stack:
+                        parent = stack[-1][0]
+                        if low[current] < low[parent]:
+                            low[parent] = low[current]
+                    if low[current] == index[current]:
+                        # current is the first vertex reached in its
+                        # component, which is everything above it
+                        component = []
+                        while True:
+                            node = component_stack.pop()
+                            on_stack.discard(node)
+                            component.append(node)
+                            if node == current:
+                                break
+                        components.append(component)
+
+        # components are finished after every component they lead to
+        components.reverse()
+        return components
+
+    def condensation(self):
+        """
+        Builds the graph of the strongly connected components, which has
+        an edge from one component to another if any of their vertices do
+        :return: (components, dag) where components is the list from
+                 strongly_connected_components and dag is a Graph on their
+                 positions in it, with each edge once and no cycles
+        """
+        components = self.strongly_connected_components()
+        component_of = {}
+        for i, component in enumerate(components):
+            for vertex in component:
+                component_of[vertex] = i
+
+        dag = Graph()
+        for i, component in enumerate(components):
+            # every component is a vertex of the dag, even without edges
+            successors = dag.graph[i]
+            seen = set()
+            for vertex in component:
+                for adjacent_node in self.graph.get(vertex, ()):
+                    j = component_of[adjacent_node]
+                    if j != i and j not in seen:
+                        seen.add(j)
+                        successors.append(j)
+                        dag.count += 1
+        return components, dag
+
+    def get_code(self):
+        """
+        returns the code for the current class
+        """
+        return inspect.getsource(StronglyConnectedComponents)
+
+
 class CheckCycleDirectedGraph(object):
     """CheckCycleDirectedGraph
     Class to check cycle in directed graph
@@ -315,34 +1272,40 @@ class CheckCycleDirectedGraph(object):
         """
         This function will return True if graph is cyclic else return False
         """
-        visited = [False] * len(self.graph)
-        stack = [False] * len(self.graph)
-        for vertex in range(len(self.graph)):
-            if not visited[vertex]:
-                if self.__check_cycle_rec(visited, stack, vertex):
-                    return True
-        return False
+        return self.find_cycle() is not None
 
-    def __check_cycle_rec(self, visited, stack, vertex):
+    def find_cycle(self):
         """
-        Recursive function for finding the cycle
+        Finds a cycle with a depth first search that uses an explicit
+        stack, so deep graphs don't hit the recursion limit, and stops
+        at the first cycle found
+        :return: list of the vertices on a cycle, in order, or None
         """
-        # Mark the current node in visited and also add it to the stack
-        visited[vertex] = True
-        stack[vertex] = True
-
-        # mark all adjacent nodes of the current node
-        for adjacentNode in self.graph[vertex]:
-            if not visited[adjacentNode]:
-                if self.__check_cycle_rec(visited, stack, adjacentNode):
-                    return True
-            elif stack[adjacentNode]:
-                return True
-
-        # The node needs to be popped from
-        # recursion stack before function ends
-        stack[vertex] = False
-        return False
+        visited = set()
+        for vertex in list(self.graph):
+            if vertex in visited:
+                continue
+            # the vertices on the stack are the current path, and on_stack
+            # holds their positions in it
+            visited.add(vertex)
+            stack = [(vertex, iter(self.graph.get(vertex, ())))]
+            on_stack = {vertex: 0}
+            while stack:
+                current, adjacent_nodes = stack[-1]
+                for adjacent_node in adjacent_nodes:
+                    if adjacent_node in on_stack:
+                        return [node for node, _ in stack[on_stack[adjacent_node]:]]
+                    if adjacent_node not in visited:
+                        visited.add(adjacent_node)
+                        on_stack[adjacent_node] = len(stack)
+                        stack.append((adjacent_node, iter(self.graph.get(adjacent_node, ()))))
+                        break
+                else:
+                    # The node needs to be popped from the
+                    # stack once all its adjacent nodes are done
+                    stack.pop()
+                    del on_stack[current]
+        return None
 
     @staticmethod
     def get_code():
@@ -388,30 +1351,39 @@ class CheckCycleUndirectedGraph(object):
         """
         This function will return True if graph is cyclic else return False
         """
-        # Marking all vertices as not visited
-        visited = [False] * len(self.graph)
-        for vertex in range(len(self.graph)):
-            # Call the recursive function only if not visited
-            if not visited[vertex]:
-                if self.__check_cycle_rec(visited, -1, vertex):
-                    return True
-        return False
-
-    def __check_cycle_rec(self, visited, parent, vertex):
-        """
-        Recursive function for finding the cycle
-        """
-        # Mark the current node in visited
-        visited[vertex] = True
-
-        # mark all adjacent nodes of the current node
-        for adjacentNode in self.graph[vertex]:
-            if not visited[adjacentNode]:
-                if self.__check_cycle_rec(visited, vertex, adjacentNode):
-                    return True
-            elif parent != adjacentNode:
-                return True
-        return False
+        return self.find_cycle() is not None
+
+    def find_cycle(self):
+        """
+        Finds a cycle with a depth first search that uses an explicit
+        stack, so deep graphs don't hit the recursion limit, and stops
+        at the first cycle found
+        :return: list of the vertices on a cycle, in order, or None
+        """
+        visited = set()
+        for vertex in list(self.graph):
+            if vertex in visited:
+                continue
+            # each entry is (vertex, the vertex it was reached from, its adjacent nodes left to visit)
+            visited.add(vertex)
+            stack = [(vertex, None, iter(self.graph[vertex]))]
+            on_stack = {vertex: 0}
+            while stack:
+                current, parent, adjacent_nodes = stack[-1]
+                for adjacent_node in adjacent_nodes:
+                    if adjacent_node not in visited:
+                        visited.add(adjacent_node)
+                        on_stack[adjacent_node] = len(stack)
+                        stack.append((adjacent_node, current, iter(self.graph[adjacent_node])))
+                        break
+                    if adjacent_node != parent:
+                        # an edge back to a vertex on the current path,
+                        # since every vertex below it is finished already
+                        return [node for node, _, _ in stack[on_stack[adjacent_node]:]]
+                else:
+                    stack.pop()
+                    del on_stack[current]
+        return None
 
     @staticmethod
     def get_code():
@@ -122,3 +122,184 @@ class Heap(queue.Queue):
         returns the code for the current class
         """
         return inspect.getsource(Heap)
+
+
+class IndexedHeap(object):
+    """
+    min-heap of hashable items keyed by a numeric priority, with
+    an index from each item to its position in the heap so the
+    priority of an item already in the heap can be lowered
+    (decrease-key) in O(log n) instead of searching for it and
+    rebuilding the heap.
+
+    Items with equal priority are popped in the order they were
+    pushed (or last had their priority changed).
+    """
+
+    def __init__(self):
+        # each entry is [priority, counter, item]; the counter breaks
+        # ties so that the items themselves never have to be compared
+        self.heap = []
+        self.position = {}
+        self.counter = 0
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, item):
+        return item in self.position
+
+    def is_empty(self):
+        """
+        checks if the heap is empty
+        """
+        return len(self.heap) == 0
+
+    def priority(self, item):
+        """
+        Returns the current priority of item, or None if
+        item is not in the heap.
+        """
+        idx = self.position.get(item, None)
+        if idx is None:
+            return None
+        return self.heap[idx][0]
+
+    def push(self, item, priority):
+        """
+        Inserts item with the given priority. Behavior is
+        undefined if item is already in the heap (see push_or_decrease)
+        """
+        entry = [priority, self.counter, item]
+        self.counter += 1
+        self.heap.append(entry)
+        self.position[item] = len(self.heap) - 1
+        self._sift_up(len(self.heap) - 1)
+
+    def peek(self):
+        """
+        Returns (item, priority) with the lowest priority without
+        removing it, or None if the heap is empty
+        """
+        if not self.heap:
+            return None
+        entry = self.heap[0]
+        return entry[2], entry[0]
+
+    def pop(self):
+        """
+        Removes and returns (item, priority) with the lowest priority,
+        or None if the heap is empty
+        """
+        if not self.heap:
+            return None
+        last = self.heap.pop()
+        if not self.heap:
+            del self.position[last[2]]
+            return last[2], last[0]
+
+        top = self.heap[0]
+        self.heap[0] = last
+        self.position[last[2]] = 0
+        del self.position[top[2]]
+        self._sift_down(0)
+        return top[2], top[0]
+
+    def decrease_key(self, item, priority):
+        """
+        Lowers the priority of an item already in the heap.
+        Returns True if the priority was lowered, False if
+        the new priority was not lower than the current one.
+
+        Worst Case: O(logn), item needs to be swapped throughout all levels of tree
+        """
+        idx = self.position[item]
+        entry = self.heap[idx]
+        if priority >= entry[0]:
+            return False
+        entry[0] = priority
+        entry[1] = self.counter
+        self.counter += 1
+        self._sift_up(idx)
+        return True
+
+    def push_or_decrease(self, item, priority):
+        """
+        Inserts item if it is not in the heap, otherwise lowers its
+        priority if the new priority is lower. Returns True if the
+        heap was modified.
+        """
+        if item in self.position:
+            return self.decrease_key(item, priority)
+        self.push(item, priority)
+        return True
+
+    def remove(self, item):
+        """
+        Removes item from the heap regardless of its position and
+        returns its priority
+        """
+        idx = self.position.pop(item)
+        entry = self.heap[idx]
+        last = self.heap.pop()
+        if idx < len(self.heap):
+            self.heap[idx] = last
+            self.position[last[2]] = idx
+            self._sift_up(idx)
+            self._sift_down(self.position[last[2]])
+        return entry[0]
+
+    def _sift_up(self, idx):
+        """
+        Moves the entry at idx toward the root until its parent
+        is not larger than it
+        """
+        heap = self.heap
+        position = self.position
+        entry = heap[idx]
+        key = (entry[0], entry[1])
+        while idx > 0:
+            parent_idx = (idx - 1) >> 1
+            parent = heap[parent_idx]
+            if key >= (parent[0], parent[1]):
+                break
+            heap[idx] = parent
+            position[parent[2]] = idx
+            idx = parent_idx
+        heap[idx] = entry
+        position[entry[2]] = idx
+
+    def _sift_down(self, idx):
+        """
+        Moves the entry at idx toward the leaves until neither
+        child is smaller than it
+        """
+        heap = self.heap
+        position = self.position
+        size = len(heap)
+        entry = heap[idx]
+        key = (entry[0], entry[1])
+        child_idx = 2 * idx + 1
+        while child_idx < size:
+            right_idx = child_idx + 1
+            if right_idx < size and (heap[right_idx][0], heap[right_idx][1]) < (heap[child_idx][0], heap[child_idx][1]):
+                child_idx = right_idx
+            child = heap[child_idx]
+            if key <= (child[0], child[1]):
+                break
+            heap[idx] = child
+            position[child[2]] = idx
+            idx = child_idx
+            child_idx = 2 * idx + 1
+        heap[idx] = entry
+        position[entry[2]] = idx
+
+    @staticmethod
+    def time_complexities():
+        return "[Push, Pop & Decrease-Key] Worst Case: O(logn), [Contains & Priority] O(1)"
+
+    def get_code(self):
+        """
+        returns the code for the current class
+        """
+        return inspect.getsource(IndexedHeap)
@@ -0,0 +1,116 @@
+"""
+Process Pool
+
+Runs one function over many items in several worker processes, with
+a value shared by every item (such as a graph) handed to each worker
+once when it starts rather than with every item. On platforms that
+fork, the shared value is simply inherited from the parent process,
+so it doesn't even need to be picklable. Used by
+pathfinding.batch.find_paths and connected_components.find_components.
+https://docs.python.org/3/library/multiprocessing.html
+"""
+import inspect
+import multiprocessing
+import os
+
+# The function and shared value of the worker process, set once by
+# _init_worker when the worker starts.
+_worker_state = None
+
+
+def _init_worker(function, shared):
+    """
+    Remembers the function and the value shared by every item in
+    this worker process. Meant for internal use.
+    """
+    global _worker_state
+    _worker_state = (function, shared)
+
+
+def _call_in_worker(item):
+    """
+    Calls the function set by _init_worker on one item. Meant for
+    internal use.
+    """
+    function, shared = _worker_state
+    return function(shared, item)
+
+
+def _get_context():
+    """
+    Prefers forking so the shared value is inherited by the workers
+    rather than pickled for each of them. Meant for internal use.
+    """
+    try:
+        return multiprocessing.get_context('fork')
+    except ValueError:
+        return multiprocessing.get_context()
+
+
+def worker_count(workers):
+    """
+    The number of processes to use for workers
+
+    :param workers: the number of processes, or None for one per CPU
+    :return: the number of processes, at least 1
+    """
+    if workers is None:
+        return os.cpu_count() or 1
+    return max(1, workers)
+
+
+def default_chunksize(count, workers):
+    """
+    The number of items to send to a worker at a time: a few chunks
+    per worker, so one slow chunk doesn't leave the others idle at
+    the end
+
+    :param count: the number of items
+    :param workers: the number of processes
+    :return: the chunk size, at least 1
+    """
+    return max(1, count // (workers * 4))
+
+
+def imap(function, shared, items, workers, chunksize=None, ordered=True):
+    """
+    Calls function(shared, item) for each item, in this process if there
+    is only one worker or one item and in a pool of worker processes
+    otherwise. The pool is closed once the results have all been read.
+
+    :param function: a module-level function taking (shared, item)
+    :param shared: the value passed to every call
+    :param items: the items
+    :param workers: the number of processes, or None for one per CPU
+    :param chunksize: the number of items sent to a worker at a time, defaults to default_chunksize
+    :param ordered: False to get the results as they are ready rather than in the order of items
+    :return: generator of the results
+    """
+    items = list(items)
+    workers = worker_count(workers)
+    if workers <= 1 or len(items) <= 1:
+        for item in items:
+            yield function(shared, item)
+        return
+
+    if chunksize is None:
+        chunksize = default_chunksize(len(items), workers)
+    pool = _get_context().Pool(workers, initializer=_init_worker, initargs=(function, shared))
+    try:
+        if ordered:
+            results = pool.imap(_call_in_worker, items, chunksize)
+        else:
+            results = pool.imap_unordered(_call_in_worker, items, chunksize)
+        for result in results:
+            yield result
+    finally:
+        pool.close()
+        pool.join()
+
+
+def get_code():
+    """
+    easily retrieve the source code
+    of the imap function
+    """
+    return inspect.getsource(imap)
@@ -180,9 +180,7 @@ class QuadTree(object):
         if self.children:
             raise ValueError("cannot split twice")
         
-        _cls = type(self)
-        def _cstr(r):
-            return _cls(self.bucket_size, self.max_depth, r, self.depth + 1)
+        _cstr = self._make_child
         
         _halfwidth = self.location.width / 2
         _halfheight = self.location.height / 2
@@ -207,6 +205,18 @@ class QuadTree(object):
         
         
     
+    def _make_child(self, location):
+        """
+        Create a node one level below this one, with the same settings.
+        Meant for internal use.
+        
+        :param location: where the child is located
+        :type location: :class:`pygorithm.geometry.rect2.Rect2`
+        :returns: the child
+        :rtype: :class:`.QuadTree`
+        """
+        return type(self)(self.bucket_size, self.max_depth, location, self.depth + 1)
+    
     def get_quadrant(self, entity):
         """
         Calculate the quadrant that the specified entity belongs to.
@@ -235,42 +245,42 @@ class QuadTree(object):
         """
         
         _aabb = entity.aabb
-        _halfwidth = self.location.width / 2
-        _halfheight = self.location.height / 2
-        _x = self.location.mincorner.x
-        _y = self.location.mincorner.y
-        
-        if math.isclose(_aabb.mincorner.x, _x + _halfwidth):
+        _location = self.location
+        _midx = _location.mincorner.x + _location.width / 2
+        _midy = _location.mincorner.y + _location.height / 2
+        _left = _aabb.mincorner.x
+        _right = _left + _aabb.width
+        _top = _aabb.mincorner.y
+        _bot = _top + _aabb.height
+        
+        if math.isclose(_left, _midx):
             return -1
-        if math.isclose(_aabb.mincorner.x + _aabb.width, _x + _halfwidth):
+        if math.isclose(_right, _midx):
             return -1
-        if math.isclose(_aabb.mincorner.y, _y + _halfheight):
+        if math.isclose(_top, _midy):
             return -1
-        if math.isclose(_aabb.mincorner.y + _aabb.height, _y + _halfheight):
+        if math.isclose(_bot, _midy):
             return -1
         
-        _leftside_isleft = _aabb.mincorner.x < _x + _halfwidth
-        _rightside_isleft = _aabb.mincorner.x + _aabb.width < _x + _halfwidth
+        _leftside_isleft = _left < _midx
+        _rightside_isleft = _right < _midx
         
         if _leftside_isleft != _rightside_isleft:
             return -1
         
-        _topside_istop = _aabb.mincorner.y < _y + _halfheight
-        _botside_istop = _aabb.mincorner.y + _aabb.height < _y + _halfheight
+        _topside_istop = _top < _midy
+        _botside_istop = _bot < _midy
         
         if _topside_istop != _botside_istop:
             return -1
-            
-        _left = _leftside_isleft
-        _top = _topside_istop
         
-        if _left:
-            if _top:
+        if _leftside_isleft:
+            if _topside_istop:
                 return 0
             else:
                 return 3
         else:
-            if _top:
+            if _topside_istop:
                 return 1
             else:
                 return 2
@@ -297,7 +307,203 @@ class QuadTree(object):
             self.entities.append(entity)
         else:
             self.children[quad].insert_and_think(entity)
-        
+
+    def build(self, entities):
+        """
+        Insert many entities at once.
+
+        The entities are added to this node, then every node with more than
+        :py:attr:`.bucket_size` entities (and less than :py:attr:`.max_depth`
+        deep) is split and its entities are passed to its children, one level
+        at a time. Each entity is placed once per level it moves down, instead
+        of being walked down from the top as with :py:meth:`.insert_and_think`.
+
+        This is implemented iteratively, so it does not need the tree to be empty
+        and will not exceed recursion depth.
+
+        :param entities: the entities to insert
+        :type entities: iterable of :class:`.QuadTreeEntity`
+        """
+        self.entities.extend(entities)
+
+        _stack = [self]
+        while _stack:
+            curr = _stack.pop()
+            if curr.children:
+                _newents = []
+                for ent in curr.entities:
+                    quad = curr.get_quadrant(ent)
+                    if quad < 0:
+                        _newents.append(ent)
+                    else:
+                        curr.children[quad].entities.append(ent)
+                curr.entities = _newents
+            elif curr.depth < curr.max_depth and len(curr.entities) > curr.bucket_size:
+                curr.split()
+
+            if curr.children:
+                _stack.extend(curr.children)
+
+    def _find_path(self, entity):
+        """
+        Find the nodes from this node down to the node holding entity.
+
+        The entity is looked for in the node its aabb places it in first, and
+        everywhere else only if it is not there (if its aabb was changed
+        without :py:meth:`.update`). Meant for internal use.
+
+        :param entity: the entity to find
+        :type entity: :class:`.QuadTreeEntity`
+        :returns: the nodes, starting with this one, or None if entity is not in this tree
+        :rtype: list of :class:`.QuadTree` or None
+        """
+        curr = self
+        _path = [self]
+        while curr.children:
+            quad = curr.get_quadrant(entity)
+            if quad < 0:
+                break
+            curr = curr.children[quad]
+            _path.append(curr)
+        if any(ent is entity for ent in curr.entities):
+            return _path
+
+        _stack = deque()
+        _stack.append([self])
+        while _stack:
+            _path = _stack.pop()
+            curr = _path[-1]
+            if any(ent is entity for ent in curr.entities):
+                return _path
+            if curr.children:
+                for child in curr.children:
+                    _stack.append(_path + [child])
+        return None
+
+    def _count_entities(self, limit):
+        """
+        Count the entities in this node and all lower nodes, stopping once
+        there are more than limit. Meant for internal use.
+
+        :param limit: the count to stop after
+        :type limit: int
+        :returns: the number of entities, or a number greater than limit
+        :rtype: int
+        """
+        _count = 0
+        _stack = [self]
+        while _stack and _count <= limit:
+            curr = _stack.pop()
+            _count += len(curr.entities)
+            if curr.children:
+                _stack.extend(curr.children)
+        return _count
+
+    def _merge_path(self, path):
+        """
+        Merge the children of the nodes on path into them, from the bottom
+        up, while a node and its descendants hold no more than
+        :py:attr:`.bucket_size` entities. Meant for internal use.
+
+        :param path: nodes, each the child of the one before
+        :type path: list of :class:`.QuadTree`
+        """
+        for curr in reversed(path):
+            if not curr.children:
+                continue
+            if curr._count_entities(curr.bucket_size) > curr.bucket_size:
+                # the nodes above hold at least as many
+                break
+
+            _ents = []
+            curr._iter_helper(lambda node, _ents=_ents: _ents.extend(node.entities))
+            curr.entities = _ents
+            curr.children = None
+
+    def remove(self, entity):
+        """
+        Remove the entity from this or the appropriate child.
+
+        The entity must have the aabb it was inserted with (see :py:meth:`.update`
+        to change it). Any node left holding no more than :py:attr:`.bucket_size`
+        entities in itself and its children is merged with its children.
+
+        :param entity: the entity to remove
+        :type entity: :class:`.QuadTreeEntity`
+        :returns: if the entity was found and removed
+        :rtype: bool
+        """
+        _path = self._find_path(entity)
+        if _path is None:
+            return False
+
+        _ents = _path[-1].entities
+        _ents.pop(next(i for i, ent in enumerate(_ents) if ent is entity))
+        self._merge_path(_path)
+        return True
+
+    def _contains_inside(self, aabb):
+        """
+        Determine if aabb is inside the location of this node without touching
+        its edges (as determined by :py:meth:`math.isclose`). Such an aabb does
+        not touch the lines of any node above this one, so it belongs in this
+        node or below it. Meant for internal use.
+
+        :param aabb: the axis-aligned bounding box
+        :type aabb: :class:`pygorithm.geometry.rect2.Rect2`
+        :returns: if aabb is inside this node
+        :rtype: bool
+        """
+        _location = self.location
+        _minx = _location.mincorner.x
+        _miny = _location.mincorner.y
+        _maxx = _minx + _location.width
+        _maxy = _miny + _location.height
+        _left = aabb.mincorner.x
+        _top = aabb.mincorner.y
+        _right = _left + aabb.width
+        _bot = _top + aabb.height
+
+        if not (_minx < _left and _right < _maxx and _miny < _top and _bot < _maxy):
+            return False
+        return not (math.isclose(_left, _minx) or math.isclose(_right, _maxx) or
+                    math.isclose(_top, _miny) or math.isclose(_bot, _maxy))
+
+    def update(self, entity, new_aabb):
+        """
+        Move the entity, which must be in this tree with its current aabb, to
+        new_aabb.
+
+        The entity stays in the node it is in if new_aabb is inside that node
+        and still belongs there (it overlaps the same lines, or the node has no
+        children), which is checked without walking the tree again. Otherwise
+        it is inserted again from the top, and nodes left with few enough
+        entities are merged as with :py:meth:`.remove`.
+
+        :param entity: the entity to move
+        :type entity: :class:`.QuadTreeEntity`
+        :param new_aabb: the new axis-aligned bounding box of entity
+        :type new_aabb: :class:`pygorithm.geometry.rect2.Rect2`
+        :returns: if the entity was inserted again
+        :rtype: bool
+        :raises ValueError: if entity is not in this tree
+        """
+        _path = self._find_path(entity)
+        if _path is None:
+            raise ValueError("entity is not in this quadtree")
+
+        curr = _path[-1]
+        entity.aabb = new_aabb
+        if curr is self or curr._contains_inside(new_aabb):
+            if not curr.children or curr.get_quadrant(entity) < 0:
+                return False
+
+        _ents = curr.entities
+        _ents.pop(next(i for i, ent in enumerate(_ents) if ent is entity))
+        self.insert_and_think(entity)
+        self._merge_path(_path)
+        return True
+
     def retrieve_collidables(self, entity, predicate = None):
         """
         Find all entities that could collide with the specified entity.
@@ -332,6 +538,38 @@ class QuadTree(object):
         
         return result
         
+    def find_all_pairs(self):
+        """
+        Find every pair of entities that could collide with each other.
+
+        Two entities could collide if they are in the same node, or one is in
+        a node above the other's. These are the pairs found by calling
+        :py:meth:`.retrieve_collidables` for every entity, but each pair is
+        found once, an entity is never paired with itself, and every node is
+        visited once instead of once per entity below it.
+
+        This is implemented iteratively.
+
+        :returns: generator of (entity, entity) pairs
+        :rtype: generator of (:class:`.QuadTreeEntity`, :class:`.QuadTreeEntity`)
+        """
+        # stack will be (quadtree, list of the entities in the nodes above it)
+        _stack = deque()
+        _stack.append((self, []))
+        while _stack:
+            curr, above = _stack.pop()
+            _ents = curr.entities
+            for i, ent in enumerate(_ents):
+                for other in above:
+                    yield other, ent
+                for j in range(i + 1, len(_ents)):
+                    yield ent, _ents[j]
+
+            if curr.children:
+                _above = above + _ents if _ents else above
+                for child in curr.children:
+                    _stack.append((child, _above))
+
     def _iter_helper(self, pred):
         """
         Calls pred on each child and childs child, iteratively.
@@ -559,4 +797,274 @@ class QuadTree(object):
         :returns: code for QuadTree
         :rtype: string
         """
-        return inspect.getsource(QuadTree)
\ No newline at end of file
+        return inspect.getsource(QuadTree)
+
+
+class LooseQuadTree(QuadTree):
+    """
+    A loose quadtree is a quadtree where the bounds each node accepts entities
+    in (its loose bounds) are its location grown around its center by
+    :py:attr:`.looseness`, so the loose bounds of siblings overlap. An entity is
+    placed in the child containing its center, as long as it fits in that
+    child's loose bounds.
+    
+    In a :class:`.QuadTree` any entity touching a line of a split stays above it,
+    however small it is, so entities pile up in the nodes near the top. In a
+    loose quadtree the depth of an entity only depends on its size: with a
+    looseness of 2, an entity fits in any node at least twice its size. The
+    cost is that the loose bounds of a node overlap those of its neighbors, so
+    a search visits every node whose loose bounds touch what it looks for.
+    
+    All the operations of :class:`.QuadTree` work the same way, and use the
+    loose bounds in place of the location where that matters.
+    
+    :ivar looseness: how many times the width and height of its location a node accepts entities in (at least 1)
+    :type looseness: :class:`numbers.Number`
+    """
+    
+    def __init__(self, bucket_size, max_depth, location, depth = 0, entities = None, looseness = 2):
+        """
+        Initialize a new loose quad tree. 
+        
+        :param bucket_size: the number of entities in this quadtree 
+        :type bucket_size: int
+        :param max_depth: the maximum depth for automatic splitting 
+        :type max_depth: int
+        :param location: where this quadtree is located
+        :type location: :class:`pygorithm.geometry.rect2.Rect2`
+        :param depth: the depth of this node
+        :type depth: int
+        :param entities: the entities to initialize this quadtree with 
+        :type entities: list of :class:`.QuadTreeEntity` or None for empty list
+        :param looseness: how many times the width and height of location this node accepts entities in
+        :type looseness: :class:`numbers.Number`
+        :raises ValueError: if looseness is less than 1
+        """
+        if looseness < 1:
+            raise ValueError("looseness must be at least 1")
+        
+        super(LooseQuadTree, self).__init__(bucket_size, max_depth, location, depth, entities)
+        self.looseness = looseness
+        
+        _marginx = location.width * (looseness - 1) / 2
+        _marginy = location.height * (looseness - 1) / 2
+        _x = location.mincorner.x
+        _y = location.mincorner.y
+        # (min x, min y, max x, max y) of the loose bounds
+        self._loose = (_x - _marginx, _y - _marginy, _x + location.width + _marginx, _y + location.height + _marginy)
+    
+    def _make_child(self, location):
+        """
+        Create a node one level below this one, with the same settings.
+        Meant for internal use.
+        
+        :param location: where the child is located
+        :type location: :class:`pygorithm.geometry.rect2.Rect2`
+        :returns: the child
+        :rtype: :class:`.LooseQuadTree`
+        """
+        return type(self)(self.bucket_size, self.max_depth, location, self.depth + 1, looseness=self.looseness)
+    
+    def get_quadrant(self, entity):
+        """
+        Calculate the quadrant that the specified entity belongs to.
+        
+        The quadrant is the one containing the center of the entity (the
+        right or bottom one if the center is on a line). If the entity does not
+        fit in the loose bounds of that quadrant's child, it belongs in this node.
+        
+        Quadrants are:
+        
+         - -1: None (it does not fit in the quadrant of its center)
+         -  0: Top-left
+         -  1: Top-right
+         -  2: Bottom-right
+         -  3: Bottom-left
+         
+        .. caution::
+            
+            This function does not verify the entity is contained in this quadtree.
+        
+        This operation takes O(1) time.
+        
+        :param entity: the entity to place
+        :type entity: :class:`.QuadTreeEntity`
+        :returns: quadrant
+        :rtype: int
+        """
+        _aabb = entity.aabb
+        _location = self.location
+        _halfwidth = _location.width / 2
+        _halfheight = _location.height / 2
+        _midx = _location.mincorner.x + _halfwidth
+        _midy = _location.mincorner.y + _halfheight
+        _left = _aabb.mincorner.x
+        _top = _aabb.mincorner.y
+        _right = _left + _aabb.width
+        _bot = _top + _aabb.height
+        
+        _isleft = (_left + _right) / 2 < _midx
+        _istop = (_top + _bot) / 2 < _midy
+        
+        _childx = _midx - _halfwidth if _isleft else _midx
+        _childy = _midy - _halfheight if _istop else _midy
+        _marginx = _halfwidth * (self.looseness - 1) / 2
+        _marginy = _halfheight * (self.looseness - 1) / 2
+        if _left < _childx - _marginx or _right > _childx + _halfwidth + _marginx:
+            return -1
+        if _top < _childy - _marginy or _bot > _childy + _halfheight + _marginy:
+            return -1
+        
+        if _isleft:
+            return 0 if _istop else 3
+        else:
+            return 1 if _istop else 2
+    
+    def _contains_inside(self, aabb):
+        """
+        Determine if an entity with aabb belongs in this node or below it: its
+        center is in the location of this node, and it fits in the loose bounds.
+        Meant for internal use.
+
+        :param aabb: the axis-aligned bounding box
+        :type aabb: :class:`pygorithm.geometry.rect2.Rect2`
+        :returns: if aabb belongs in this node
+        :rtype: bool
+        """
+        _location = self.location
+        _left = aabb.mincorner.x
+        _top = aabb.mincorner.y
+        _right = _left + aabb.width
+        _bot = _top + aabb.height
+        _centerx = (_left + _right) / 2
+        _centery = (_top + _bot) / 2
+        
+        if not (_location.mincorner.x <= _centerx < _location.mincorner.x + _location.width):
+            return False
+        if not (_location.mincorner.y <= _centery < _location.mincorner.y + _location.height):
+            return False
+        _minx, _miny, _maxx, _maxy = self._loose
+        return _minx <= _left and _right <= _maxx and _miny <= _top and _bot <= _maxy
+    
+    @staticmethod
+    def _touches(first, second):
+        """
+        Determine if two (min x, min y, max x, max y) bounds touch or overlap.
+        Meant for internal use.
+        
+        :returns: if they touch or overlap
+        :rtype: bool
+        """
+        return first[0] <= second[2] and second[0] <= first[2] and first[1] <= second[3] and second[1] <= first[3]
+    
+    def retrieve_collidables(self, entity, predicate = None):
+        """
+        Find all entities that could collide with the specified entity: those in
+        every node whose loose bounds touch its aabb.
+        
+        .. warning::
+            
+            If entity is, itself, in the quadtree, it will be returned. The 
+            predicate may be used to prevent this using your preferred equality
+            method.
+            
+        This is implemented iteratively.
+        
+        :param entity: the entity to find collidables for
+        :type entity: :class:`.QuadTreeEntity`
+        :param predicate: the predicate
+        :type predicate: :class:`types.FunctionType` or None
+        :returns: potential collidables (never `None)
+        :rtype: list of :class:`.QuadTreeEntity`
+        """
+        _aabb = entity.aabb
+        _bounds = (_aabb.mincorner.x, _aabb.mincorner.y, _aabb.mincorner.x + _aabb.width, _aabb.mincorner.y + _aabb.height)
+        
+        result = []
+        _stack = [self]
+        while _stack:
+            curr = _stack.pop()
+            result.extend(filter(predicate, curr.entities))
+            if curr.children:
+                for child in curr.children:
+                    if self._touches(_bounds, child._loose):
+                        _stack.append(child)
+        return result
+    
+    def find_all_pairs(self):
+        """
+        Find every pair of entities that could collide with each other: those in
+        the same node, or in nodes whose loose bounds touch.
+        
+        Each pair is found once and an entity is never paired with itself. Pairs
+        of nodes are only compared if their parents' loose bounds touch, so
+        the nodes far away from each other are never compared.
+        
+        This is implemented iteratively.
+        
+        :returns: generator of (entity, entity) pairs
+        :rtype: generator of (:class:`.QuadTreeEntity`, :class:`.QuadTreeEntity`)
+        """
+        _touches = self._touches
+        
+        # stack will be one of:
+        #  (node, None): pairs within node and below it
+        #  (node, other): pairs of an entity of node or below with one of other or below,
+        #                 where neither is above the other
+        #  (node, [above]): pairs of an entity of above with one of node or below, where
+        #                   above is a node higher up
+        _stack = deque()
+        _stack.append((self, None))
+        while _stack:
+            curr, other = _stack.pop()
+            _ents = curr.entities
+            
+            if other is None:
+                for i, ent in enumerate(_ents):
+                    for j in range(i + 1, len(_ents)):
+                        yield ent, _ents[j]
+                if curr.children:
+                    _children = curr.children
+                    for i, child in enumerate(_children):
+                        _stack.append((child, None))
+                        if _ents:
+                            _stack.append((child, [curr]))
+                        for j in range(i + 1, len(_children)):
+                            _stack.append((child, _children[j]))
+            elif isinstance(other, list):
+                above = other[0]
+                if not _touches(above._loose, curr._loose):
+                    continue
+                for ent in above.entities:
+                    for other_ent in _ents:
+                        yield ent, other_ent
+                if curr.children:
+                    for child in curr.children:
+                        _stack.append((child, other))
+            else:
+                if not _touches(curr._loose, other._loose):
+                    continue
+                _other_ents = other.entities
+                for ent in _ents:
+                    for other_ent in _other_ents:
+                        yield ent, other_ent
+                if other.children and _ents:
+                    for child in other.children:
+                        _stack.append((child, [curr]))
+                if curr.children:
+                    for child in curr.children:
+                        if _other_ents:
+                            _stack.append((child, [other]))
+                        if other.children:
+                            for other_child in other.children:
+                                _stack.append((child, other_child))
+    
+    @staticmethod
+    def get_code():
+        """
+        Get the code for the LooseQuadTree class
+        
+        :returns: code for LooseQuadTree
+        :rtype: string
+        """
+        return inspect.getsource(LooseQuadTree)
@@ -6,11 +6,15 @@ from . import axisall
 from . import line2
 from . import polygon2
 from . import rect_broad_phase
+from . import sweep_and_prune
+from . import spatial_hash_grid
 
 __all__ = [
     'vector2',
     'axisall',
     'line2',
     'polygon2',
-    'rect_broad_phase'
+    'rect_broad_phase',
+    'sweep_and_prune',
+    'spatial_hash_grid'
 ]
\ No newline at end of file
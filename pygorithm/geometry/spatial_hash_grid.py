@@ -0,0 +1,278 @@
+"""
+Spatial Hash Grid
+
+Defines a broad phase that divides the plane into square cells of one
+size and keeps, for each cell that has any, the entities whose
+axis-aligned bounding boxes touch it. Cells are found by their integer
+coordinates in a dictionary, so the grid is unbounded and only uses
+memory for occupied cells. When entities are about the size of a cell
+each is in one to four cells, and finding what is near an entity only
+looks at those cells instead of descending a tree.
+
+The entities are the same as for :class:`pygorithm.data_structures.quadtree.QuadTree`:
+any object with an ``aabb`` (a :class:`pygorithm.geometry.rect2.Rect2`).
+"""
+
+import inspect
+import math
+
+
+class SpatialHashGrid(object):
+    """
+    A uniform grid of square cells keyed by integer cell coordinates.
+
+    The cell at (i, j) covers x from i * cell_size to (i + 1) * cell_size
+    and y from j * cell_size to (j + 1) * cell_size, edges included, so
+    boxes that only touch share a cell. Touching boxes are considered
+    overlapping, as in :py:meth:`pygorithm.geometry.rect2.Rect2.find_intersection`.
+
+    :ivar cell_size: the width and height of each cell
+    :type cell_size: :class:`numbers.Number`
+    """
+
+    def __init__(self, cell_size):
+        """
+        Create a new, empty spatial hash grid.
+
+        A cell size about as large as most entities works best: much smaller
+        puts each entity in many cells, much larger puts many entities that
+        are not near each other in the same cell.
+
+        :param cell_size: the width and height of each cell
+        :type cell_size: :class:`numbers.Number`
+        :raises ValueError: if cell_size is not positive
+        """
+        if cell_size <= 0:
+            raise ValueError("cell_size must be positive but is {}".format(cell_size))
+
+        self.cell_size = cell_size
+        # (i, j) -> entities touching that cell
+        self._cells = {}
+        # entity -> (min i, min j, max i, max j) of the cells it touches
+        self._ranges = {}
+
+    def __len__(self):
+        """
+        Get the number of entities in this grid
+
+        :returns: number of entities
+        :rtype: int
+        """
+        return len(self._ranges)
+
+    def _cell_range(self, aabb):
+        """
+        The (min i, min j, max i, max j) of the cells aabb touches. Meant for
+        internal use.
+        """
+        _size = self.cell_size
+        _x = aabb.mincorner.x
+        _y = aabb.mincorner.y
+        return (int(math.floor(_x / _size)), int(math.floor(_y / _size)),
+                int(math.floor((_x + aabb.width) / _size)), int(math.floor((_y + aabb.height) / _size)))
+
+    def _place(self, entity, cell_range):
+        """
+        Add entity to every cell of cell_range. Meant for internal use.
+        """
+        _cells = self._cells
+        _mini, _minj, _maxi, _maxj = cell_range
+        for i in range(_mini, _maxi + 1):
+            for j in range(_minj, _maxj + 1):
+                _cell = _cells.get((i, j), None)
+                if _cell is None:
+                    _cells[(i, j)] = [entity]
+                else:
+                    _cell.append(entity)
+
+    def _unplace(self, entity, cell_range):
+        """
+        Remove entity from every cell of cell_range, forgetting cells that
+        become empty. Meant for internal use.
+        """
+        _cells = self._cells
+        _mini, _minj, _maxi, _maxj = cell_range
+        for i in range(_mini, _maxi + 1):
+            for j in range(_minj, _maxj + 1):
+                _cell = _cells[(i, j)]
+                if len(_cell) == 1:
+                    del _cells[(i, j)]
+                else:
+                    _cell.remove(entity)
+
+    @staticmethod
+    def _touches(aabb, minx, miny, maxx, maxy):
+        """
+        Determine if aabb overlaps or touches the box from (minx, miny) to
+        (maxx, maxy). Meant for internal use.
+        """
+        _x = aabb.mincorner.x
+        _y = aabb.mincorner.y
+        return not (_x > maxx or _x + aabb.width < minx or _y > maxy or _y + aabb.height < miny)
+
+    def insert(self, entity):
+        """
+        Insert the entity into every cell its box touches.
+
+        :param entity: the entity to insert
+        :type entity: :class:`pygorithm.data_structures.quadtree.QuadTreeEntity`
+        :raises ValueError: if entity is already in this grid
+        """
+        if entity in self._ranges:
+            raise ValueError("entity is already in this grid")
+
+        _range = self._cell_range(entity.aabb)
+        self._ranges[entity] = _range
+        self._place(entity, _range)
+
+    def build(self, entities):
+        """
+        Insert many entities.
+
+        :param entities: the entities to insert
+        :type entities: iterable of :class:`pygorithm.data_structures.quadtree.QuadTreeEntity`
+        :raises ValueError: if an entity is already in this grid
+        """
+        for entity in entities:
+            self.insert(entity)
+
+    def remove(self, entity):
+        """
+        Remove the entity.
+
+        :param entity: the entity to remove
+        :type entity: :class:`pygorithm.data_structures.quadtree.QuadTreeEntity`
+        :returns: if the entity was found and removed
+        :rtype: bool
+        """
+        _range = self._ranges.pop(entity, None)
+        if _range is None:
+            return False
+
+        self._unplace(entity, _range)
+        return True
+
+    def update(self, entity, new_aabb):
+        """
+        Move the entity to new_aabb. It only changes cells if the cells its box
+        touches change, so small moves within a cell only set its aabb.
+
+        :param entity: the entity to move
+        :type entity: :class:`pygorithm.data_structures.quadtree.QuadTreeEntity`
+        :param new_aabb: the new axis-aligned bounding box of entity
+        :type new_aabb: :class:`pygorithm.geometry.rect2.Rect2`
+        :returns: if the entity changed cells
+        :rtype: bool
+        :raises ValueError: if entity is not in this grid
+        """
+        _old = self._ranges.get(entity, None)
+        if _old is None:
+            raise ValueError("entity is not in this grid")
+
+        entity.aabb = new_aabb
+        _new = self._cell_range(new_aabb)
+        if _new == _old:
+            return False
+
+        self._unplace(entity, _old)
+        self._ranges[entity] = _new
+        self._place(entity, _new)
+        return True
+
+    def retrieve_region(self, aabb, predicate = None):
+        """
+        Find all entities whose boxes overlap or touch aabb.
+
+        :param aabb: the region to search
+        :type aabb: :class:`pygorithm.geometry.rect2.Rect2`
+        :param predicate: takes the entity being considered and returns False if it should never be returned
+        :type predicate: :class:`types.FunctionType` or None
+        :returns: entities in the region, each once (never `None`)
+        :rtype: list of :class:`pygorithm.data_structures.quadtree.QuadTreeEntity`
+        """
+        _minx = aabb.mincorner.x
+        _miny = aabb.mincorner.y
+        _maxx = _minx + aabb.width
+        _maxy = _miny + aabb.height
+        _mini, _minj, _maxi, _maxj = self._cell_range(aabb)
+        _cells = self._cells
+        _touches = self._touches
+
+        result = []
+        _seen = set()
+        for i in range(_mini, _maxi + 1):
+            for j in range(_minj, _maxj + 1):
+                _cell = _cells.get((i, j), None)
+                if _cell is None:
+                    continue
+                for _other in _cell:
+                    if _other in _seen:
+                        continue
+                    _seen.add(_other)
+                    if not _touches(_other.aabb, _minx, _miny, _maxx, _maxy):
+                        continue
+                    if predicate is None or predicate(_other):
+                        result.append(_other)
+        return result
+
+    def retrieve_collidables(self, entity, predicate = None):
+        """
+        Find all entities whose boxes overlap or touch the box of the specified
+        entity, which does not need to be in this grid.
+
+        .. warning::
+
+            If entity is, itself, in this grid, it will be returned, as
+            with :py:meth:`pygorithm.data_structures.quadtree.QuadTree.retrieve_collidables`.
+
+        :param entity: the entity to find collidables for
+        :type entity: :class:`pygorithm.data_structures.quadtree.QuadTreeEntity`
+        :param predicate: takes the entity being considered and returns False if it should never be returned
+        :type predicate: :class:`types.FunctionType` or None
+        :returns: potential collidables (never `None`)
+        :rtype: list of :class:`pygorithm.data_structures.quadtree.QuadTreeEntity`
+        """
+        return self.retrieve_region(entity.aabb, predicate)
+
+    def find_all_pairs(self):
+        """
+        Find every pair of entities whose boxes overlap or touch.
+
+        Two entities in more than one of the same cells are only compared in
+        the first of them (the one with the lowest coordinates), so each pair
+        is found once without remembering the pairs already found.
+
+        :returns: generator of (entity, entity) pairs
+        :rtype: generator of (:class:`pygorithm.data_structures.quadtree.QuadTreeEntity`, :class:`pygorithm.data_structures.quadtree.QuadTreeEntity`)
+        """
+        _ranges = self._ranges
+        for (i, j), _cell in self._cells.items():
+            _count = len(_cell)
+            if _count < 2:
+                continue
+            for _first_index in range(_count - 1):
+                _first = _cell[_first_index]
+                _first_range = _ranges[_first]
+                _aabb = _first.aabb
+                _minx = _aabb.mincorner.x
+                _miny = _aabb.mincorner.y
+                _maxx = _minx + _aabb.width
+                _maxy = _miny + _aabb.height
+                for _second_index in range(_first_index + 1, _count):
+                    _second = _cell[_second_index]
+                    _second_range = _ranges[_second]
+                    # the first cell shared by both
+                    if max(_first_range[0], _second_range[0]) != i or max(_first_range[1], _second_range[1]) != j:
+                        continue
+                    if self._touches(_second.aabb, _minx, _miny, _maxx, _maxy):
+                        yield _first, _second
+
+    @staticmethod
+    def get_code():
+        """
+        Get the code for the SpatialHashGrid class
+
+        :returns: code for SpatialHashGrid
+        :rtype: string
+        """
+        return inspect.getsource(SpatialHashGrid)
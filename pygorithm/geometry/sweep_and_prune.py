@@ -0,0 +1,387 @@
+"""
+Sweep and Prune
+
+Defines a broad phase that keeps the ends of the axis-aligned bounding
+boxes of entities sorted along one or two axes. Two boxes can only
+overlap if their intervals overlap on every axis, which is found by
+sweeping the sorted ends. Moving an entity re-sorts its ends with an
+insertion sort, which only moves them past the ends they actually
+crossed, so when things move a little each frame keeping the lists
+sorted is nearly linear.
+
+The entities are the same as for :class:`pygorithm.data_structures.quadtree.QuadTree`:
+any object with an ``aabb`` (a :class:`pygorithm.geometry.rect2.Rect2`).
+"""
+
+import inspect
+
+
+class _Endpoint(object):
+    """
+    One end of the interval of an entity on one axis. Meant for internal use.
+
+    :ivar value: the coordinate of this end
+    :ivar is_max: 0 for the lower end, 1 for the upper end (so at the same value, lower ends sort first)
+    :ivar owner: the number of the entity
+    :ivar index: the position of this end in its axis list
+    """
+    __slots__ = ('value', 'is_max', 'owner', 'index')
+
+    def __init__(self, value, is_max, owner):
+        self.value = value
+        self.is_max = is_max
+        self.owner = owner
+        self.index = -1
+
+
+class SweepAndPrune(object):
+    """
+    A sweep and prune broad phase.
+
+    With two axes, the overlapping pairs are kept up to date as entities are
+    inserted, moved and removed: when an end passes an end of another entity
+    on either axis, whether the two overlap is checked again. With one axis
+    (x), only the x ends are kept sorted and the pairs are found by sweeping
+    them when asked for, checking y directly.
+
+    Touching boxes are considered overlapping, as in
+    :py:meth:`pygorithm.geometry.rect2.Rect2.find_intersection`.
+
+    :ivar axes: the number of axes kept sorted, 1 or 2
+    :type axes: int
+    """
+
+    def __init__(self, axes = 2):
+        """
+        Create a new, empty sweep and prune broad phase.
+
+        :param axes: the number of axes to keep sorted, 1 (x) or 2 (x and y)
+        :type axes: int
+        :raises ValueError: if axes is not 1 or 2
+        """
+        if axes not in (1, 2):
+            raise ValueError("axes must be 1 or 2")
+
+        self.axes = axes
+        # the ends on each axis, sorted by (value, is_max)
+        self._lists = [[] for _ in range(axes)]
+        # entity number -> entity, and entity -> its number
+        self._entities = {}
+        self._numbers = {}
+        # entity number -> its ends, (min, max) for each axis
+        self._ends = {}
+        # entity number -> numbers of the entities it overlaps (two axes only)
+        self._partners = {}
+        self._next_number = 0
+
+    def __len__(self):
+        """
+        Get the number of entities in this broad phase
+
+        :returns: number of entities
+        :rtype: int
+        """
+        return len(self._entities)
+
+    @staticmethod
+    def _bounds(aabb):
+        """
+        The (min x, max x, min y, max y) of aabb. Meant for internal use.
+        """
+        _x = aabb.mincorner.x
+        _y = aabb.mincorner.y
+        return (_x, _x + aabb.width, _y, _y + aabb.height)
+
+    def _overlaps(self, first, second):
+        """
+        Determine if the boxes of two entity numbers overlap (or touch) on every
+        axis, from the values of their ends. Meant for internal use.
+        """
+        _first = self._ends[first]
+        _second = self._ends[second]
+        if _first[0].value > _second[1].value or _second[0].value > _first[1].value:
+            return False
+        if self.axes == 1:
+            _firstaabb = self._entities[first].aabb
+            _secondaabb = self._entities[second].aabb
+            return (_firstaabb.mincorner.y <= _secondaabb.mincorner.y + _secondaabb.height and
+                    _secondaabb.mincorner.y <= _firstaabb.mincorner.y + _firstaabb.height)
+        return not (_first[2].value > _second[3].value or _second[2].value > _first[3].value)
+
+    def _pass(self, first, second):
+        """
+        Check the entity numbers first and second again after an end of one
+        passed an end of the other, adding or removing their pair. Meant for
+        internal use.
+        """
+        if self._overlaps(first, second):
+            self._partners[first].add(second)
+            self._partners[second].add(first)
+        else:
+            self._partners[first].discard(second)
+            self._partners[second].discard(first)
+
+    def _sift(self, axis, endpoint):
+        """
+        Move endpoint to its place in the sorted list of axis, one neighbor
+        at a time (an insertion sort), checking the pairs of the ends of lower
+        and upper kind it passes. Meant for internal use.
+        """
+        _list = self._lists[axis]
+        _track = self.axes == 2
+        _value = endpoint.value
+        _is_max = endpoint.is_max
+        i = endpoint.index
+
+        while i > 0:
+            _other = _list[i - 1]
+            if _other.value < _value or (_other.value == _value and _other.is_max <= _is_max):
+                break
+            _list[i] = _other
+            _other.index = i
+            if _track and _other.is_max != _is_max and _other.owner != endpoint.owner:
+                self._pass(endpoint.owner, _other.owner)
+            i -= 1
+
+        if i == endpoint.index:
+            _last = len(_list) - 1
+            while i < _last:
+                _other = _list[i + 1]
+                if _other.value > _value or (_other.value == _value and _other.is_max >= _is_max):
+                    break
+                _list[i] = _other
+                _other.index = i
+                if _track and _other.is_max != _is_max and _other.owner != endpoint.owner:
+                    self._pass(endpoint.owner, _other.owner)
+                i += 1
+
+        _list[i] = endpoint
+        endpoint.index = i
+
+    def _add(self, entity):
+        """
+        Number entity and create its ends, without placing them in the axis
+        lists. Meant for internal use.
+
+        :returns: the number of entity
+        :rtype: int
+        """
+        if entity in self._numbers:
+            raise ValueError("entity is already in this broad phase")
+
+        _number = self._next_number
+        self._next_number += 1
+        self._entities[_number] = entity
+        self._numbers[entity] = _number
+        self._partners[_number] = set()
+
+        _bounds = self._bounds(entity.aabb)
+        self._ends[_number] = [_Endpoint(_bounds[i], i % 2, _number) for i in range(2 * self.axes)]
+        return _number
+
+    def insert(self, entity):
+        """
+        Insert the entity, finding the entities it overlaps.
+
+        :param entity: the entity to insert
+        :type entity: :class:`pygorithm.data_structures.quadtree.QuadTreeEntity`
+        :raises ValueError: if entity is already in this broad phase
+        """
+        _number = self._add(entity)
+        _ends = self._ends[_number]
+        for axis in range(self.axes):
+            _list = self._lists[axis]
+            # from the end of the list, the lower end passes every upper end
+            # above it, so every entity it overlaps on this axis is checked
+            for endpoint in (_ends[2 * axis], _ends[2 * axis + 1]):
+                endpoint.index = len(_list)
+                _list.append(endpoint)
+                self._sift(axis, endpoint)
+
+    def build(self, entities):
+        """
+        Insert many entities at once.
+
+        The ends are sorted with one sort per axis and the overlapping pairs are
+        found with one sweep, instead of inserting the entities one at a time.
+
+        :param entities: the entities to insert
+        :type entities: iterable of :class:`pygorithm.data_structures.quadtree.QuadTreeEntity`
+        :raises ValueError: if an entity is already in this broad phase
+        """
+        for entity in entities:
+            _number = self._add(entity)
+            _ends = self._ends[_number]
+            for axis in range(self.axes):
+                self._lists[axis].append(_ends[2 * axis])
+                self._lists[axis].append(_ends[2 * axis + 1])
+
+        for _list in self._lists:
+            _list.sort(key=lambda endpoint: (endpoint.value, endpoint.is_max))
+            for i, endpoint in enumerate(_list):
+                endpoint.index = i
+
+        if self.axes == 2:
+            for _number in self._partners:
+                self._partners[_number].clear()
+            for first, second in self._sweep():
+                self._partners[first].add(second)
+                self._partners[second].add(first)
+
+    def remove(self, entity):
+        """
+        Remove the entity.
+
+        :param entity: the entity to remove
+        :type entity: :class:`pygorithm.data_structures.quadtree.QuadTreeEntity`
+        :returns: if the entity was found and removed
+        :rtype: bool
+        """
+        _number = self._numbers.pop(entity, None)
+        if _number is None:
+            return False
+
+        for axis in range(self.axes):
+            _list = self._lists[axis]
+            _ends = self._ends[_number]
+            _lowest = _ends[2 * axis].index
+            del _list[_ends[2 * axis + 1].index]
+            del _list[_lowest]
+            for i in range(_lowest, len(_list)):
+                _list[i].index = i
+
+        for _partner in self._partners.pop(_number):
+            self._partners[_partner].discard(_number)
+        del self._ends[_number]
+        del self._entities[_number]
+        return True
+
+    def update(self, entity, new_aabb):
+        """
+        Move the entity to new_aabb, re-sorting its ends and updating the pairs
+        it is in.
+
+        :param entity: the entity to move
+        :type entity: :class:`pygorithm.data_structures.quadtree.QuadTreeEntity`
+        :param new_aabb: the new axis-aligned bounding box of entity
+        :type new_aabb: :class:`pygorithm.geometry.rect2.Rect2`
+        :raises ValueError: if entity is not in this broad phase
+        """
+        _number = self._numbers.get(entity, None)
+        if _number is None:
+            raise ValueError("entity is not in this broad phase")
+
+        entity.aabb = new_aabb
+        _bounds = self._bounds(new_aabb)
+        _ends = self._ends[_number]
+        for i, endpoint in enumerate(_ends):
+            endpoint.value = _bounds[i]
+
+        for axis in range(self.axes):
+            _min = _ends[2 * axis]
+            _max = _ends[2 * axis + 1]
+            # move the leading end first, so the two never pass each other
+            if _list_moves_up(self._lists[axis], _max):
+                self._sift(axis, _max)
+                self._sift(axis, _min)
+            else:
+                self._sift(axis, _min)
+                self._sift(axis, _max)
+
+    def _sweep(self):
+        """
+        Find the pairs of entity numbers overlapping on every axis by sweeping
+        the sorted x ends. Meant for internal use.
+
+        :returns: generator of (number, number) pairs
+        """
+        _active = {}
+        _overlaps = self._overlaps
+        for endpoint in self._lists[0]:
+            _owner = endpoint.owner
+            if endpoint.is_max:
+                del _active[_owner]
+            else:
+                for _other in _active:
+                    if _overlaps(_other, _owner):
+                        yield _other, _owner
+                _active[_owner] = True
+
+    def find_all_pairs(self):
+        """
+        Find every pair of entities whose boxes overlap or touch.
+
+        With two axes this lists the pairs kept up to date, otherwise it sweeps
+        the x ends. Each pair is found once.
+
+        :returns: generator of (entity, entity) pairs
+        :rtype: generator of (:class:`pygorithm.data_structures.quadtree.QuadTreeEntity`, :class:`pygorithm.data_structures.quadtree.QuadTreeEntity`)
+        """
+        _entities = self._entities
+        if self.axes == 2:
+            for first, partners in self._partners.items():
+                for second in partners:
+                    if first < second:
+                        yield _entities[first], _entities[second]
+        else:
+            for first, second in self._sweep():
+                yield _entities[first], _entities[second]
+
+    def retrieve_collidables(self, entity, predicate = None):
+        """
+        Find all entities whose boxes overlap or touch the box of the specified
+        entity, which does not need to be in this broad phase.
+
+        .. warning::
+
+            If entity is, itself, in this broad phase, it will be returned, as
+            with :py:meth:`pygorithm.data_structures.quadtree.QuadTree.retrieve_collidables`.
+
+        :param entity: the entity to find collidables for
+        :type entity: :class:`pygorithm.data_structures.quadtree.QuadTreeEntity`
+        :param predicate: takes the entity being considered and returns False if it should never be returned
+        :type predicate: :class:`types.FunctionType` or None
+        :returns: potential collidables (never `None`)
+        :rtype: list of :class:`pygorithm.data_structures.quadtree.QuadTreeEntity`
+        """
+        _minx, _maxx, _miny, _maxy = self._bounds(entity.aabb)
+
+        result = []
+        # every lower x end up to _maxx, from an entity whose upper x end is at least _minx
+        for endpoint in self._lists[0]:
+            if endpoint.value > _maxx:
+                break
+            if endpoint.is_max:
+                continue
+            _ends = self._ends[endpoint.owner]
+            if _ends[1].value < _minx:
+                continue
+            _other = self._entities[endpoint.owner]
+            _aabb = _other.aabb
+            if _aabb.mincorner.y > _maxy or _aabb.mincorner.y + _aabb.height < _miny:
+                continue
+            if predicate is None or predicate(_other):
+                result.append(_other)
+        return result
+
+    @staticmethod
+    def get_code():
+        """
+        Get the code for the SweepAndPrune class
+
+        :returns: code for SweepAndPrune
+        :rtype: string
+        """
+        return inspect.getsource(SweepAndPrune)
+
+
+def _list_moves_up(sorted_list, endpoint):
+    """
+    Determine if endpoint now belongs further up sorted_list than where it
+    is. Meant for internal use.
+    """
+    i = endpoint.index
+    if i + 1 >= len(sorted_list):
+        return False
+    _next = sorted_list[i + 1]
+    return (_next.value, _next.is_max) < (endpoint.value, endpoint.is_max)
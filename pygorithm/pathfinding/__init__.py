@@ -2,9 +2,25 @@
 Collection of pathfinding examples
 """
 from . import astar
+from . import batch
+from . import contraction
 from . import dijkstra
+from . import dstar_lite
+from . import flow_field
+from . import hpa
+from . import jps
+from . import landmarks
+from . import path_cache
 
 __all__ = [
     'astar',
-    'dijkstra'
+    'batch',
+    'contraction',
+    'dijkstra',
+    'dstar_lite',
+    'flow_field',
+    'hpa',
+    'jps',
+    'landmarks',
+    'path_cache'
 ]
@@ -11,11 +11,57 @@ these paths it first considers the ones that appear to lead most
 quickly to the solution.
 https://en.wikipedia.org/wiki/A*_search_algorithm
 """
-import heapq
 import inspect
 
 from enum import Enum
 
+from pygorithm.data_structures import heap
+
+
+class AStarNode(object):
+    """AStarNode object
+    What the A* pathfinders know about a vertex they have found. These
+    are created for every vertex that is found, so they use slots
+    rather than a dict to keep large searches small.
+    
+    dist_to_here is the certain distance from the vertex the search
+    started from (the start, or the end for nodes found from the end in
+    BiDirectionalAStar), pred_dist_to_goal is the heuristic distance to
+    the vertex the search is heading to, and pred_total_dist is their sum.
+    """
+    
+    __slots__ = ('vertex', 'parent', 'source', 'dist_to_here', 'pred_dist_to_goal', 'pred_total_dist')
+    
+    def __init__(self, vertex, parent, dist_to_here, pred_dist_to_goal, source=None):
+        """
+        :param vertex: the vertex this node is for
+        :param parent: the AStarNode this vertex was reached from, or None
+        :param dist_to_here: the distance to vertex through parent - type : numeric
+        :param pred_dist_to_goal: the heuristic distance from vertex to the goal - type : numeric
+        :param source: how the node was found (see BiDirectionalAStar.NodeSource) or None
+        """
+        self.vertex = vertex
+        self.parent = parent
+        self.source = source
+        self.dist_to_here = dist_to_here
+        self.pred_dist_to_goal = pred_dist_to_goal
+        self.pred_total_dist = dist_to_here + pred_dist_to_goal
+    
+    def __repr__(self):
+        return 'AStarNode(vertex={}, dist_to_here={}, pred_total_dist={})'.format(
+            repr(self.vertex), self.dist_to_here, self.pred_total_dist)
+    
+    def reparent(self, parent, dist_to_here):
+        """
+        Changes the node to be reached through parent, keeping
+        the same heuristic distance to the goal.
+        :param parent: the new parent AStarNode
+        :param dist_to_here: the distance to vertex through parent - type : numeric
+        """
+        self.parent = parent
+        self.dist_to_here = dist_to_here
+        self.pred_total_dist = dist_to_here + self.pred_dist_to_goal
+
 
 class OneDirectionalAStar(object):
     """OneDirectionalAStar object
@@ -68,13 +114,13 @@ class OneDirectionalAStar(object):
         Walks backward from an end node to the start
         node and reconstructs a path. Meant for internal
         use.
-        :param node: dict containing { 'vertex': any hashable, 'parent': dict or None }
+        :param node: AStarNode (or any object with `vertex` and `parent`)
         :return:     a list of vertices ending on the node
         """
         result = []
         while node is not None:
-            result.append(node['vertex'])
-            node = node['parent']
+            result.append(node.vertex)
+            node = node.parent
         result.reverse()
         return result
     
@@ -117,9 +163,11 @@ class OneDirectionalAStar(object):
         # nodes in the _open list before. There can be thousands of nodes in the _open
         # list and any unordered search is too expensive, so we trade some memory usage for
         # more consistent performance by maintaining a dictionary (O(1) lookup) between
-        # vertices and their nodes. 
+        # vertices and their nodes. The _open list itself is an indexed heap, so when
+        # we find a better path to a node that is already open we can lower its key
+        # in place rather than searching for it and rebuilding the heap.
         _open_lookup = {}
-        _open = []
+        _open = heap.IndexedHeap()
         closed = set()
         
         # We require a bit more information on each node than Dijkstra
@@ -135,28 +183,20 @@ class OneDirectionalAStar(object):
         # the distance from the start to the node (which is certain) and
         # the distance from the node to the end (which is guessed).
         
-        # We use the counter to enforce consistent ordering between nodes
+        # The indexed heap enforces consistent ordering between nodes
         # with the same total predicted distance.
         
-        counter = 0 
         heur = heuristic_fn(graph, start, end)
-        _open_lookup[start] = {'vertex': start,
-                               'dist_start_to_here': 0,
-                               'pred_dist_here_to_end': heur,
-                               'pred_total_dist': heur,
-                               'parent': None}
-        heapq.heappush(_open, (heur, counter, start))
-        counter += 1
+        _open_lookup[start] = AStarNode(start, None, 0, heur)
+        _open.push(start, heur)
         
         while len(_open) > 0:
-            current = heapq.heappop(_open)
-            current_vertex = current[2]
-            current_dict = _open_lookup[current_vertex]
-            del _open_lookup[current_vertex]
-            closed.update(current_vertex)
+            current_vertex, _ = _open.pop()
+            current_node = _open_lookup.pop(current_vertex)
+            closed.add(current_vertex)
             
             if current_vertex == end:
-                return self.reverse_path(current_dict)
+                return self.reverse_path(current_node)
             
             neighbors = graph.graph[current_vertex]
             for neighbor in neighbors:
@@ -166,58 +206,29 @@ class OneDirectionalAStar(object):
                     # node first.
                     continue
                 
-                cost_start_to_neighbor = current_dict['dist_start_to_here'] \
+                cost_start_to_neighbor = current_node.dist_to_here \
                     + graph.get_edge_weight(current_vertex, neighbor)
                 # avoid searching twice
-                neighbor_from_lookup = _open_lookup.get(neighbor, None)
-                if neighbor_from_lookup is not None:
+                neighbor_node = _open_lookup.get(neighbor, None)
+                if neighbor_node is not None:
                     # If our heuristic is NOT consistent or the grid is NOT uniform,
                     # it is possible that there is a better path to a neighbor of a 
                     # previously expanded node. See above, ctrl+f "river example neighbors"
                     
                     # Note that the heuristic distance from here to end will be the same for
                     # both, so the only difference will be in start->here through neighbor
-                    # and through the old neighbor.
-                    
-                    old_dist_start_to_neighbor = neighbor_from_lookup['dist_start_to_here']
-                    
-                    if cost_start_to_neighbor < old_dist_start_to_neighbor:
-                        pred_dist_neighbor_to_end = neighbor_from_lookup['pred_dist_here_to_end']
-                        pred_total_dist_through_neighbor_to_end = cost_start_to_neighbor + pred_dist_neighbor_to_end
-                        # Note, we've already shown that neighbor (the vector) is already in the _open list,
-                        # but unfortunately we don't know where and we have to do a slow lookup to fix the 
-                        # key its sorting by to the new predicted total distance.
-                        
-                        # In case we're using a fancy debugger we want to search in user-code so when 
-                        # this lookup freezes we can see how much longer its going to take.
-                        found = None
-                        for i in range(0, len(_open)):
-                            if _open[i][2] == neighbor:
-                                found = i
-                                break
-                        assert(found is not None)
-                        # TODO: I'm not certain about the performance characteristics of doing this with heapq, nor if
-                        # TODO: it would be better to delete heapify and push or rather than replace
-
-                        _open[found] = (pred_total_dist_through_neighbor_to_end, counter, neighbor)
-                        counter += 1
-                        heapq.heapify(_open)
-                        _open_lookup[neighbor] = {'vertex': neighbor,
-                                                  'dist_start_to_here': cost_start_to_neighbor, 
-                                                  'pred_dist_here_to_end': pred_dist_neighbor_to_end, 
-                                                  'pred_total_dist': pred_total_dist_through_neighbor_to_end, 
-                                                  'parent': current_dict}
+                    # and through the old neighbor. Open nodes are never anyone's parent,
+                    # so the node can be changed in place.
+                    if cost_start_to_neighbor < neighbor_node.dist_to_here:
+                        neighbor_node.reparent(current_node, cost_start_to_neighbor)
+                        _open.decrease_key(neighbor, neighbor_node.pred_total_dist)
                     continue
 
                 # We've found the first possible way to the path!
-                pred_dist_neighbor_to_end = heuristic_fn(graph, neighbor, end)
-                pred_total_dist_through_neighbor_to_end = cost_start_to_neighbor + pred_dist_neighbor_to_end
-                heapq.heappush(_open, (pred_total_dist_through_neighbor_to_end, counter, neighbor))
-                _open_lookup[neighbor] = {'vertex': neighbor,
-                                          'dist_start_to_here': cost_start_to_neighbor,
-                                          'pred_dist_here_to_end': pred_dist_neighbor_to_end,
-                                          'pred_total_dist': pred_total_dist_through_neighbor_to_end,
-                                          'parent': current_dict}
+                neighbor_node = AStarNode(neighbor, current_node, cost_start_to_neighbor,
+                                          heuristic_fn(graph, neighbor, end))
+                _open.push(neighbor, neighbor_node.pred_total_dist)
+                _open_lookup[neighbor] = neighbor_node
         
         return None
             
@@ -254,22 +265,22 @@ class BiDirectionalAStar(object):
         it with the path formed by walking from 
         node_from_end to end. Both the start and end are
         detected where 'parent' is None.
-        :param node_from_start: dict containing { 'vertex': any hashable, 'parent': dict or None }
-        :param node_from_end: dict containing { 'vertex' any hashable, 'parent': dict or None }
+        :param node_from_start: AStarNode (or any object with `vertex` and `parent`)
+        :param node_from_end: AStarNode (or any object with `vertex` and `parent`)
         :return: list of vertices starting at the start and ending at the end
         """
         list_from_start = []
         current = node_from_start
         while current is not None:
-            list_from_start.append(current['vertex'])
-            current = current['parent']
+            list_from_start.append(current.vertex)
+            current = current.parent
         list_from_start.reverse()
         
         list_from_end = []
         current = node_from_end
         while current is not None:
-            list_from_end.append(current['vertex'])
-            current = current['parent']
+            list_from_end.append(current.vertex)
+            current = current.parent
         
         return list_from_start + list_from_end
     
@@ -306,49 +317,34 @@ class BiDirectionalAStar(object):
         #
         # This also means that we can use the same lookup table for both.
         
-        open_by_start = []
-        open_by_end = []
+        open_by_start = heap.IndexedHeap()
+        open_by_end = heap.IndexedHeap()
         open_lookup = {}
         
         closed = set()
         
-        # used to avoid hashing the dict.
-        counter_arr = [0]
-        
         total_heur_distance = heuristic_fn(graph, start, end)
-        heapq.heappush(open_by_start, (total_heur_distance, counter_arr[0], start))
-        counter_arr[0] += 1
-        open_lookup[start] = { 'vertex': start, 
-                               'parent': None, 
-                               'source': self.NodeSource.BY_START, 
-                               'dist_start_to_here': 0,
-                               'pred_dist_here_to_end': total_heur_distance,
-                               'pred_total_dist': total_heur_distance }
+        open_by_start.push(start, total_heur_distance)
+        open_lookup[start] = AStarNode(start, None, 0, total_heur_distance, self.NodeSource.BY_START)
         
-        heapq.heappush(open_by_end, (total_heur_distance, counter_arr, end))
-        counter_arr[0] += 1
-        open_lookup[end] = { 'vertex': end,
-                             'parent': None,
-                             'source': self.NodeSource.BY_END, 
-                             'dist_end_to_here': 0,
-                             'pred_dist_here_to_start': total_heur_distance,
-                             'pred_total_dist': total_heur_distance }
+        open_by_end.push(end, total_heur_distance)
+        open_lookup[end] = AStarNode(end, None, 0, total_heur_distance, self.NodeSource.BY_END)
         
         # If the start runs out then the start is in a closed room,
         # if the end runs out then the end is in a closed room,
         # either way there is no path from start to end.
         while len(open_by_start) > 0 and len(open_by_end) > 0:
-            result = self._evaluate_from_start(graph, start, end, heuristic_fn, open_by_start, open_by_end, open_lookup, closed, counter_arr)
+            result = self._evaluate_from_start(graph, start, end, heuristic_fn, open_by_start, open_by_end, open_lookup, closed)
             if result is not None:
                 return result
             
-            result = self._evaluate_from_end(graph, start, end, heuristic_fn, open_by_start, open_by_end, open_lookup, closed, counter_arr)
+            result = self._evaluate_from_end(graph, start, end, heuristic_fn, open_by_start, open_by_end, open_lookup, closed)
             if result is not None:
                 return result
         
         return None
             
-    def _evaluate_from_start(self, graph, start, end, heuristic_fn, open_by_start, open_by_end, open_lookup, closed, counter_arr):
+    def _evaluate_from_start(self, graph, start, end, heuristic_fn, open_by_start, open_by_end, open_lookup, closed):
         """
         Intended for internal use only. Expands one node from the open_by_start list.
         
@@ -358,68 +354,41 @@ class BiDirectionalAStar(object):
         :heuristic_fn: the heuristic function (signature function(graph, start, end) returns numeric)
         :open_by_start: the open vertices from the start
         :open_by_end: the open vertices from the end
-        :open_lookup: dictionary of vertices -> dicts
+        :open_lookup: dictionary of vertices -> AStarNode
         :closed: the already expanded vertices (set)
-        :counter_arr: arr of one integer (counter)
         """
-        current = heapq.heappop(open_by_start)
-        current_vertex = current[2]
-        current_dict = open_lookup[current_vertex]
-        del open_lookup[current_vertex]
-        closed.update(current_vertex)
+        current_vertex, _ = open_by_start.pop()
+        current_node = open_lookup.pop(current_vertex)
+        closed.add(current_vertex)
         
         neighbors = graph.graph[current_vertex]
         for neighbor in neighbors:
             if neighbor in closed:
                 continue
             
-            neighbor_dict = open_lookup.get(neighbor, None)
-            if neighbor_dict is not None and neighbor_dict['source'] is self.NodeSource.BY_END:
-                return self.reverse_path(current_dict, neighbor_dict)
+            neighbor_node = open_lookup.get(neighbor, None)
+            if neighbor_node is not None and neighbor_node.source is self.NodeSource.BY_END:
+                return self.reverse_path(current_node, neighbor_node)
             
-            dist_to_neighb_through_curr_from_start = current_dict['dist_start_to_here'] \
+            dist_to_neighb_through_curr_from_start = current_node.dist_to_here \
                 + graph.get_edge_weight(current_vertex, neighbor)
             
-            if neighbor_dict is not None:
-                assert(neighbor_dict['source'] is self.NodeSource.BY_START)
+            if neighbor_node is not None:
+                assert(neighbor_node.source is self.NodeSource.BY_START)
                 
-                if neighbor_dict['dist_start_to_here'] <= dist_to_neighb_through_curr_from_start:
+                if neighbor_node.dist_to_here <= dist_to_neighb_through_curr_from_start:
                     continue
                 
-                pred_dist_neighbor_to_end = neighbor_dict['pred_dist_here_to_end']
-                pred_total_dist_through_neighbor = dist_to_neighb_through_curr_from_start + pred_dist_neighbor_to_end
-                open_lookup[neighbor] = { 'vertex': neighbor,
-                                          'parent': current_dict,
-                                          'source': self.NodeSource.BY_START,
-                                          'dist_start_to_here': dist_to_neighb_through_curr_from_start, 
-                                          'pred_dist_here_to_end': pred_dist_neighbor_to_end, 
-                                          'pred_total_dist': pred_total_dist_through_neighbor }
-                
-                # TODO: I'm pretty sure theres a faster way to do this
-                found = None
-                for i in range(0, len(open_by_start)):
-                    if open_by_start[i][2] == neighbor:
-                        found = i
-                        break
-                assert(found is not None)
-                
-                open_by_start[found] = (pred_total_dist_through_neighbor, counter_arr[0], neighbor)
-                counter_arr[0] += 1
-                heapq.heapify(open_by_start)
+                neighbor_node.reparent(current_node, dist_to_neighb_through_curr_from_start)
+                open_by_start.decrease_key(neighbor, neighbor_node.pred_total_dist)
                 continue
             
-            pred_dist_neighbor_to_end = heuristic_fn(graph, neighbor, end)
-            pred_total_dist_through_neighbor = dist_to_neighb_through_curr_from_start + pred_dist_neighbor_to_end
-            open_lookup[neighbor] = { 'vertex': neighbor,
-                                      'parent': current_dict,
-                                      'source': self.NodeSource.BY_START,
-                                      'dist_start_to_here': dist_to_neighb_through_curr_from_start, 
-                                      'pred_dist_here_to_end': pred_dist_neighbor_to_end, 
-                                      'pred_total_dist': pred_total_dist_through_neighbor }
-            heapq.heappush(open_by_start, (pred_total_dist_through_neighbor, counter_arr[0], neighbor))
-            counter_arr[0] += 1
-    
-    def _evaluate_from_end(self, graph, start, end, heuristic_fn, open_by_start, open_by_end, open_lookup, closed, counter_arr):
+            neighbor_node = AStarNode(neighbor, current_node, dist_to_neighb_through_curr_from_start,
+                                      heuristic_fn(graph, neighbor, end), self.NodeSource.BY_START)
+            open_lookup[neighbor] = neighbor_node
+            open_by_start.push(neighbor, neighbor_node.pred_total_dist)
+
+    def _evaluate_from_end(self, graph, start, end, heuristic_fn, open_by_start, open_by_end, open_lookup, closed):
         """
         Intended for internal use only. Expands one node from the open_by_end list.
         
@@ -429,67 +398,40 @@ class BiDirectionalAStar(object):
         :heuristic_fn: the heuristic function (signature function(graph, start, end) returns numeric)
         :open_by_start: the open vertices from the start
         :open_by_end: the open vertices from the end
-        :open_lookup: dictionary of vertices -> dicts
+        :open_lookup: dictionary of vertices -> AStarNode
         :closed: the already expanded vertices (set)
-        :counter_arr: arr of one integer (counter)
         """
-        current = heapq.heappop(open_by_end)
-        current_vertex = current[2]
-        current_dict = open_lookup[current_vertex]
-        del open_lookup[current_vertex]
-        closed.update(current_vertex)
+        current_vertex, _ = open_by_end.pop()
+        current_node = open_lookup.pop(current_vertex)
+        closed.add(current_vertex)
         
         neighbors = graph.graph[current_vertex]
         for neighbor in neighbors:
             if neighbor in closed:
                 continue
             
-            neighbor_dict = open_lookup.get(neighbor, None)
-            if neighbor_dict is not None and neighbor_dict['source'] is self.NodeSource.BY_START:
-                return self.reverse_path(neighbor_dict, current_dict)
+            neighbor_node = open_lookup.get(neighbor, None)
+            if neighbor_node is not None and neighbor_node.source is self.NodeSource.BY_START:
+                return self.reverse_path(neighbor_node, current_node)
             
-            dist_to_neighb_through_curr_from_end = current_dict['dist_end_to_here'] \
+            dist_to_neighb_through_curr_from_end = current_node.dist_to_here \
                 + graph.get_edge_weight(current_vertex, neighbor)
             
-            if neighbor_dict is not None:
-                assert(neighbor_dict['source'] is self.NodeSource.BY_END)
+            if neighbor_node is not None:
+                assert(neighbor_node.source is self.NodeSource.BY_END)
                 
-                if neighbor_dict['dist_end_to_here'] <= dist_to_neighb_through_curr_from_end:
+                if neighbor_node.dist_to_here <= dist_to_neighb_through_curr_from_end:
                     continue
                 
-                pred_dist_neighbor_to_start = neighbor_dict['pred_dist_here_to_start']
-                pred_total_dist_through_neighbor = dist_to_neighb_through_curr_from_end + pred_dist_neighbor_to_start
-                open_lookup[neighbor] = { 'vertex': neighbor,
-                                          'parent': current_dict,
-                                          'source': self.NodeSource.BY_END,
-                                          'dist_end_to_here': dist_to_neighb_through_curr_from_end, 
-                                          'pred_dist_here_to_start': pred_dist_neighbor_to_start, 
-                                          'pred_total_dist': pred_total_dist_through_neighbor }
-                
-                # TODO: I'm pretty sure theres a faster way to do this
-                found = None
-                for i in range(0, len(open_by_end)):
-                    if open_by_end[i][2] == neighbor:
-                        found = i
-                        break
-                assert(found is not None)
-                
-                open_by_end[found] = (pred_total_dist_through_neighbor, counter_arr[0], neighbor)
-                counter_arr[0] += 1
-                heapq.heapify(open_by_end)
+                neighbor_node.reparent(current_node, dist_to_neighb_through_curr_from_end)
+                open_by_end.decrease_key(neighbor, neighbor_node.pred_total_dist)
                 continue
             
-            pred_dist_neighbor_to_start = heuristic_fn(graph, neighbor, start)
-            pred_total_dist_through_neighbor = dist_to_neighb_through_curr_from_end + pred_dist_neighbor_to_start
-            open_lookup[neighbor] = { 'vertex': neighbor,
-                                      'parent': current_dict,
-                                      'source': self.NodeSource.BY_END,
-                                      'dist_end_to_here': dist_to_neighb_through_curr_from_end, 
-                                      'pred_dist_here_to_start': pred_dist_neighbor_to_start, 
-                                      'pred_total_dist': pred_total_dist_through_neighbor }
-            heapq.heappush(open_by_end, (pred_total_dist_through_neighbor, counter_arr[0], neighbor))
-            counter_arr[0] += 1
-        
+            neighbor_node = AStarNode(neighbor, current_node, dist_to_neighb_through_curr_from_end,
+                                      heuristic_fn(graph, neighbor, start), self.NodeSource.BY_END)
+            open_lookup[neighbor] = neighbor_node
+            open_by_end.push(neighbor, neighbor_node.pred_total_dist)
+
     @staticmethod
     def get_code():
         """
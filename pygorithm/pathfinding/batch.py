@@ -0,0 +1,60 @@
+"""
+Batch Pathfinding
+
+Finds the paths between many independent pairs of vertices on the
+same graph, optionally spread over several worker processes. The
+graph is handed to each worker once when the worker starts (on
+platforms that fork, it is simply inherited from the parent
+process), so each task only sends the two endpoints across and
+the path back.
+https://docs.python.org/3/library/multiprocessing.html
+"""
+import inspect
+
+from pygorithm.data_structures import process_pool
+from pygorithm.pathfinding import astar
+
+
+def _find_path(state, pair):
+    """
+    Finds the path for one (start, end) pair, with state the
+    (graph, heuristic_fn, pathfinder) shared by every pair. Meant for
+    internal use.
+    """
+    graph, heuristic_fn, pathfinder = state
+    start, end = pair
+    if heuristic_fn is None:
+        return pathfinder.find_path(graph, start, end)
+    return pathfinder.find_path(graph, start, end, heuristic_fn)
+
+
+def find_paths(graph, pairs, heuristic_fn, workers=1, pathfinder=None, chunksize=None):
+    """
+    Calculates the optimal path between each (start, end) pair on
+    the graph.
+
+    With more than one worker the pairs are split between that many
+    processes. Where the platform supports it the workers are forked,
+    so the graph, heuristic and pathfinder do not need to be picklable;
+    otherwise they are pickled once per worker, never once per pair.
+
+    :param graph: the graph (see WeightedUndirectedGraph)
+    :param pairs: iterable of (start, end) vertices
+    :param heuristic_fn: the heuristic passed to the pathfinder (signature function(graph, start, end)
+                         returns numeric), or None for pathfinders that take no heuristic such as Dijkstra
+    :param workers: the number of processes to use, or None for one per CPU. 1 searches in this process
+    :param pathfinder: object with `find_path`, defaults to OneDirectionalAStar
+    :param chunksize: the number of pairs sent to a worker at a time, defaults to an even split
+    :return: a list with the path (or None) for each pair, in the same order as pairs
+    """
+    if pathfinder is None:
+        pathfinder = astar.OneDirectionalAStar()
+    return list(process_pool.imap(_find_path, (graph, heuristic_fn, pathfinder), pairs, workers, chunksize))
+
+
+def get_code():
+    """
+    easily retrieve the source code
+    of the find_paths function
+    """
+    return inspect.getsource(find_paths)
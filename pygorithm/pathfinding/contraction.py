@@ -0,0 +1,360 @@
+"""
+Contraction Hierarchies
+
+Contraction hierarchies speed up repeated shortest path queries on a
+graph that doesn't change. Vertices are removed ("contracted") one at
+a time, least important first, and whenever removing a vertex would
+lengthen the shortest path between two of its neighbors a shortcut
+edge is added between them. A query then searches from both ends
+only along edges toward more important vertices, which on road-like
+graphs touches a few hundred vertices no matter how big the graph is.
+https://en.wikipedia.org/wiki/Contraction_hierarchies
+"""
+from array import array
+import inspect
+
+from pygorithm.data_structures import array_file
+from pygorithm.data_structures import heap
+
+INFINITY = float('inf')
+
+
+class ContractionHierarchy(object):
+    """ContractionHierarchy object
+    Preprocesses an undirected graph (see WeightedUndirectedGraph) and
+    answers shortest path queries on it. The result of `build` is
+    kept in flat arrays: for each vertex, in the order of `vertices`,
+    the edges to vertices contracted after it (its upward edges) as a
+    row of targets, weights and middles, where the middle is the vertex
+    a shortcut skips over, or -1 for an edge of the graph. These arrays
+    are what `save` writes and `load` memory-maps.
+
+    The hierarchy does not notice changes to the graph; build it again
+    after modifying the graph.
+    """
+
+    # the magic number of files written by save; the header holds the
+    # vertices, and the arrays are the offsets, targets, middles and weights
+    _MAGIC = b'PGCH2\x00\x00\x00'
+
+    def __init__(self, graph=None, witness_limit=64):
+        """
+        :param graph: the graph with 'graph' and 'get_edge_weight' (see WeightedUndirectedGraph),
+                      or None for an empty object (see load)
+        :param witness_limit: the most vertices settled when checking whether a shortcut is
+                              needed. Higher is slower to build but adds fewer shortcuts - type : integer
+        """
+        self.vertices = []
+        self.index = {}
+        self.offsets = array('q', [0])
+        self.targets = array('q')
+        self.weights = array('d')
+        self.middles = array('q')
+        self._mmap = None
+        if graph is not None:
+            self.build(graph, witness_limit)
+
+    def __len__(self):
+        return len(self.vertices)
+
+    @staticmethod
+    def _witness_distances(remaining, source, skipped, max_dist, limit):
+        """
+        Finds the distances from source in the remaining graph without
+        going through skipped, settling at most limit vertices and none
+        farther than max_dist. Meant for internal use.
+
+        :return: dict of vertex -> distance, only for settled vertices
+        """
+        _open = heap.IndexedHeap()
+        _open.push(source, 0)
+        distances = {}
+        while len(_open) > 0 and len(distances) < limit:
+            current, current_dist = _open.pop()
+            distances[current] = current_dist
+            if current_dist > max_dist:
+                break
+            for neighbor, (weight, _) in remaining[current].items():
+                if neighbor == skipped or neighbor in distances:
+                    continue
+                _open.push_or_decrease(neighbor, current_dist + weight)
+        return distances
+
+    def _shortcuts(self, remaining, vertex, limit):
+        """
+        Finds the shortcuts contracting vertex would need: one for each
+        pair of its neighbors whose shortest path goes through vertex.
+        Meant for internal use.
+
+        :return: list of (u, w, weight)
+        """
+        edges = remaining[vertex]
+        neighbors = list(edges)
+        result = []
+        for i, u in enumerate(neighbors):
+            to_u = edges[u][0]
+            others = neighbors[i + 1:]
+            if not others:
+                continue
+            max_dist = to_u + max(edges[w][0] for w in others)
+            distances = self._witness_distances(remaining, u, vertex, max_dist, limit)
+            for w in others:
+                through = to_u + edges[w][0]
+                if distances.get(w, INFINITY) > through:
+                    result.append((u, w, through))
+        return result
+
+    def _priority(self, remaining, vertex, contracted_neighbors, limit):
+        """
+        The edge difference (shortcuts added minus edges removed) of
+        contracting vertex, plus the number of its neighbors already
+        contracted so that contraction is spread over the graph.
+        Meant for internal use.
+        """
+        shortcuts = self._shortcuts(remaining, vertex, limit)
+        return len(shortcuts) - len(remaining[vertex]) + contracted_neighbors[vertex]
+
+    def build(self, graph, witness_limit=64):
+        """
+        Contracts every vertex of the graph, adding shortcuts, and
+        stores the upward edges of each vertex.
+
+        :param graph: the graph with 'graph' and 'get_edge_weight' (see WeightedUndirectedGraph)
+        :param witness_limit: the most vertices settled when checking whether a shortcut is needed
+        """
+        self.close()
+        self.vertices = list(graph.graph)
+        self.index = dict((vertex, i) for i, vertex in enumerate(self.vertices))
+        index = self.index
+
+        # the graph that is left, as vertex -> {neighbor: (weight, middle)}
+        remaining = [dict() for _ in self.vertices]
+        for vertex in self.vertices:
+            i = index[vertex]
+            for neighbor in graph.graph[vertex]:
+                j = index[neighbor]
+                if i == j:
+                    continue
+                weight = graph.get_edge_weight(vertex, neighbor)
+                if j not in remaining[i] or weight < remaining[i][j][0]:
+                    remaining[i][j] = (weight, -1)
+                    remaining[j][i] = (weight, -1)
+
+        contracted_neighbors = [0] * len(self.vertices)
+        queue = heap.IndexedHeap()
+        for i in range(len(self.vertices)):
+            queue.push(i, self._priority(remaining, i, contracted_neighbors, witness_limit))
+
+        upward = [None] * len(self.vertices)
+        while len(queue) > 0:
+            vertex, _ = queue.pop()
+            # priorities go stale as the graph shrinks; recalculate lazily
+            # and contract the vertex only if it is still the cheapest
+            shortcuts = self._shortcuts(remaining, vertex, witness_limit)
+            priority = len(shortcuts) - len(remaining[vertex]) + contracted_neighbors[vertex]
+            if len(queue) > 0 and priority > queue.peek()[1]:
+                queue.push(vertex, priority)
+                continue
+
+            for u, w, weight in shortcuts:
+                if w not in remaining[u] or weight < remaining[u][w][0]:
+                    remaining[u][w] = (weight, vertex)
+                    remaining[w][u] = (weight, vertex)
+
+            edges = remaining[vertex]
+            upward[vertex] = edges
+            for neighbor in edges:
+                del remaining[neighbor][vertex]
+                contracted_neighbors[neighbor] += 1
+            remaining[vertex] = None
+
+        offsets = array('q', [0])
+        targets = array('q')
+        weights = array('d')
+        middles = array('q')
+        for edges in upward:
+            for neighbor, (weight, middle) in edges.items():
+                targets.append(neighbor)
+                weights.append(weight)
+                middles.append(middle)
+            offsets.append(len(targets))
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.middles = middles
+
+    def _edge(self, lower, other):
+        """
+        Finds the upward edge from lower to other. Meant for internal use.
+
+        :return: the index of the edge in targets
+        """
+        targets = self.targets
+        for edge in range(self.offsets[lower], self.offsets[lower + 1]):
+            if targets[edge] == other:
+                return edge
+        raise KeyError((lower, other))
+
+    def _unpack(self, lower, upper, edge, result):
+        """
+        Appends the vertices of the graph the edge from lower to upper
+        stands for to result, not including lower. Meant for internal use.
+        """
+        stack = [(lower, upper, edge)]
+        while stack:
+            u, w, edge = stack.pop()
+            middle = self.middles[edge]
+            if middle < 0:
+                result.append(w)
+                continue
+            # the middle was contracted before both ends, so both
+            # halves of the shortcut are upward edges of the middle
+            stack.append((middle, w, self._edge(middle, w)))
+            stack.append((u, middle, self._edge(middle, u)))
+
+    def _search_step(self, _open, distances, parents, other_distances, best):
+        """
+        Settles the closest vertex of one side of the query and relaxes
+        its upward edges. Meant for internal use.
+
+        :return: (best distance, meeting vertex) if a shorter path was found, else None
+        """
+        offsets = self.offsets
+        targets = self.targets
+        weights = self.weights
+        current, current_dist = _open.pop()
+        distances[current] = current_dist
+        found = None
+        if current in other_distances and current_dist + other_distances[current] < best:
+            found = (current_dist + other_distances[current], current)
+        for edge in range(offsets[current], offsets[current + 1]):
+            target = targets[edge]
+            if target in distances:
+                continue
+            if _open.push_or_decrease(target, current_dist + weights[edge]):
+                parents[target] = (current, edge)
+        return found
+
+    def find_path(self, graph, start, end):
+        """
+        Calculates the optimal path from start to end.
+
+        :param graph: unused; the hierarchy answers for the graph it was built
+                      from, so this may also be None
+        :param start: the start vertex (must be hashable and same type as the graph)
+        :param end: the end vertex (must be hashable and same type as the graph)
+        :return: a list of vertices starting at start ending at end or None
+        """
+        start_idx = self.index.get(start, None)
+        end_idx = self.index.get(end, None)
+        if start_idx is None or end_idx is None:
+            return None
+        if start_idx == end_idx:
+            return [start]
+
+        # each side is (open list, settled distances, parents), and the
+        # sides meet at a vertex settled by both
+        forward = (heap.IndexedHeap(), {}, {start_idx: None})
+        backward = (heap.IndexedHeap(), {}, {end_idx: None})
+        forward[0].push(start_idx, 0)
+        backward[0].push(end_idx, 0)
+        best = INFINITY
+        meeting = None
+        turn = 0
+        while True:
+            # a side stops once it can't improve on the best path; there
+            # are no heuristics, so its closest vertex is a lower bound
+            active = [search for search in (forward, backward)
+                      if len(search[0]) > 0 and search[0].peek()[1] < best]
+            if not active:
+                break
+            search = active[turn % len(active)]
+            turn += 1
+            _open, distances, parents = search
+            other_distances = backward[1] if search is forward else forward[1]
+            found = self._search_step(_open, distances, parents, other_distances, best)
+            if found is not None:
+                best, meeting = found
+
+        if meeting is None:
+            return None
+
+        vertices = self.vertices
+        up_edges = []
+        current = meeting
+        parents = forward[2]
+        while parents[current] is not None:
+            parent, edge = parents[current]
+            up_edges.append((parent, current, edge))
+            current = parent
+        up_edges.reverse()
+
+        result = [start_idx]
+        for u, w, edge in up_edges:
+            self._unpack(u, w, edge, result)
+
+        current = meeting
+        parents = backward[2]
+        while parents[current] is not None:
+            parent, edge = parents[current]
+            self._unpack(current, parent, edge, result)
+            current = parent
+
+        return [vertices[i] for i in result]
+
+    def save(self, path):
+        """
+        Writes the hierarchy to a file (see array_file). The vertices must
+        be None, bools, numbers, strings or tuples of them.
+
+        :param path: the file name
+        """
+        array_file.save(path, self._MAGIC, {'vertices': self.vertices},
+                        [self.offsets, self.targets, self.middles, self.weights])
+
+    @staticmethod
+    def load(path):
+        """
+        Reads a hierarchy written by save. The arrays are memory-mapped,
+        so they are only read from the file as they are used and are
+        shared between processes that load the same file.
+
+        :param path: the file name
+        :return: a ContractionHierarchy
+        :raises ValueError: if the file wasn't written by ContractionHierarchy.save
+        """
+        header, arrays, mapping = array_file.load(path, ContractionHierarchy._MAGIC, 'contraction hierarchy')
+        result = ContractionHierarchy()
+        result.vertices = header['vertices']
+        result.offsets, result.targets, result.middles, result.weights = arrays
+        result._mmap = mapping
+        result.index = dict((vertex, i) for i, vertex in enumerate(result.vertices))
+        return result
+
+    def close(self):
+        """
+        Releases the memory-mapped file, if the hierarchy was loaded
+        from one.
+        """
+        if self._mmap is not None:
+            array_file.close([self.offsets, self.targets, self.middles, self.weights], self._mmap)
+            self.offsets = array('q', [0])
+            self.targets = array('q')
+            self.weights = array('d')
+            self.middles = array('q')
+            self._mmap = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if self._mmap is not None:
+            for name in ('offsets', 'targets', 'middles', 'weights'):
+                state[name] = array_file.copy(state[name])
+            state['_mmap'] = None
+        return state
+
+    @staticmethod
+    def get_code():
+        """
+        returns the code for the current class
+        """
+        return inspect.getsource(ContractionHierarchy)
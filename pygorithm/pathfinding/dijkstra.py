@@ -9,9 +9,10 @@ in a graph.
 https://en.wikipedia.org/wiki/Dijkstra%27s_algorithm
 
 """
-import heapq
 import inspect
 
+from pygorithm.data_structures import heap
+
 
 class Dijkstra(object):
     """Dijkstra object
@@ -36,47 +37,91 @@ class Dijkstra(object):
             result.insert(0, node['vertex'])
             node = node['parent']
         return result
+
+    @staticmethod
+    def path_from_tree(parents, end):
+        """
+        Walks backward from an end vertex to the start
+        vertex and reconstructs a path.
+        :param parents: dict of vertex -> previous vertex on the path, or None for the start
+                        (as returned by shortest_path_tree)
+        :param end:     the last vertex of the path
+        :return:        a list of vertices ending on end, or None if end was not reached
+        """
+        if end not in parents:
+            return None
+        result = []
+        while end is not None:
+            result.append(end)
+            end = parents[end]
+        result.reverse()
+        return result
+    
+    def _search(self, graph, start, end):
+        """
+        Expands vertices in order of distance from start until end is
+        expanded or, if end is None, until every reachable vertex is.
+        Meant for internal use.
+        :return: (dict of vertex -> distance from start, dict of vertex -> parent)
+                 containing only the vertices that have been expanded
+        """
+        # the open list is an indexed heap keyed on the distance from the source, so
+        # each vertex is on the open list at most once; finding a shorter route to an
+        # open vertex lowers its key in place rather than pushing a duplicate.
+        _open = heap.IndexedHeap()
+        open_parents = {}
+        distances = {}
+        parents = {}
+        
+        _open.push(start, 0)
+        open_parents[start] = None
+        
+        while len(_open) > 0:
+            current, current_dist = _open.pop()
+            distances[current] = current_dist
+            parents[current] = open_parents.pop(current)
+            
+            if current == end:
+                break
+            
+            for neighbor in graph.graph[current]:
+                if neighbor in distances:
+                    continue
+                dist = current_dist + graph.get_edge_weight(current, neighbor)
+                if _open.push_or_decrease(neighbor, dist):
+                    open_parents[neighbor] = current
+        
+        return distances, parents
         
     def find_path(self, graph, start, end):
         """
         Calculates the optimal path from start to end
-        on the graph. Weights are ignored.
+        on the graph. Weights are taken into account.
         
-        :param graph: object contains `graphs` as per pygorithm.data_structures.WeightedUndirectedGraph
-                      weights are ignored.
+        :param graph: object contains `graph` and `get_edge_weight` as per
+                      pygorithm.data_structures.WeightedUndirectedGraph
         :param start: the start vertex (which is the same type of the verticies in the graph)
         :param end:   the end vertex (which is the same type of the vertices in the graph)
         :return:      a list starting with `start` and ending with `end`, or None if no path is possible.
         """
+        _, parents = self._search(graph, start, end)
+        return self.path_from_tree(parents, end)
+    
+    def shortest_path_tree(self, graph, start):
+        """
+        Calculates the optimal path from start to every vertex
+        reachable from it. This is one search no matter how many
+        vertices are queried afterward; use path_from_tree on the
+        parents to get the path to a particular vertex.
         
-        _open = []
-        closed = set()
-        
-        # the first element in the tuple is the distance from the source. This is used as the primary
-        # key for sorting. The second element in the tuple is just a counter and is used to avoid having
-        # to hash the dictionary when the distance from the source is not unique.
-        
-        # performance might be improved by also searching the open list and avoiding adding those nodes
-        # but since this algorithm is typically for examples only performance improvements are not made
-        
-        counter = 0
-        heapq.heappush(_open, (0, counter, {'vertex': start, 'parent': None}))
-        counter += 1
-        
-        while len(_open) > 0:
-            current = heapq.heappop(_open)
-            current_dict = current[2]
-            closed.update(current_dict['vertex'])
-            
-            if current_dict['vertex'] == end:
-                return self.reverse_path(current_dict)
-            
-            neighbors = graph.graph[current_dict['vertex']]
-            for neighbor in neighbors:
-                if neighbor not in closed:
-                    heapq.heappush(_open, (current[0] + 1, counter, {'vertex': neighbor, 'parent': current_dict}))
-                    counter += 1
-        return None
+        :param graph: object contains `graph` and `get_edge_weight` as per
+                      pygorithm.data_structures.WeightedUndirectedGraph
+        :param start: the start vertex (which is the same type of the verticies in the graph)
+        :return:      (distances, parents) where distances is a dict of vertex -> cost of the
+                      optimal path from start and parents is a dict of vertex -> previous vertex
+                      on that path (None for start). Unreachable vertices are in neither.
+        """
+        return self._search(graph, start, None)
     
     @staticmethod
     def get_code():
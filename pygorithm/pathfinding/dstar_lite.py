@@ -0,0 +1,220 @@
+"""
+D* Lite
+
+D* Lite is an incremental version of A*. It searches backward from
+the end to the start and keeps everything it learned between calls,
+so when edges change or the start moves (the agent following the path
+takes a step) only the part of the search affected by the change is
+repaired. After a small change near the agent, replanning costs a
+small fraction of a new search.
+https://en.wikipedia.org/wiki/D*#D*_Lite
+"""
+import inspect
+
+from pygorithm.data_structures import heap
+
+INFINITY = float('inf')
+
+# keys that differ by less than this are treated as equal, otherwise
+# rounding (for example on diagonal steps) can end a search early
+EPSILON = 1e-9
+
+
+class DStarLite(object):
+    """DStarLite object
+    Finds the optimal path between two nodes on a graph and keeps its
+    search state, so that later calls after the graph is modified or
+    the start moves are much cheaper than starting over.
+
+    The heuristic must be consistent (for example the straight-line
+    distance on a grid), not only admissable.
+    """
+
+    def __init__(self):
+        self.graph = None
+        self.start = None
+        self.end = None
+        self.heuristic_fn = None
+        self.version = None
+        self.key_modifier = 0
+        self.g = {}
+        self.rhs = {}
+        self._open = None
+
+    def reset(self):
+        """
+        Forgets the search state, so the next find_path starts over.
+        """
+        self.graph = None
+        self.g = {}
+        self.rhs = {}
+        self._open = None
+
+    def _initialize(self, graph, start, end, heuristic_fn):
+        """
+        Starts a new search. Meant for internal use.
+        """
+        self.graph = graph
+        self.start = start
+        self.end = end
+        self.heuristic_fn = heuristic_fn
+        self.version = getattr(graph, 'version', None)
+        self.key_modifier = 0
+        self.g = {}
+        self.rhs = {end: 0}
+        self._open = heap.IndexedHeap()
+        self._open.push(end, self._calculate_key(end))
+
+    def _calculate_key(self, vertex):
+        """
+        The priority of vertex on the open list. Meant for internal use.
+        """
+        best = min(self.g.get(vertex, INFINITY), self.rhs.get(vertex, INFINITY))
+        return (best + self.heuristic_fn(self.graph, self.start, vertex) + self.key_modifier, best)
+
+    @staticmethod
+    def _key_less(key, other):
+        """
+        Compares two keys, allowing for rounding errors. Meant for
+        internal use.
+        """
+        if key[0] < other[0] - EPSILON:
+            return True
+        if key[0] > other[0] + EPSILON:
+            return False
+        return key[1] < other[1] - EPSILON
+
+    def _neighbors(self, vertex):
+        """
+        The vertices connected to vertex, or nothing if vertex has been
+        removed from the graph. Meant for internal use.
+        """
+        if vertex not in self.graph.graph:
+            return []
+        return self.graph.graph[vertex]
+
+    def _update_vertex(self, vertex):
+        """
+        Recalculates the best distance to the end through the neighbors
+        of vertex and puts it on the open list if it's inconsistent.
+        Meant for internal use.
+        """
+        graph = self.graph
+        g = self.g
+        if vertex != self.end:
+            best = INFINITY
+            for neighbor in self._neighbors(vertex):
+                dist = graph.get_edge_weight(vertex, neighbor) + g.get(neighbor, INFINITY)
+                if dist < best:
+                    best = dist
+            self.rhs[vertex] = best
+
+        if vertex in self._open:
+            self._open.remove(vertex)
+        if g.get(vertex, INFINITY) != self.rhs.get(vertex, INFINITY):
+            self._open.push(vertex, self._calculate_key(vertex))
+
+    def _compute_shortest_path(self):
+        """
+        Expands inconsistent vertices until the distance from the start
+        to the end is known. Meant for internal use.
+        """
+        _open = self._open
+        g = self.g
+        rhs = self.rhs
+        start = self.start
+        while len(_open) > 0:
+            vertex, old_key = _open.peek()
+            if not self._key_less(old_key, self._calculate_key(start)) \
+                    and rhs.get(start, INFINITY) == g.get(start, INFINITY):
+                break
+
+            new_key = self._calculate_key(vertex)
+            if self._key_less(old_key, new_key):
+                _open.remove(vertex)
+                _open.push(vertex, new_key)
+            elif g.get(vertex, INFINITY) > rhs.get(vertex, INFINITY):
+                g[vertex] = rhs[vertex]
+                _open.remove(vertex)
+                for neighbor in self._neighbors(vertex):
+                    self._update_vertex(neighbor)
+            else:
+                g[vertex] = INFINITY
+                for neighbor in self._neighbors(vertex):
+                    self._update_vertex(neighbor)
+                self._update_vertex(vertex)
+
+    def update(self, *vertices):
+        """
+        Tells the planner that the edges of the specified vertices were
+        modified (added, removed or reweighted, or the cost of a GridGraph
+        cell changed) since the last call to find_path. The current
+        neighbors of each vertex are updated too, so only a vertex removed
+        from the graph (or blocked) needs its old neighbors passed as well.
+        The graph must already have been modified.
+
+        :param vertices: each vertex with modified edges
+        """
+        if self._open is None:
+            return
+        changed = set(vertices)
+        for vertex in vertices:
+            changed.update(self._neighbors(vertex))
+        for vertex in changed:
+            self._update_vertex(vertex)
+        self.version = getattr(self.graph, 'version', None)
+
+    def find_path(self, graph, start, end, heuristic_fn):
+        """
+        Calculates the optimal path from start to end on the graph. If
+        the previous call was for the same graph, end and heuristic, the
+        previous search is repaired rather than repeated: start may have
+        moved, and the graph may have been modified as long as every
+        modification was passed to `update`. If the graph's `version`
+        changed without `update` being called, the search starts over.
+
+        :param graph: the graph with 'graph' and 'get_edge_weight' (see WeightedUndirectedGraph)
+        :param start: the start vertex (must be hashable and same type as the graph)
+        :param end: the end vertex (must be hashable and same type as the graph)
+        :param heuristic_fn: a consistent heuristic. signature: function(graph, start, end) returns numeric
+        :return: a list of vertices starting at start ending at end or None
+        """
+        if self._open is None or graph is not self.graph or end != self.end \
+                or heuristic_fn is not self.heuristic_fn \
+                or getattr(graph, 'version', None) != self.version:
+            self._initialize(graph, start, end, heuristic_fn)
+        elif start != self.start:
+            # every key on the open list was calculated from the old
+            # start, so keys are raised by at most the distance moved
+            # instead of recalculating all of them
+            self.key_modifier += heuristic_fn(graph, self.start, start)
+            self.start = start
+
+        self._compute_shortest_path()
+
+        g = self.g
+        if g.get(start, INFINITY) == INFINITY:
+            return None
+
+        result = [start]
+        current = start
+        while current != end:
+            best = None
+            best_dist = INFINITY
+            for neighbor in self._neighbors(current):
+                dist = graph.get_edge_weight(current, neighbor) + g.get(neighbor, INFINITY)
+                if dist < best_dist:
+                    best = neighbor
+                    best_dist = dist
+            if best is None or len(result) > len(g) + 1:
+                return None
+            result.append(best)
+            current = best
+        return result
+
+    @staticmethod
+    def get_code():
+        """
+        returns the code for the current class
+        """
+        return inspect.getsource(DStarLite)
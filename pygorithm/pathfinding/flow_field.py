@@ -0,0 +1,171 @@
+"""
+Flow Field
+
+A flow field stores, for every vertex of a graph, the next step on
+the optimal path to one goal. It is found with a single Dijkstra
+search outward from the goal, after which any number of agents heading
+to that goal can follow it with one lookup per step instead of each
+searching for its own path.
+https://en.wikipedia.org/wiki/Vector_field
+"""
+from array import array
+import inspect
+
+from pygorithm.data_structures import graph as graph_module
+from pygorithm.pathfinding import dijkstra
+
+INFINITY = float('inf')
+
+
+class FlowField(object):
+    """FlowField object
+    The next step toward a goal from every vertex of an undirected
+    graph (see WeightedUndirectedGraph).
+
+    On a GridGraph the next step from each cell is kept as one byte in
+    a bytearray laid out like the grid's own arrays (see GridGraph.index):
+    the position of the step in GridGraph.NEIGHBOR_OFFSETS, or
+    NO_DIRECTION. On any other graph the vertices are numbered in the
+    order of `vertices` and the next step is kept as the number of the
+    next vertex in an array, or -1.
+    Either way the distance to the goal is kept in an array of doubles.
+
+    The field does not notice changes to the graph; call `build` again
+    after modifying it (find_path does so when the graph's `version`
+    changed).
+    """
+
+    NO_DIRECTION = 255
+
+    def __init__(self, graph, goal):
+        """
+        :param graph: the graph with 'graph' and 'get_edge_weight' (see WeightedUndirectedGraph)
+        :param goal: the vertex every step leads to
+        """
+        self.graph = graph
+        self.goal = goal
+        self.version = None
+        self.vertices = None
+        self.index = None
+        self.steps = None
+        self.distances = None
+        self.build()
+
+    def build(self):
+        """
+        Runs Dijkstra outward from the goal and stores the next step
+        and the distance to the goal for every vertex.
+        """
+        graph = self.graph
+        self.version = getattr(graph, 'version', None)
+        if self.goal in graph.graph:
+            distances, parents = dijkstra.Dijkstra().shortest_path_tree(graph, self.goal)
+        else:
+            distances, parents = {}, {}
+
+        if isinstance(graph, graph_module.GridGraph):
+            directions = dict((offset, i) for i, offset in enumerate(graph_module.GridGraph.NEIGHBOR_OFFSETS))
+            size = graph.width * graph.height
+            self.vertices = None
+            self.index = None
+            self.steps = bytearray([self.NO_DIRECTION]) * size
+            self.distances = array('d', [INFINITY]) * size
+            for vertex, parent in parents.items():
+                idx = graph.index(vertex)
+                self.distances[idx] = distances[vertex]
+                if parent is not None:
+                    self.steps[idx] = directions[(parent[0] - vertex[0], parent[1] - vertex[1])]
+        else:
+            self.vertices = list(graph.graph)
+            self.index = dict((vertex, i) for i, vertex in enumerate(self.vertices))
+            self.steps = array('q', [-1]) * len(self.vertices)
+            self.distances = array('d', [INFINITY]) * len(self.vertices)
+            for vertex, parent in parents.items():
+                idx = self.index[vertex]
+                self.distances[idx] = distances[vertex]
+                if parent is not None:
+                    self.steps[idx] = self.index[parent]
+
+    def _find(self, vertex):
+        """
+        The position of vertex in steps and distances, or None if
+        vertex is not in the graph. Meant for internal use.
+        """
+        if self.index is None:
+            if not self.graph.in_bounds(vertex):
+                return None
+            return self.graph.index(vertex)
+        return self.index.get(vertex, None)
+
+    def next_step(self, vertex):
+        """
+        Gets the vertex to move to from vertex on the optimal path
+        to the goal
+
+        :param vertex: the current vertex
+        :return: the next vertex, or None at the goal or if the goal can't be reached
+        """
+        idx = self._find(vertex)
+        if idx is None:
+            return None
+        step = self.steps[idx]
+        if self.index is None:
+            if step == self.NO_DIRECTION:
+                return None
+            dx, dy = graph_module.GridGraph.NEIGHBOR_OFFSETS[step]
+            return (vertex[0] + dx, vertex[1] + dy)
+        if step < 0:
+            return None
+        return self.vertices[step]
+
+    def distance(self, vertex):
+        """
+        Gets the cost of the optimal path from vertex to the goal
+
+        :param vertex: the vertex
+        :return: numeric, INFINITY if the goal can't be reached
+        """
+        idx = self._find(vertex)
+        if idx is None:
+            return INFINITY
+        return self.distances[idx]
+
+    def path(self, start):
+        """
+        Follows the field from start to the goal
+
+        :param start: the first vertex
+        :return: a list of vertices starting at start ending at the goal or None
+        """
+        if self.distance(start) == INFINITY:
+            return None
+        result = [start]
+        current = self.next_step(start)
+        while current is not None:
+            result.append(current)
+            current = self.next_step(current)
+        return result
+
+    def find_path(self, graph, start, end):
+        """
+        Calculates the optimal path from start to end, so the field
+        can be used in place of the other pathfinders. The field is
+        rebuilt first if the graph's version changed.
+
+        :param graph: the graph the field was built for
+        :param start: the start vertex
+        :param end: the end vertex, which must be the goal
+        :return: a list of vertices starting at start ending at end or None
+        """
+        if graph is not self.graph or end != self.goal:
+            raise ValueError('a flow field only finds paths to its goal on its own graph')
+        if getattr(graph, 'version', None) != self.version:
+            self.build()
+        return self.path(start)
+
+    @staticmethod
+    def get_code():
+        """
+        returns the code for the current class
+        """
+        return inspect.getsource(FlowField)
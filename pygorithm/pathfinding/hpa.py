@@ -0,0 +1,372 @@
+"""
+Hierarchical Pathfinding A* (HPA*)
+
+HPA* splits a grid into square clusters and finds the places where
+the path can cross from one cluster to the next (entrances). The
+cost of travelling between every two entrances of a cluster is
+calculated once, which gives a much smaller abstract graph of
+entrances. A long path is found on the abstract graph first and only
+then refined into cells, one cluster at a time, so long queries
+expand far fewer vertices than A* on the full grid. The paths found
+are near-optimal rather than optimal.
+https://webdocs.cs.ualberta.ca/~mmueller/ps/hpastar.pdf
+"""
+import inspect
+
+from pygorithm.data_structures import graph as graph_module
+from pygorithm.pathfinding import astar
+from pygorithm.pathfinding import dijkstra
+
+
+class _ClusterView(object):
+    """_ClusterView object
+    The part of a grid inside one cluster, for searching inside
+    that cluster only. Meant for internal use.
+    """
+
+    def __init__(self, grid, cluster, cluster_size):
+        self.grid = grid
+        self.cluster = cluster
+        self.cluster_size = cluster_size
+        self.graph = self
+
+    def __getitem__(self, vertex):
+        size = self.cluster_size
+        cluster = self.cluster
+        return [v for v in self.grid.graph[vertex]
+                if (v[0] // size, v[1] // size) == cluster]
+
+    def __contains__(self, vertex):
+        return vertex in self.grid.graph
+
+    def get_edge_weight(self, u, v):
+        return self.grid.get_edge_weight(u, v)
+
+
+class _QueryGraph(object):
+    """_QueryGraph object
+    The abstract graph with a few extra edges connecting the start
+    and end of one query to it, without modifying the abstract graph.
+    Meant for internal use.
+    """
+
+    def __init__(self, abstract):
+        self.abstract = abstract
+        self.extra = {}
+        self.extra_weights = {}
+        self.graph = self
+
+    def add_edge(self, u, v, weight):
+        old = self.get_edge_weight(u, v)
+        if old is not None and old <= weight:
+            return
+        if (u, v) not in self.extra_weights:
+            self.extra.setdefault(u, []).append(v)
+            self.extra.setdefault(v, []).append(u)
+        self.extra_weights[(u, v)] = weight
+        self.extra_weights[(v, u)] = weight
+
+    def __getitem__(self, vertex):
+        return self.abstract.graph.get(vertex, []) + self.extra.get(vertex, [])
+
+    def __contains__(self, vertex):
+        return vertex in self.abstract.graph or vertex in self.extra
+
+    def get_edge_weight(self, u, v):
+        weight = self.extra_weights.get((u, v), None)
+        if weight is not None:
+            return weight
+        return self.abstract.get_edge_weight(u, v)
+
+
+class HierarchicalAStar(object):
+    """HierarchicalAStar object
+    Finds near-optimal paths on a grid, such as a WeightedUndirectedGraph
+    built with gridify or a GridGraph, by searching an abstract graph
+    of cluster entrances first. Vertices must be (x, y) tuples with
+    non-negative coordinates.
+
+    The abstract graph is built when this object is created. When
+    the grid is modified afterward, call `update` with the modified
+    vertices so only the clusters containing them are rebuilt.
+    """
+
+    def __init__(self, graph, cluster_size=10):
+        """
+        :param graph: the grid (see WeightedUndirectedGraph and GridGraph)
+        :param cluster_size: the width and height of each cluster - type : integer
+        """
+        self.grid = graph
+        self.cluster_size = cluster_size
+        self.abstract = graph_module.WeightedUndirectedGraph()
+        # border -> [(vertex, vertex in another cluster), ...] where border is
+        # ('x', cluster) for the border right of cluster, ('y', cluster) for
+        # the border below it and ('corner', cluster) for its bottom-right corner
+        self.transitions = {}
+        # cluster -> [(entrance, entrance), ...] edges in the abstract graph
+        self.intra_edges = {}
+        self.width = 0
+        self.height = 0
+        self.build()
+
+    def cluster_of(self, vertex):
+        """
+        Determines which cluster vertex is in
+        :param vertex: (x, y)
+        :return: (cluster x, cluster y)
+        """
+        return (vertex[0] // self.cluster_size, vertex[1] // self.cluster_size)
+
+    def _clusters_shape(self):
+        """
+        The number of clusters along x and y. Meant for internal use.
+        """
+        size = self.cluster_size
+        return (self.width + size - 1) // size, (self.height + size - 1) // size
+
+    def build(self):
+        """
+        Builds the abstract graph for the whole grid from scratch.
+        """
+        self.abstract = graph_module.WeightedUndirectedGraph()
+        self.transitions = {}
+        self.intra_edges = {}
+        self.width = 0
+        self.height = 0
+        for (x, y) in self.grid.graph:
+            self.width = max(self.width, x + 1)
+            self.height = max(self.height, y + 1)
+
+        clusters_x, clusters_y = self._clusters_shape()
+        for cx in range(clusters_x):
+            for cy in range(clusters_y):
+                for kind in ('x', 'y', 'corner'):
+                    self._build_transitions((kind, (cx, cy)))
+        for cx in range(clusters_x):
+            for cy in range(clusters_y):
+                self._build_intra_edges((cx, cy))
+
+    @staticmethod
+    def _borders(cluster):
+        """
+        The borders (see transitions) that touch cluster. Meant for internal use.
+        """
+        cx, cy = cluster
+        return [('x', (cx - 1, cy)), ('x', cluster), ('y', (cx, cy - 1)), ('y', cluster),
+                ('corner', (cx - 1, cy - 1)), ('corner', (cx, cy - 1)),
+                ('corner', (cx - 1, cy)), ('corner', cluster)]
+
+    def entrances(self, cluster):
+        """
+        Finds the entrances of a cluster
+        :param cluster: (cluster x, cluster y)
+        :return: set of (x, y) in cluster
+        """
+        result = set()
+        for border in self._borders(cluster):
+            for u, v in self.transitions.get(border, ()):
+                if self.cluster_of(u) == cluster:
+                    result.add(u)
+                if self.cluster_of(v) == cluster:
+                    result.add(v)
+        return result
+
+    def _build_transitions(self, border):
+        """
+        Finds the transitions across a border and adds them to the
+        abstract graph. Every contiguous run of cells that are connected
+        straight across a side gets a transition in its middle, or one at
+        each end if it's long. Cells on either side of such a run can
+        already reach it, so diagonal connections across a side are only
+        used when neither cell is in a run. Meant for internal use.
+        """
+        kind, (cx, cy) = border
+        size = self.cluster_size
+        x = (cx + 1) * size
+        y = (cy + 1) * size
+        grid = self.grid
+
+        if kind == 'corner':
+            candidates = [((x - 1, y - 1), (x, y)), ((x - 1, y), (x, y - 1))]
+            transitions = [(u, v) for u, v in candidates if grid.get_edge_weight(u, v) is not None]
+        else:
+            if kind == 'x':
+                if x >= self.width:
+                    return
+                cells = [((x - 1, j), (x, j)) for j in range(cy * size, min(y, self.height))]
+            else:
+                if y >= self.height:
+                    return
+                cells = [((i, y - 1), (i, y)) for i in range(cx * size, min(x, self.width))]
+
+            transitions = []
+            in_runs = set()
+            run = []
+            for pair in cells + [None]:
+                if pair is not None and grid.get_edge_weight(pair[0], pair[1]) is not None:
+                    run.append(pair)
+                    in_runs.update(pair)
+                    continue
+                if len(run) >= 6:
+                    transitions.append(run[0])
+                    transitions.append(run[-1])
+                elif run:
+                    transitions.append(run[len(run) // 2])
+                run = []
+
+            for i in range(1, len(cells)):
+                for u, v in ((cells[i - 1][0], cells[i][1]), (cells[i][0], cells[i - 1][1])):
+                    if u not in in_runs and v not in in_runs and grid.get_edge_weight(u, v) is not None:
+                        transitions.append((u, v))
+
+        self.transitions[border] = transitions
+        for u, v in transitions:
+            self.abstract.add_edge(u, v, grid.get_edge_weight(u, v))
+
+    def _remove_transitions(self, border):
+        """
+        Removes the transitions across a border from the abstract
+        graph. Meant for internal use.
+        """
+        for u, v in self.transitions.pop(border, ()):
+            if self.abstract.get_edge_weight(u, v) is not None:
+                self.abstract.remove_edge(u, v)
+
+    def _search_cluster(self, cluster, source):
+        """
+        Finds the distance and parents from source to every vertex
+        reachable from it without leaving cluster. Meant for internal use.
+        """
+        view = _ClusterView(self.grid, cluster, self.cluster_size)
+        return dijkstra.Dijkstra().shortest_path_tree(view, source)
+
+    def _build_intra_edges(self, cluster):
+        """
+        Connects every pair of entrances of cluster that can reach
+        each other inside it. Meant for internal use.
+        """
+        entrances = sorted(self.entrances(cluster))
+        edges = []
+        for i, u in enumerate(entrances):
+            distances, _ = self._search_cluster(cluster, u)
+            for v in entrances[i + 1:]:
+                dist = distances.get(v, None)
+                if dist is None:
+                    continue
+                old = self.abstract.get_edge_weight(u, v)
+                if old is None or dist < old:
+                    self.abstract.add_edge(u, v, dist)
+                edges.append((u, v))
+        self.intra_edges[cluster] = edges
+
+    def _remove_intra_edges(self, cluster):
+        """
+        Removes the edges added by _build_intra_edges. Meant for internal use.
+        """
+        for u, v in self.intra_edges.pop(cluster, ()):
+            if self.abstract.get_edge_weight(u, v) is not None:
+                self.abstract.remove_edge(u, v)
+
+    def update(self, *vertices):
+        """
+        Rebuilds the parts of the abstract graph affected by changes to
+        the grid at the specified vertices: the transitions on the
+        borders of their clusters, and the entrance connections of those
+        clusters and the clusters around them. Vertices outside the area
+        the grid covered when it was built require build() instead.
+
+        :param vertices: the (x, y) of each vertex that was modified
+        """
+        clusters = set(self.cluster_of(v) for v in vertices)
+        borders = set()
+        affected = set()
+        for cluster in clusters:
+            cx, cy = cluster
+            borders.update(self._borders(cluster))
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    affected.add((cx + dx, cy + dy))
+
+        clusters_x, clusters_y = self._clusters_shape()
+        affected = [c for c in affected if 0 <= c[0] < clusters_x and 0 <= c[1] < clusters_y]
+        borders = [b for b in borders if b[1][0] >= 0 and b[1][1] >= 0]
+
+        for cluster in affected:
+            self._remove_intra_edges(cluster)
+        for border in borders:
+            self._remove_transitions(border)
+        for border in borders:
+            self._build_transitions(border)
+        for cluster in affected:
+            self._build_intra_edges(cluster)
+
+    def _refine(self, abstract_path, heuristic_fn):
+        """
+        Replaces each hop of a path on the abstract graph with the
+        cells it goes through. Meant for internal use.
+        """
+        pathfinder = astar.OneDirectionalAStar()
+        result = [abstract_path[0]]
+        for i in range(1, len(abstract_path)):
+            u = abstract_path[i - 1]
+            v = abstract_path[i]
+            cluster = self.cluster_of(u)
+            if cluster != self.cluster_of(v):
+                result.append(v)
+                continue
+            view = _ClusterView(self.grid, cluster, self.cluster_size)
+            result.extend(pathfinder.find_path(view, u, v, heuristic_fn)[1:])
+        return result
+
+    def find_path(self, graph, start, end, heuristic_fn):
+        """
+        Calculates a near-optimal path from start to end by searching
+        the abstract graph first and then the clusters along the way.
+
+        :param graph: the grid this object was created with (so that this
+                      can be used wherever OneDirectionalAStar is)
+        :param start: the start vertex, an (x, y) tuple
+        :param end: the end vertex, an (x, y) tuple
+        :param heuristic_fn: an admissable heuristic. signature: function(graph, start, end) returns numeric
+        :return: a list starting with `start` and ending with `end`, or None if no path is possible.
+        """
+        if graph is not self.grid:
+            raise ValueError('HierarchicalAStar can only find paths on the graph it was built for')
+        if start not in self.grid.graph or end not in self.grid.graph:
+            return None
+        if start == end:
+            return [start]
+
+        query = _QueryGraph(self.abstract)
+        start_cluster = self.cluster_of(start)
+        end_cluster = self.cluster_of(end)
+
+        distances, _ = self._search_cluster(start_cluster, start)
+        for entrance in self.entrances(start_cluster):
+            if entrance != start and entrance in distances:
+                query.add_edge(start, entrance, distances[entrance])
+        if end_cluster == start_cluster and end in distances:
+            query.add_edge(start, end, distances[end])
+
+        distances, _ = self._search_cluster(end_cluster, end)
+        for entrance in self.entrances(end_cluster):
+            if entrance != end and entrance in distances:
+                query.add_edge(end, entrance, distances[entrance])
+
+        if start not in query or end not in query:
+            return None
+
+        def abstract_heuristic(_, v1, v2):
+            return heuristic_fn(self.grid, v1, v2)
+
+        abstract_path = astar.OneDirectionalAStar().find_path(query, start, end, abstract_heuristic)
+        if abstract_path is None:
+            return None
+        return self._refine(abstract_path, heuristic_fn)
+
+    @staticmethod
+    def get_code():
+        """
+        returns the code for the current class
+        """
+        return inspect.getsource(HierarchicalAStar)
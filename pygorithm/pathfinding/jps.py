@@ -0,0 +1,234 @@
+"""
+Jump Point Search
+
+Jump Point Search is an optimization of A* for uniform-cost grids
+where movement is allowed to the 8 surrounding cells. Rather than
+adding every neighbor of a cell to the open list, it only follows
+the directions that could lead to a shorter path than a symmetric
+alternative, and keeps going in a straight line ("jumps") until it
+finds a cell where the path might have to turn. Only those cells
+(jump points) are expanded, which on open maps is a tiny fraction
+of what A* expands.
+https://en.wikipedia.org/wiki/Jump_point_search
+"""
+import inspect
+
+from pygorithm.data_structures import heap
+
+
+class JumpPointSearch(object):
+    """JumpPointSearch object
+    Finds the optimal path between two cells of a uniform-cost grid,
+    such as a WeightedUndirectedGraph built with gridify or a GridGraph.
+    Vertices must be (x, y) tuples and obstacles must be represented by
+    cells that are not in the graph at all (removed or blocked), rather
+    than by removing individual connections. Diagonal moves are allowed
+    past blocked corners, like they are in gridify.
+    """
+
+    def __init__(self):
+        pass
+
+    @staticmethod
+    def _walkable(graph, x, y):
+        """
+        Determines if the cell (x, y) is in the graph. Meant for
+        internal use.
+        """
+        return (x, y) in graph.graph
+
+    def _jump_straight(self, graph, x, y, dx, dy, end):
+        """
+        Moves from (x, y) horizontally (dy == 0) or vertically (dx == 0)
+        until a jump point is found. Meant for internal use.
+
+        :return: (jump point, cost from (x, y) to the jump point) or None
+        """
+        walkable = self._walkable
+        cost = 0
+        while True:
+            nx = x + dx
+            ny = y + dy
+            if not walkable(graph, nx, ny):
+                return None
+            cost += graph.get_edge_weight((x, y), (nx, ny))
+            x = nx
+            y = ny
+            if (x, y) == end:
+                return (x, y), cost
+
+            if dx != 0:
+                if (walkable(graph, x + dx, y + 1) and not walkable(graph, x, y + 1)) or \
+                        (walkable(graph, x + dx, y - 1) and not walkable(graph, x, y - 1)):
+                    return (x, y), cost
+            else:
+                if (walkable(graph, x + 1, y + dy) and not walkable(graph, x + 1, y)) or \
+                        (walkable(graph, x - 1, y + dy) and not walkable(graph, x - 1, y)):
+                    return (x, y), cost
+
+    def _jump(self, graph, x, y, dx, dy, end):
+        """
+        Moves from (x, y) in the direction (dx, dy) until a jump point
+        is found. A diagonal move stops at the first cell from which a
+        horizontal or vertical jump would find a jump point. Meant for
+        internal use.
+
+        :return: (jump point, cost from (x, y) to the jump point) or None
+        """
+        if dx == 0 or dy == 0:
+            return self._jump_straight(graph, x, y, dx, dy, end)
+
+        walkable = self._walkable
+        cost = 0
+        while True:
+            nx = x + dx
+            ny = y + dy
+            if not walkable(graph, nx, ny):
+                return None
+            cost += graph.get_edge_weight((x, y), (nx, ny))
+            x = nx
+            y = ny
+            if (x, y) == end:
+                return (x, y), cost
+
+            if (walkable(graph, x - dx, y + dy) and not walkable(graph, x - dx, y)) or \
+                    (walkable(graph, x + dx, y - dy) and not walkable(graph, x, y - dy)):
+                return (x, y), cost
+
+            if self._jump_straight(graph, x, y, dx, 0, end) is not None or \
+                    self._jump_straight(graph, x, y, 0, dy, end) is not None:
+                return (x, y), cost
+
+    def _pruned_directions(self, graph, vertex, parent):
+        """
+        Finds the directions worth searching from vertex when it was
+        reached from parent: the natural neighbors plus any forced
+        neighbors. Meant for internal use.
+
+        :return: list of (dx, dy)
+        """
+        x, y = vertex
+        # every rule below only looks at cells adjacent to vertex, so
+        # one neighbor lookup per expansion is enough
+        neighbors = set(graph.graph[vertex])
+        if parent is None:
+            return [(nx - x, ny - y) for (nx, ny) in neighbors]
+
+        dx = (x > parent[0]) - (x < parent[0])
+        dy = (y > parent[1]) - (y < parent[1])
+
+        directions = []
+        if dx != 0 and dy != 0:
+            if (x, y + dy) in neighbors:
+                directions.append((0, dy))
+            if (x + dx, y) in neighbors:
+                directions.append((dx, 0))
+            if (x + dx, y + dy) in neighbors:
+                directions.append((dx, dy))
+            if (x - dx, y) not in neighbors and (x - dx, y + dy) in neighbors:
+                directions.append((-dx, dy))
+            if (x, y - dy) not in neighbors and (x + dx, y - dy) in neighbors:
+                directions.append((dx, -dy))
+        elif dx == 0:
+            if (x, y + dy) in neighbors:
+                directions.append((0, dy))
+            if (x + 1, y) not in neighbors and (x + 1, y + dy) in neighbors:
+                directions.append((1, dy))
+            if (x - 1, y) not in neighbors and (x - 1, y + dy) in neighbors:
+                directions.append((-1, dy))
+        else:
+            if (x + dx, y) in neighbors:
+                directions.append((dx, 0))
+            if (x, y + 1) not in neighbors and (x + dx, y + 1) in neighbors:
+                directions.append((dx, 1))
+            if (x, y - 1) not in neighbors and (x + dx, y - 1) in neighbors:
+                directions.append((dx, -1))
+        return directions
+
+    @staticmethod
+    def reverse_path(parents, end):
+        """
+        Walks backward from the end jump point to the start and
+        fills in the cells between consecutive jump points, which
+        are always on a horizontal, vertical or diagonal line.
+        Meant for internal use.
+
+        :param parents: dict of jump point -> previous jump point or None
+        :param end: the last jump point
+        :return: a list of vertices ending on end
+        """
+        result = [end]
+        current = end
+        parent = parents[end]
+        while parent is not None:
+            dx = (parent[0] > current[0]) - (parent[0] < current[0])
+            dy = (parent[1] > current[1]) - (parent[1] < current[1])
+            x, y = current
+            while (x, y) != parent:
+                x += dx
+                y += dy
+                result.append((x, y))
+            current = parent
+            parent = parents[current]
+        result.reverse()
+        return result
+
+    def find_path(self, graph, start, end, heuristic_fn):
+        """
+        Calculates the optimal path from start to end on a
+        uniform-cost grid. The result is the same as
+        OneDirectionalAStar.find_path with the same heuristic,
+        though when there are several optimal paths a different
+        one may be returned.
+
+        :param graph:        object contains `graph` and `get_edge_weight` as per
+                             pygorithm.data_structures.WeightedUndirectedGraph (built with gridify)
+                             or pygorithm.data_structures.GridGraph (with every cell the same cost)
+        :param start:        the start vertex, an (x, y) tuple
+        :param end:          the end vertex, an (x, y) tuple
+        :param heuristic_fn: an admissable heuristic. signature: function(graph, start, end) returns numeric
+        :return:      a list starting with `start` and ending with `end`, or None if no path is possible.
+        """
+        _open = heap.IndexedHeap()
+        dist_start_to_here = {start: 0}
+        parents = {start: None}
+        closed = set()
+
+        _open.push(start, heuristic_fn(graph, start, end))
+
+        while len(_open) > 0:
+            current, _ = _open.pop()
+            closed.add(current)
+
+            if current == end:
+                return self.reverse_path(parents, end)
+
+            current_dist = dist_start_to_here[current]
+            for dx, dy in self._pruned_directions(graph, current, parents[current]):
+                jumped = self._jump(graph, current[0], current[1], dx, dy, end)
+                if jumped is None:
+                    continue
+                jump_point, cost = jumped
+                if jump_point in closed:
+                    continue
+
+                dist = current_dist + cost
+                old_dist = dist_start_to_here.get(jump_point, None)
+                if old_dist is not None and old_dist <= dist:
+                    continue
+
+                dist_start_to_here[jump_point] = dist
+                parents[jump_point] = current
+                if old_dist is None:
+                    _open.push(jump_point, dist + heuristic_fn(graph, jump_point, end))
+                else:
+                    _open.decrease_key(jump_point, dist + heuristic_fn(graph, jump_point, end))
+
+        return None
+
+    @staticmethod
+    def get_code():
+        """
+        returns the code for the current class
+        """
+        return inspect.getsource(JumpPointSearch)
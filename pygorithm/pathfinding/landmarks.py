@@ -0,0 +1,192 @@
+"""
+Landmarks (ALT)
+
+A heuristic for A* on any weighted graph, not only grids, found by
+precomputing the distance from a few landmark vertices to every other
+vertex. By the triangle inequality, the distance between two vertices
+is at least the difference of their distances to any landmark, so the
+largest such difference is an admissable (and consistent) heuristic.
+Landmarks far apart on the edges of the graph give the best estimates.
+https://en.wikipedia.org/wiki/A*_search_algorithm
+"""
+from array import array
+import inspect
+
+from pygorithm.data_structures import array_file
+from pygorithm.pathfinding import dijkstra
+
+INFINITY = float('inf')
+
+
+class LandmarkHeuristic(object):
+    """LandmarkHeuristic object
+    Picks landmarks on an undirected graph, stores the distance from
+    each landmark to every vertex, and acts as the `heuristic_fn` of a
+    pathfinder, e.g. `astar.OneDirectionalAStar().find_path(graph, start,
+    end, LandmarkHeuristic(graph))`.
+
+    The distances are kept in one flat array with a row of one distance
+    per landmark for each vertex. The tables can be saved to a file and
+    loaded again with the distances memory-mapped rather than read, so
+    worker processes share them instead of recomputing or copying them.
+
+    The heuristic is only admissable while no edge gets cheaper than it
+    was when the tables were calculated; rebuild it after such a change.
+    Vertices added since then get a heuristic of 0.
+    """
+
+    # the magic number of files written by save; the header holds the
+    # vertices and landmarks, and the only array is the distances
+    _MAGIC = b'PGALT2\x00\x00'
+
+    def __init__(self, graph=None, count=8, landmarks=None):
+        """
+        :param graph: the graph with 'graph' and 'get_edge_weight' (see WeightedUndirectedGraph),
+                      or None for an empty object (see load)
+        :param count: the number of landmarks to pick - type : integer
+        :param landmarks: the landmarks to use instead of picking them - type : list of vertices
+        """
+        self.vertices = []
+        self.landmarks = []
+        self.index = {}
+        self.distances = array('d')
+        self._mmap = None
+        if graph is not None:
+            self.build(graph, count, landmarks)
+
+    def build(self, graph, count=8, landmarks=None):
+        """
+        Calculates the distance tables, with one Dijkstra search per
+        landmark. Unless they are given, landmarks are picked one by one
+        as the vertex farthest from every landmark picked so far (in
+        another connected component if there is one), starting from the
+        vertex farthest from an arbitrary vertex.
+
+        :param graph: the graph with 'graph' and 'get_edge_weight' (see WeightedUndirectedGraph)
+        :param count: the number of landmarks to pick - type : integer
+        :param landmarks: the landmarks to use instead of picking them - type : list of vertices
+        """
+        self.close()
+        self.vertices = list(graph.graph)
+        self.index = dict((vertex, i) for i, vertex in enumerate(self.vertices))
+        pathfinder = dijkstra.Dijkstra()
+
+        if landmarks is not None:
+            self.landmarks = list(landmarks)
+            tables = [pathfinder.shortest_path_tree(graph, landmark)[0] for landmark in self.landmarks]
+        else:
+            self.landmarks = []
+            tables = []
+            if len(self.vertices) > 0:
+                # the distance from each vertex to its closest landmark so far
+                closest = dict.fromkeys(self.vertices, INFINITY)
+                candidate = self._farthest(pathfinder.shortest_path_tree(graph, self.vertices[0])[0])
+                while len(self.landmarks) < count and candidate not in self.landmarks:
+                    table = pathfinder.shortest_path_tree(graph, candidate)[0]
+                    self.landmarks.append(candidate)
+                    tables.append(table)
+                    for vertex in self.vertices:
+                        dist = table.get(vertex, INFINITY)
+                        if dist < closest[vertex]:
+                            closest[vertex] = dist
+                    candidate = self._farthest(closest)
+
+        distances = array('d')
+        for vertex in self.vertices:
+            distances.extend(table.get(vertex, INFINITY) for table in tables)
+        self.distances = distances
+
+    @staticmethod
+    def _farthest(distances):
+        """
+        Returns the vertex with the highest distance, preferring an
+        unreachable one. Meant for internal use.
+        """
+        return max(distances, key=distances.get)
+
+    def __call__(self, graph, start, end):
+        """
+        The heuristic function: a lower bound on the distance from
+        start to end.
+
+        :param graph: unused, for the `heuristic_fn` signature
+        :param start: the first vertex
+        :param end: the second vertex
+        :return: numeric, INFINITY if there is no path at all
+        """
+        start_idx = self.index.get(start, None)
+        end_idx = self.index.get(end, None)
+        if start_idx is None or end_idx is None or start_idx == end_idx:
+            return 0
+
+        count = len(self.landmarks)
+        distances = self.distances
+        start_row = start_idx * count
+        end_row = end_idx * count
+        best = 0
+        for i in range(count):
+            to_start = distances[start_row + i]
+            to_end = distances[end_row + i]
+            if to_start == INFINITY or to_end == INFINITY:
+                if to_start != to_end:
+                    # one of them is reachable from the landmark
+                    return INFINITY
+                continue
+            diff = abs(to_start - to_end)
+            if diff > best:
+                best = diff
+        return best
+
+    def save(self, path):
+        """
+        Writes the tables to a file (see array_file). The vertices must be
+        None, bools, numbers, strings or tuples of them.
+
+        :param path: the file name
+        """
+        array_file.save(path, self._MAGIC, {'vertices': self.vertices, 'landmarks': self.landmarks},
+                        [self.distances])
+
+    @staticmethod
+    def load(path):
+        """
+        Reads tables written by save. The distances are memory-mapped,
+        so they are only read from the file as they are used and are
+        shared between processes that load the same file.
+
+        :param path: the file name
+        :return: a LandmarkHeuristic
+        :raises ValueError: if the file wasn't written by LandmarkHeuristic.save
+        """
+        header, arrays, mapping = array_file.load(path, LandmarkHeuristic._MAGIC, 'landmark table')
+        result = LandmarkHeuristic()
+        result.vertices = header['vertices']
+        result.landmarks = header['landmarks']
+        result.distances, = arrays
+        result._mmap = mapping
+        result.index = dict((vertex, i) for i, vertex in enumerate(result.vertices))
+        return result
+
+    def close(self):
+        """
+        Releases the memory-mapped file, if the tables were loaded
+        from one.
+        """
+        if self._mmap is not None:
+            array_file.close([self.distances], self._mmap)
+            self.distances = array('d')
+            self._mmap = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if self._mmap is not None:
+            state['distances'] = array_file.copy(self.distances)
+            state['_mmap'] = None
+        return state
+
+    @staticmethod
+    def get_code():
+        """
+        returns the code for the current class
+        """
+        return inspect.getsource(LandmarkHeuristic)
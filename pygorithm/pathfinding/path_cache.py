@@ -0,0 +1,154 @@
+"""
+Path Cache
+
+Remembers the paths a pathfinder has found so that asking for the
+same path again on an unchanged graph doesn't search again. Cached
+paths are thrown away as soon as the graph they were found on is
+modified, and the least recently used paths are evicted once the
+cache holds too many paths or too many vertices in total.
+https://en.wikipedia.org/wiki/Cache_replacement_policies#Least_recently_used_(LRU)
+"""
+from collections import OrderedDict
+import inspect
+
+
+class PathCache(object):
+    """PathCache object
+    Wraps a pathfinder (such as Dijkstra, OneDirectionalAStar or
+    BiDirectionalAStar) and caches the result of `find_path`. The
+    graph must have a `version` that changes every time it is
+    modified, like WeightedUndirectedGraph and GridGraph do.
+    """
+
+    def __init__(self, pathfinder, max_paths=1024, max_vertices=None):
+        """
+        :param pathfinder: object with `find_path(graph, start, end, ...)`
+        :param max_paths: the most paths kept at once - type : integer
+        :param max_vertices: the most vertices kept at once, summed over every
+                             cached path, or None for no limit - type : integer
+        """
+        self.pathfinder = pathfinder
+        self.max_paths = max_paths
+        self.max_vertices = max_vertices
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.vertices = 0
+        self._paths = OrderedDict()
+        # graph -> its version, and graph -> the number of paths cached for
+        # it; both entries are dropped along with the graph's last path so
+        # the cache doesn't keep graphs that are no longer used alive
+        self._versions = {}
+        self._counts = {}
+
+    def __len__(self):
+        return len(self._paths)
+
+    @staticmethod
+    def _size(path):
+        """
+        The number of vertices a cached path counts toward
+        max_vertices (a cached None still counts as one).
+        Meant for internal use.
+        """
+        return 1 if path is None else len(path)
+
+    def _forget(self, graph):
+        """
+        Counts one path fewer cached for graph, dropping the graph
+        when none are left. Meant for internal use.
+        """
+        count = self._counts[graph] - 1
+        if count == 0:
+            del self._counts[graph]
+            del self._versions[graph]
+        else:
+            self._counts[graph] = count
+
+    def _invalidate(self, graph):
+        """
+        Removes every path found on graph. Meant for internal use.
+        """
+        stale = [key for key in self._paths if key[0] is graph]
+        for key in stale:
+            self.vertices -= self._size(self._paths.pop(key))
+        self.invalidations += len(stale)
+        self._counts.pop(graph, None)
+        self._versions.pop(graph, None)
+
+    def _evict(self):
+        """
+        Removes least recently used paths until the cache is within
+        its limits. Meant for internal use.
+        """
+        while len(self._paths) > self.max_paths or \
+                (self.max_vertices is not None and self.vertices > self.max_vertices and len(self._paths) > 0):
+            key, path = self._paths.popitem(last=False)
+            self.vertices -= self._size(path)
+            self.evictions += 1
+            self._forget(key[0])
+
+    def find_path(self, graph, start, end, *args):
+        """
+        Returns the same as `pathfinder.find_path(graph, start, end, *args)`,
+        searching only if this path was not found on the current
+        version of graph already.
+
+        :param graph: the graph (must have `version`, see WeightedUndirectedGraph)
+        :param start: the start vertex
+        :param end: the end vertex
+        :param args: any other arguments to find_path (such as the heuristic)
+        :return: a list of vertices starting at start ending at end or None
+        """
+        version = self._versions.get(graph, None)
+        if version is None or version != graph.version:
+            if version is not None:
+                self._invalidate(graph)
+            self._versions[graph] = graph.version
+            self._counts[graph] = 0
+
+        key = (graph, start, end, args)
+        if key in self._paths:
+            self.hits += 1
+            path = self._paths.pop(key)
+            self._paths[key] = path
+        else:
+            self.misses += 1
+            path = self.pathfinder.find_path(graph, start, end, *args)
+            self._paths[key] = path
+            self._counts[graph] += 1
+            self.vertices += self._size(path)
+            self._evict()
+
+        return None if path is None else list(path)
+
+    def clear(self):
+        """
+        Removes every cached path. Statistics are kept.
+        """
+        self._paths.clear()
+        self._versions.clear()
+        self._counts.clear()
+        self.vertices = 0
+
+    def stats(self):
+        """
+        Returns the cache statistics
+        :return: dict with `hits`, `misses`, `evictions`, `invalidations`,
+                 `paths` (number of cached paths) and `vertices` (total
+                 vertices in cached paths)
+        """
+        return {'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'paths': len(self._paths),
+                'vertices': self.vertices}
+
+    @staticmethod
+    def get_code():
+        """
+        returns the code for the current class
+        """
+        return inspect.getsource(PathCache)
@@ -2,31 +2,138 @@
 Author: OMKAR PATHAK
 Created On: 1st August 2017
 """
+from array import array
+from collections import deque
 import inspect
 
 
+def _neighbors(graph, vertex):
+    """
+    the neighbors of vertex, or nothing if it has none
+    """
+    if vertex not in graph or graph[vertex] is None:
+        return ()
+    return graph[vertex]
+
+
 def search(graph, start_vertex):
     """
     Breadth first search algorithm
     
-    :param graph: 
+    :param graph: dict of vertex -> neighbors (any iterable), or the `graph` of a
+                  graph object such as CSRGraph
     :param start_vertex: 
-    :return: 
+    :return: the set of vertices reachable from start_vertex, or None if it has no neighbors
     """
 
-    # Take a list for storing already visited vertexes
     if start_vertex not in graph or graph[start_vertex] is None or graph[start_vertex] == []:
         return None
 
-    # create a list to store all the vertexes for BFS and a set to store the visited vertices
-    visited, queue = set(), [start_vertex]
+    # traverse queues each vertex once, with a deque rather than list.pop(0)
+    return set(traverse(graph, start_vertex))
+
+
+def traverse(graph, start_vertex):
+    """
+    Breadth first search algorithm as a generator: yields each vertex
+    reachable from start_vertex, closest first, as soon as it is reached
 
+    :param graph: dict of vertex -> neighbors, or the `graph` of a graph object
+    :param start_vertex: the first vertex
+    :return: generator of vertices
+    """
+    visited = {start_vertex}
+    queue = deque([start_vertex])
     while queue:
-        vertex = queue.pop(0)
-        if vertex not in visited:
-            visited.add(vertex)
-            queue.extend(graph[vertex] - visited)
-    return visited
+        vertex = queue.popleft()
+        yield vertex
+        for neighbor in _neighbors(graph, vertex):
+            if neighbor not in visited:
+                visited.add(neighbor)
+                queue.append(neighbor)
+
+
+def search_tree(graph, start_vertex):
+    """
+    Breadth first search algorithm that records how each vertex was reached
+
+    :param graph: dict of vertex -> neighbors, or the `graph` of a graph object
+    :param start_vertex: the first vertex
+    :return: (distances, parents) where distances is a dict of vertex -> number of
+             edges from start_vertex and parents is a dict of vertex -> the vertex it
+             was reached from (None for start_vertex), for every reachable vertex
+    """
+    distances = {start_vertex: 0}
+    parents = {start_vertex: None}
+    queue = deque([start_vertex])
+    while queue:
+        vertex = queue.popleft()
+        distance = distances[vertex] + 1
+        for neighbor in _neighbors(graph, vertex):
+            if neighbor not in distances:
+                distances[neighbor] = distance
+                parents[neighbor] = vertex
+                queue.append(neighbor)
+    return distances, parents
+
+
+def levels(graph, start_vertex):
+    """
+    Breadth first search algorithm that groups vertices by distance
+
+    :param graph: dict of vertex -> neighbors, or the `graph` of a graph object
+    :param start_vertex: the first vertex
+    :return: list of lists, where the list at index i holds the vertices i edges from start_vertex
+    """
+    visited = {start_vertex}
+    result = []
+    frontier = [start_vertex]
+    while frontier:
+        result.append(frontier)
+        next_frontier = []
+        for vertex in frontier:
+            for neighbor in _neighbors(graph, vertex):
+                if neighbor not in visited:
+                    visited.add(neighbor)
+                    next_frontier.append(neighbor)
+        frontier = next_frontier
+    return result
+
+
+def frontier_search(csr, start_vertex):
+    """
+    Level-synchronous breadth first search over an array-backed graph
+    (see CSRGraph): the whole frontier is expanded at once, reading each
+    vertex's edges as one slice of `targets` and marking vertices in flat
+    arrays indexed by vertex number rather than in sets and dicts
+
+    :param csr: a CSRGraph
+    :param start_vertex: the first vertex
+    :return: (distances, parents), arrays indexed by vertex number (the position in
+             csr.vertices) holding the number of edges from start_vertex and the number
+             of the vertex it was reached from, or -1 for vertices that can't be reached
+             (and for the parent of start_vertex)
+    """
+    offsets = csr.offsets
+    targets = csr.targets
+    distances = array('q', [-1]) * len(csr.vertices)
+    parents = array('q', [-1]) * len(csr.vertices)
+
+    start = csr.index[start_vertex]
+    distances[start] = 0
+    frontier = [start]
+    level = 0
+    while frontier:
+        level += 1
+        next_frontier = []
+        for vertex in frontier:
+            for neighbor in targets[offsets[vertex]:offsets[vertex + 1]]:
+                if distances[neighbor] < 0:
+                    distances[neighbor] = level
+                    parents[neighbor] = vertex
+                    next_frontier.append(neighbor)
+        frontier = next_frontier
+    return distances, parents
 
 
 # TODO: Are these necessary?
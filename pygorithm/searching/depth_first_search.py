@@ -5,23 +5,63 @@ Created On: 1st August 2017
 import inspect
 
 
-def search(graph, start, path=[]):
+def _neighbors(graph, vertex):
+    """
+    the neighbors of vertex, or nothing if it has none
+    """
+    if vertex not in graph or graph[vertex] is None:
+        return ()
+    return graph[vertex]
+
+
+def traverse(graph, start, visited=None):
+    """
+    depth first search algorithm as a generator: yields each vertex
+    reachable from start as soon as it is reached. It uses an explicit
+    stack rather than recursion, so there is no limit on how deep the
+    graph can be, and the caller can stop at any point.
+
+    :param graph: dict of vertex -> neighbors, or the `graph` of a graph object
+    :param start: the first vertex
+    :param visited: set of vertices to treat as already visited, which is updated
+    :return: generator of vertices, in the order they are visited
+    """
+    if visited is None:
+        visited = set()
+    if start in visited:
+        return
+    visited.add(start)
+    yield start
+
+    stack = [iter(_neighbors(graph, start))]
+    while stack:
+        for edge in stack[-1]:
+            if edge not in visited:
+                visited.add(edge)
+                yield edge
+                stack.append(iter(_neighbors(graph, edge)))
+                break
+        else:
+            stack.pop()
+
+
+def search(graph, start, path=None):
     """
     depth first search algorithm
 
-    :param graph:
-    :param start:
-    :param path:
-    :return:
+    :param graph: dict of vertex -> neighbors, or the `graph` of a graph object
+    :param start: the first vertex
+    :param path: vertices already visited, which are put first in the result
+    :return: the vertices visited, in order. Vertices without neighbors are left out
     """
+    path = [] if path is None else list(path)
     # check if graph is empty or start vertex is none
     if start not in graph or graph[start] is None or graph[start] == []:
         return path
 
-    path = path + [start]
-    for edge in graph[start]:
-        if edge not in path:
-            path = search(graph, edge, path)
+    for vertex in traverse(graph, start, set(path)):
+        if vertex in graph and graph[vertex] is not None and graph[vertex] != []:
+            path.append(vertex)
     return path
 
 
@@ -1,8 +1,18 @@
 # -*- coding: utf-8 -*-
 import unittest
+from array import array
+import os
+import pickle
 import random 
+import struct
+import sys
+import tempfile
+import time
 
 from pygorithm.data_structures import (
+    array_file,
+    connected_components,
+    disjoint_set,
     stack,
     queue,
     linked_list,
@@ -71,6 +81,385 @@ class TestKruskal(unittest.TestCase):
         self.assertEqual(wgraph.kruskal_mst(), expected)
 
 
+class TestPrim(unittest.TestCase):
+    def test_minimum_spanning_tree(self):
+        edges_weighted = [((1, 2), 7), ((2, 3), 8), ((1, 4), 5), ((2, 4), 9),
+                          ((2, 5), 7), ((3, 5), 5), ((4, 6), 6), ((5, 6), 8),
+                          ((5, 7), 9), ((6, 7), 11), ((4, 5), 15)]
+        wgraph = graph.WeightedGraph()
+        for (u, v), weight in edges_weighted:
+            wgraph.add_edge(u, v, weight)
+        expected = [((1, 4), 5), ((3, 5), 5), ((4, 6), 6), ((1, 2), 7), ((2, 5), 7), ((5, 7), 9)]
+        self.assertEqual(sorted(wgraph.prim_mst()), sorted(expected))
+
+    def test_forest(self):
+        wgraph = graph.WeightedGraph()
+        wgraph.add_edge(1, 2, 3)
+        wgraph.add_edge(2, 3, 1)
+        wgraph.add_edge(1, 3, 2)
+        wgraph.add_edge(4, 5, 4)
+        self.assertEqual(sorted(wgraph.kruskal_mst()), sorted(wgraph.prim_mst()))
+        self.assertEqual(3, len(wgraph.prim_mst()))
+
+
+class TestMinimumSpanningTreeBenchmark(unittest.TestCase):
+    # Compares Kruskal (sorting every edge, with a disjoint set) with
+    # Prim (growing the tree with an indexed heap) on a sparse and a
+    # dense random graph. Both must find trees of the same weight.
+    def compare(self, name, vertex_count, edge_count):
+        rng = random.Random(vertex_count)
+        wgraph = graph.WeightedGraph()
+        # a path through every vertex keeps the graph connected
+        for v in range(1, vertex_count):
+            wgraph.add_edge(rng.randrange(v), v, rng.randint(1, 1000))
+        while len(wgraph.graph) < edge_count:
+            u = rng.randrange(vertex_count)
+            v = rng.randrange(vertex_count)
+            if u != v and wgraph.get_weight(u, v) is None:
+                wgraph.add_edge(u, v, rng.randint(1, 1000))
+
+        results = []
+        for find_tree in (wgraph.kruskal_mst, wgraph.prim_mst):
+            started_at = time.time()
+            tree_edges = find_tree()
+            results.append((time.time() - started_at, tree_edges))
+        (kruskal_time, kruskal_edges), (prim_time, prim_edges) = results
+
+        print('{}: {} vertices, {} edges: Kruskal {}s, Prim {}s'.format(
+            name, vertex_count, edge_count, round(kruskal_time, 4), round(prim_time, 4)))
+        self.assertEqual(vertex_count - 1, len(kruskal_edges))
+        self.assertEqual(vertex_count - 1, len(prim_edges))
+        self.assertEqual(sum(weight for _, weight in kruskal_edges), sum(weight for _, weight in prim_edges))
+
+    def test_sparse(self):
+        self.compare('sparse', 20000, 60000)
+
+    def test_dense(self):
+        self.compare('dense', 400, 60000)
+
+
+class TestDisjointSet(unittest.TestCase):
+    def test_union_find(self):
+        sets = disjoint_set.DisjointSet(range(6))
+        self.assertEqual(6, sets.count)
+        self.assertEqual(6, len(sets))
+        self.assertTrue(sets.union(0, 1))
+        self.assertTrue(sets.union(2, 3))
+        self.assertTrue(sets.union(1, 3))
+        self.assertFalse(sets.union(0, 2))
+        self.assertEqual(3, sets.count)
+        self.assertTrue(sets.connected(0, 3))
+        self.assertFalse(sets.connected(0, 4))
+        self.assertFalse(sets.connected(0, 'missing'))
+        self.assertEqual(sets.find(0), sets.find(2))
+        self.assertEqual([[0, 1, 2, 3], [4], [5]], sorted(sorted(s) for s in sets.sets()))
+
+        self.assertTrue(sets.union('a', 5))
+        self.assertIn('a', sets)
+        self.assertFalse(sets.make_set('a'))
+        self.assertEqual(3, sets.count)
+
+    def test_path_compression(self):
+        sets = disjoint_set.DisjointSet()
+        # union by rank keeps trees shallow, so build a deep chain by hand
+        for i in range(1, 100000):
+            sets.make_set(i - 1)
+            sets.make_set(i)
+            sets.parent[i - 1] = i
+            sets.count -= 1
+        root = sets.find(0)
+        self.assertEqual(99999, root)
+        self.assertEqual(root, sets.parent[50000])
+        self.assertEqual(1, sets.count)
+
+class CountingTopologicalSort(graph.DynamicTopologicalSort):
+    # counts the vertices given new positions
+    moved = 0
+
+    def _reorder(self, backward, forward):
+        self.moved += len(backward) + len(forward)
+        super(CountingTopologicalSort, self)._reorder(backward, forward)
+
+
+class TestDynamicTopologicalSortBenchmark(unittest.TestCase):
+    # Adds batches of random edges to a graph that already has many,
+    # comparing a DynamicTopologicalSort with sorting a TopologicalSort
+    # again after every batch, which visits every vertex each time. The
+    # dynamic order is checked on the number of vertices it moves.
+    vertex_count = 5000
+    edge_count = 20000
+    new_edge_count = 1000
+    batch_size = 10
+
+    def test_batches(self):
+        rng = random.Random(12)
+        edges = []
+        while len(edges) < self.edge_count + self.new_edge_count:
+            u = rng.randrange(self.vertex_count - 1)
+            edges.append((u, rng.randrange(u + 1, min(u + 50, self.vertex_count))))
+        rng.shuffle(edges)
+
+        staticGraph = graph.TopologicalSort()
+        for u, v in edges[:self.edge_count]:
+            staticGraph.add_edge(u, v)
+        dynamicGraph = CountingTopologicalSort()
+        # the existing graph's order first, so its edges need no moves
+        for vertex in staticGraph.topological_sort():
+            dynamicGraph.add_vertex(vertex)
+        for u, v in edges[:self.edge_count]:
+            dynamicGraph.add_edge(u, v)
+
+        started_at = time.time()
+        for start in range(self.edge_count, len(edges), self.batch_size):
+            for u, v in edges[start:start + self.batch_size]:
+                staticGraph.add_edge(u, v)
+            static_order = staticGraph.topological_sort()
+        static_time = time.time() - started_at
+
+        dynamicGraph.moved = 0
+        started_at = time.time()
+        for start in range(self.edge_count, len(edges), self.batch_size):
+            for u, v in edges[start:start + self.batch_size]:
+                dynamicGraph.add_edge(u, v)
+            dynamic_order = dynamicGraph.topological_sort()
+        dynamic_time = time.time() - started_at
+
+        for order in (static_order, dynamic_order):
+            position = dict((vertex, i) for i, vertex in enumerate(order))
+            for u, v in edges:
+                self.assertLess(position[u], position[v])
+
+        batches = self.new_edge_count // self.batch_size
+        print('{} edges added to {} in batches of {}: sorting again {}s, dynamic order {}s ({} vertices moved)'.format(
+            self.new_edge_count, self.edge_count, self.batch_size, round(static_time, 4), round(dynamic_time, 4),
+            dynamicGraph.moved))
+        self.assertLess(dynamicGraph.moved * 5, len(static_order) * batches)
+
+class TestStronglyConnectedComponentsBenchmark(unittest.TestCase):
+    # Finds the components of a random sparse graph with many small
+    # cycles and times it, checking that the components are the same
+    # as the sets of vertices that reach each other.
+    vertex_count = 100000
+    edge_count = 200000
+
+    def test_random_graph(self):
+        rng = random.Random(21)
+        myGraph = graph.StronglyConnectedComponents()
+        for _ in range(self.edge_count):
+            u = rng.randrange(self.vertex_count)
+            # mostly forward edges, with a few short ones back
+            v = u + rng.randrange(-3, 50)
+            if 0 <= v < self.vertex_count:
+                myGraph.add_edge(u, v)
+
+        started_at = time.time()
+        components, dag = myGraph.condensation()
+        elapsed = time.time() - started_at
+
+        self.assertEqual(len(set(myGraph._vertices())), sum(len(component) for component in components))
+        for i in dag.graph:
+            for j in dag.graph[i]:
+                self.assertLess(i, j)
+        for component in components[:20]:
+            reachable = set()
+            stack = [component[0]]
+            while stack:
+                vertex = stack.pop()
+                for adjacent_node in myGraph.graph.get(vertex, ()):
+                    if adjacent_node not in reachable:
+                        reachable.add(adjacent_node)
+                        stack.append(adjacent_node)
+            if len(component) > 1:
+                self.assertTrue(set(component) <= reachable)
+
+        print('{} edges: {} components, largest {}, found with the condensation in {}s'.format(
+            myGraph.count, len(components), max(len(component) for component in components), round(elapsed, 4)))
+
+class TestEdgeFileBenchmark(unittest.TestCase):
+    # Compares building a WeightedUndirectedGraph with add_edge from a
+    # text edge list with the bulk loaders, from the same list as text
+    # and as a binary edge file. Only runs with PYGORITHM_LARGE_BENCHMARKS
+    # set.
+    vertex_count = 50000
+    edge_count = 300000
+
+    @unittest.skipUnless(os.environ.get('PYGORITHM_LARGE_BENCHMARKS'), 'set PYGORITHM_LARGE_BENCHMARKS to run')
+    def test_load(self):
+        rng = random.Random(2)
+        edges = [(rng.randrange(self.vertex_count), rng.randrange(self.vertex_count), rng.randrange(1, 100))
+                 for _ in range(self.edge_count)]
+        with tempfile.TemporaryDirectory() as directory:
+            text_path = os.path.join(directory, 'edges.txt')
+            with open(text_path, 'w') as out:
+                for u, v, weight in edges:
+                    out.write('{} {} {}\n'.format(u, v, weight))
+            binary_path = os.path.join(directory, 'edges.bin')
+            graph.CSRGraph.write_binary_edge_file(binary_path, edges)
+
+            started_at = time.time()
+            myGraph = graph.WeightedUndirectedGraph()
+            for u, v, weight in graph.CSRGraph.read_edge_file(text_path):
+                myGraph.add_edge(u, v, weight)
+            add_edge_time = time.time() - started_at
+
+            started_at = time.time()
+            bulkGraph = graph.WeightedUndirectedGraph.from_edges(graph.CSRGraph.read_edge_file(text_path))
+            bulk_time = time.time() - started_at
+
+            started_at = time.time()
+            text_csr = graph.CSRGraph.from_edge_file(text_path, directed=False)
+            text_time = time.time() - started_at
+
+            started_at = time.time()
+            binary_csr = graph.CSRGraph.from_binary_edge_file(binary_path, directed=False)
+            binary_time = time.time() - started_at
+
+        self.assertEqual(myGraph.weights, bulkGraph.weights)
+        self.assertEqual(len(myGraph.weights), len(text_csr.targets))
+        self.assertEqual(list(text_csr.targets), list(binary_csr.targets))
+        u, v, weight = edges[-1]
+        self.assertEqual(myGraph.get_edge_weight(u, v), binary_csr.get_edge_weight(v, u))
+
+        # the containers only, not the vertices and weights in them
+        dict_bytes = sys.getsizeof(myGraph.graph) + sys.getsizeof(myGraph.weights) + \
+            sum(sys.getsizeof(neighbors) for neighbors in myGraph.graph.values()) + \
+            sum(sys.getsizeof(key) for key in myGraph.weights)
+        csr_bytes = sum(sys.getsizeof(values) for values in (binary_csr.offsets, binary_csr.targets, binary_csr.weights)) + \
+            sys.getsizeof(binary_csr.vertices) + sys.getsizeof(binary_csr.index)
+        print('{} edges: add_edge {}s, WeightedUndirectedGraph.from_edges {}s, '
+              'CSRGraph from text {}s, from binary {}s; {} MB of dicts and lists, {} MB as CSR'.format(
+                  len(edges), round(add_edge_time, 4), round(bulk_time, 4),
+                  round(text_time, 4), round(binary_time, 4),
+                  round(dict_bytes / 1e6, 1), round(csr_bytes / 1e6, 1)))
+
+
+class TestArrayFile(unittest.TestCase):
+    def test_save_and_load(self):
+        header = {'vertices': [(0, 1), 'a', 3, 2.5, None, ((1, 2), 'b')], 'directed': True}
+        integers = array('q', [1, -2, 3])
+        doubles = array('d', [0.5, float('inf')])
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'arrays.bin')
+            array_file.save(path, b'TEST\x00\x00\x00\x00', header, [integers, doubles, array('q')])
+            loaded, arrays, mapping = array_file.load(path, b'TEST\x00\x00\x00\x00', 'test file')
+            try:
+                self.assertEqual(header, loaded)
+                self.assertEqual([[1, -2, 3], [0.5, float('inf')], []], [list(values) for values in arrays])
+                copied = array_file.copy(arrays[1])
+                self.assertEqual(doubles, copied)
+            finally:
+                array_file.close(arrays, mapping)
+            self.assertEqual([0.5, float('inf')], list(copied))
+            
+            self.assertRaises(ValueError, array_file.load, path, b'OTHER\x00\x00\x00', 'test file')
+    
+    def test_rejects_bad_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'arrays.bin')
+            self.assertRaises(TypeError, array_file.save, path, b'TEST\x00\x00\x00\x00',
+                              {'vertices': [frozenset()]}, [])
+            self.assertRaises(ValueError, array_file.save, path, b'TEST\x00\x00\x00\x00', {}, [array('i')])
+            
+            # a pickled header is never unpickled
+            payload = pickle.dumps({'header': {}, 'arrays': []})
+            # and arrays longer than the file are refused
+            too_long = b'{"header": {}, "arrays": [["q", 9]]}'
+            for contents in (b'TEST', struct.pack('<8sQ', b'TEST\x00\x00\x00\x00', len(payload)) + payload,
+                             struct.pack('<8sQ', b'TEST\x00\x00\x00\x00', len(too_long)) + too_long):
+                with open(path, 'wb') as out:
+                    out.write(contents)
+                self.assertRaises(ValueError, array_file.load, path, b'TEST\x00\x00\x00\x00', 'test file')
+
+class TestConnectedComponents(unittest.TestCase):
+    def test_find_components(self):
+        edges = [(0, 1), (1, 2), (3, 4), ('a', 'b')]
+        components, has_cycle = connected_components.find_components(edges, vertices=[9])
+        self.assertEqual([['0', '1', '2'], ['3', '4'], ['9'], ['a', 'b']],
+                         sorted(sorted(map(str, component)) for component in components))
+        self.assertFalse(has_cycle)
+
+        self.assertTrue(connected_components.find_components(edges + [(2, 0)])[1])
+        self.assertTrue(connected_components.find_components([(5, 5)])[1])
+        self.assertEqual(([], False), connected_components.find_components([]))
+
+    def test_matches_check_cycle(self):
+        rng = random.Random(3)
+        for has_extra_edge in (False, True):
+            myGraph = graph.CheckCycleUndirectedGraph()
+            edges = [(rng.randrange(v), v) for v in range(1, 200)]
+            if has_extra_edge:
+                edges.append((150, 20))
+            for u, v in edges:
+                myGraph.add_edge(u, v)
+            components, has_cycle = connected_components.find_components(edges, chunksize=17)
+            self.assertEqual(myGraph.check_cycle(), has_cycle)
+            self.assertEqual(1, len(components))
+
+    def test_workers(self):
+        edges = [(v, v + 1) for v in range(0, 1000) if v % 100 != 99]
+        components, has_cycle = connected_components.find_components(edges, workers=2)
+        self.assertEqual(10, len(components))
+        self.assertFalse(has_cycle)
+        components, has_cycle = connected_components.find_components(edges + [(0, 50)], workers=2, chunksize=10)
+        self.assertTrue(has_cycle)
+
+        csr = graph.CSRGraph.from_edges(edges, False)
+        self.assertEqual(10, len(connected_components.find_components(list(csr.edges()), workers=2)[0]))
+
+    def test_find_graph_components(self):
+        myGraph = graph.CheckCycleUndirectedGraph()
+        for u, v in [(0, 1), (1, 2), (3, 4)]:
+            myGraph.add_edge(u, v)
+        components, has_cycle = connected_components.find_graph_components(myGraph)
+        self.assertEqual([[0, 1, 2], [3, 4]], sorted(sorted(component) for component in components))
+        self.assertFalse(has_cycle)
+        myGraph.add_edge(2, 0)
+        self.assertEqual(myGraph.check_cycle(), connected_components.find_graph_components(myGraph)[1])
+
+        csr = graph.CSRGraph.from_edges([(0, 1, 1), (2, 3, 1)], False, vertices=[9])
+        components, has_cycle = connected_components.find_graph_components(csr, workers=2)
+        self.assertEqual([[0, 1], [2, 3], [9]], sorted(sorted(component) for component in components))
+        self.assertFalse(has_cycle)
+
+        weighted = graph.WeightedUndirectedGraph()
+        weighted.add_edge('a', 'b', 1)
+        weighted.add_edge('b', 'c', 2)
+        weighted.add_edge('c', 'c', 3)
+        components, has_cycle = connected_components.find_graph_components(weighted)
+        self.assertEqual([['a', 'b', 'c']], [sorted(component) for component in components])
+        self.assertTrue(has_cycle)
+
+
+class TestConnectedComponentsBenchmark(unittest.TestCase):
+    # Compares CheckCycleUndirectedGraph.check_cycle with
+    # find_components in this process and in a pool of workers, on a
+    # random forest with one extra edge at the end. On a single CPU
+    # the pool can't be faster, only show the overhead.
+    edge_count = 200000
+
+    def test_random_forest(self):
+        rng = random.Random(5)
+        edges = [(rng.randrange(v), v) for v in range(1, self.edge_count)]
+        edges.append((self.edge_count - 1, 0))
+        myGraph = graph.CheckCycleUndirectedGraph()
+        for u, v in edges:
+            myGraph.add_edge(u, v)
+
+        started_at = time.time()
+        self.assertTrue(myGraph.check_cycle())
+        check_time = time.time() - started_at
+
+        timings = []
+        for workers in (1, 2):
+            started_at = time.time()
+            components, has_cycle = connected_components.find_components(edges, workers=workers)
+            timings.append(time.time() - started_at)
+            self.assertTrue(has_cycle)
+            self.assertEqual(1, len(components))
+
+        print('{} edges, {} CPUs: check_cycle {}s, find_components {}s, with 2 workers {}s'.format(
+            len(edges), os.cpu_count(), round(check_time, 4), round(timings[0], 4), round(timings[1], 4)))
+
 class TestQueue(unittest.TestCase):
     def test_queue(self):
         myQueue = queue.Queue()  # create a queue with default queue size 10
@@ -205,6 +594,158 @@ class TestGraph(unittest.TestCase):
 
         self.assertTrue(myGraph.check_cycle())
 
+    def test_topological_sort_deep(self):
+        myGraph = graph.TopologicalSort()
+        for vertex in range(100000):
+            myGraph.add_edge(vertex, vertex + 1)
+
+        self.assertEqual(list(range(100001)), myGraph.topological_sort())
+        self.assertEqual(list(range(100001)), list(myGraph.topological_order()))
+
+    def test_topological_order(self):
+        myGraph = graph.TopologicalSort()
+        myGraph.add_edge(5, 2)
+        myGraph.add_edge(5, 0)
+        myGraph.add_edge(4, 0)
+        myGraph.add_edge(4, 1)
+        myGraph.add_edge(2, 3)
+        myGraph.add_edge(3, 1)
+
+        order = list(myGraph.topological_order())
+        self.assertEqual(sorted(order), list(range(6)))
+        for vertex in myGraph.graph:
+            for adjacent_node in myGraph.graph[vertex]:
+                self.assertLess(order.index(vertex), order.index(adjacent_node))
+
+        # lazy: the first vertex is yielded before a cycle further on is found
+        myGraph.add_edge(1, 3)
+        order = myGraph.topological_order()
+        self.assertIn(next(order), (4, 5))
+        self.assertRaises(ValueError, list, order)
+
+    def test_dynamic_topological_sort(self):
+        myGraph = graph.DynamicTopologicalSort()
+        myGraph.add_edge(5, 2)
+        myGraph.add_edge(5, 0)
+        myGraph.add_edge(4, 0)
+        myGraph.add_edge(4, 1)
+        myGraph.add_edge(2, 3)
+        myGraph.add_edge(3, 1)
+        # 4 -> 0 moved 4 in front of 0, then 3 -> 1 moved 3 in front of 1
+        self.assertEqual([5, 2, 4, 0, 3, 1], myGraph.topological_sort())
+        myGraph.add_edge(1, 0)
+        order = myGraph.topological_sort()
+        self.assertEqual(sorted(order), list(range(6)))
+        for vertex in myGraph.graph:
+            for adjacent_node in myGraph.graph[vertex]:
+                self.assertTrue(myGraph.precedes(vertex, adjacent_node))
+
+        self.assertRaises(ValueError, myGraph.add_edge, 0, 5)
+        self.assertRaises(ValueError, myGraph.add_edge, 3, 3)
+        self.assertEqual(order, myGraph.topological_sort())
+        self.assertEqual(7, myGraph.count)
+        self.assertNotIn(5, myGraph.graph[0])
+        # a refused edge doesn't add its vertices either
+        self.assertRaises(ValueError, myGraph.add_edge, 'new', 'new')
+        self.assertEqual(order, myGraph.topological_sort())
+        self.assertNotIn('new', myGraph.position)
+
+    def test_dynamic_topological_sort_random(self):
+        rng = random.Random(8)
+        myGraph = graph.DynamicTopologicalSort()
+        checkGraph = graph.CheckCycleDirectedGraph()
+        for _ in range(600):
+            u, v = rng.randrange(60), rng.randrange(60)
+            checkGraph.add_edge(u, v)
+            if checkGraph.check_cycle():
+                self.assertRaises(ValueError, myGraph.add_edge, u, v)
+                checkGraph.graph[u].pop()
+            else:
+                myGraph.add_edge(u, v)
+        order = myGraph.topological_sort()
+        for vertex in myGraph.graph:
+            for adjacent_node in myGraph.graph[vertex]:
+                self.assertLess(order.index(vertex), order.index(adjacent_node))
+
+    def test_strongly_connected_components(self):
+        myGraph = graph.StronglyConnectedComponents()
+        myGraph.add_edge('a', 'b')
+        myGraph.add_edge('b', 'c')
+        myGraph.add_edge('c', 'a')
+        myGraph.add_edge('c', 'd')
+        myGraph.add_edge('d', 'e')
+        myGraph.add_edge('e', 'd')
+        myGraph.add_edge('b', 'f')
+        myGraph.add_edge('g', 'g')
+
+        components = myGraph.strongly_connected_components()
+        self.assertEqual([['a', 'b', 'c'], ['d', 'e'], ['f'], ['g']],
+                         sorted(sorted(component) for component in components))
+        position = dict((vertex, i) for i, component in enumerate(components) for vertex in component)
+        for vertex in myGraph.graph:
+            for adjacent_node in myGraph.graph[vertex]:
+                self.assertLessEqual(position[vertex], position[adjacent_node])
+
+        components, dag = myGraph.condensation()
+        self.assertEqual(list(range(len(components))), sorted(dag.graph))
+        abc = position['a']
+        self.assertEqual(sorted([position['d'], position['f']]), sorted(dag.graph[abc]))
+        self.assertEqual([], dag.graph[position['g']])
+        self.assertEqual(2, dag.count)
+        for i in dag.graph:
+            for j in dag.graph[i]:
+                self.assertLess(i, j)
+
+    def test_strongly_connected_components_deep(self):
+        myGraph = graph.StronglyConnectedComponents()
+        for vertex in range(100000):
+            myGraph.add_edge(vertex, vertex + 1)
+        components = myGraph.strongly_connected_components()
+        self.assertEqual([[vertex] for vertex in range(100001)], components)
+
+        myGraph.add_edge(100000, 0)
+        components, dag = myGraph.condensation()
+        self.assertEqual(1, len(components))
+        self.assertEqual(list(range(100001)), sorted(components[0]))
+        self.assertEqual({0: []}, dict(dag.graph))
+
+    def test_find_cycle_in_directed_graph(self):
+        myGraph = graph.CheckCycleDirectedGraph()
+        myGraph.add_edge('a', 'b')
+        myGraph.add_edge('b', 'c')
+        myGraph.add_edge('c', 'd')
+        self.assertFalse(myGraph.check_cycle())
+        self.assertIsNone(myGraph.find_cycle())
+
+        myGraph.add_edge('d', 'b')
+        self.assertTrue(myGraph.check_cycle())
+        self.assertEqual(['b', 'c', 'd'], myGraph.find_cycle())
+
+        deepGraph = graph.CheckCycleDirectedGraph()
+        for vertex in range(100000):
+            deepGraph.add_edge(vertex, vertex + 1)
+        self.assertFalse(deepGraph.check_cycle())
+        deepGraph.add_edge(100000, 0)
+        self.assertEqual(100001, len(deepGraph.find_cycle()))
+
+    def test_find_cycle_in_undirected_graph(self):
+        myGraph = graph.CheckCycleUndirectedGraph()
+        myGraph.add_edge('a', 'b')
+        myGraph.add_edge('b', 'c')
+        myGraph.add_edge('b', 'd')
+        self.assertFalse(myGraph.check_cycle())
+        self.assertIsNone(myGraph.find_cycle())
+
+        myGraph.add_edge('d', 'c')
+        self.assertEqual(['b', 'c', 'd'], myGraph.find_cycle())
+
+        deepGraph = graph.CheckCycleUndirectedGraph()
+        for vertex in range(100000):
+            deepGraph.add_edge(vertex, vertex + 1)
+        self.assertFalse(deepGraph.check_cycle())
+        deepGraph.add_edge(100000, 0)
+        self.assertEqual(100001, len(deepGraph.find_cycle()))
+
     def test_add_edge_in_undirected_graph(self):
         myGraph = graph.CheckCycleUndirectedGraph()
         myGraph.add_edge(0, 1)
@@ -306,6 +847,174 @@ class TestGraph(unittest.TestCase):
         self.assertEqual(1, myGraph.get_edge_weight(4, 5))
         self.assertEqual(1, myGraph.get_edge_weight(2, 6))
 
+    def test_weighted_undirected_graph_version(self):
+        myGraph = graph.WeightedUndirectedGraph()
+        versions = [myGraph.version]
+        myGraph.add_edge(0, 1, 1)
+        versions.append(myGraph.version)
+        myGraph.add_edge(0, 1, 2)
+        versions.append(myGraph.version)
+        myGraph.add_edge(1, 2, 2)
+        myGraph.remove_edge(0, 1)
+        versions.append(myGraph.version)
+        myGraph.remove_edge(2)
+        versions.append(myGraph.version)
+
+        self.assertEqual(sorted(set(versions)), versions)
+
+    def test_csr_graph_from_weighted_undirected_graph(self):
+        myGraph = graph.WeightedUndirectedGraph()
+        myGraph.add_edge('a', 'b', 1)
+        myGraph.add_edge('b', 'c', 2.5)
+        myGraph.add_edge('a', 'c', 4)
+        csr = graph.CSRGraph.from_graph(myGraph)
+
+        self.assertFalse(csr.directed)
+        self.assertEqual(3, len(csr))
+        self.assertEqual(4, len(csr.offsets))
+        self.assertEqual(6, len(csr.targets))
+        self.assertEqual(sorted(myGraph.graph['b']), sorted(csr.graph['b']))
+        self.assertEqual(2.5, csr.get_edge_weight('c', 'b'))
+        self.assertIsNone(csr.get_edge_weight('a', 'a'))
+        self.assertIsNone(csr.get_edge_weight('a', 'z'))
+        self.assertIn('a', csr.graph)
+        self.assertNotIn('z', csr.graph)
+        self.assertEqual(['a', 'b', 'c'], sorted(csr.graph))
+        self.assertEqual(3, len(list(csr.edges())))
+
+        back = csr.to_weighted_undirected_graph()
+        self.assertEqual(myGraph.weights, back.weights)
+        weighted = csr.to_weighted_graph()
+        self.assertEqual(4, weighted.get_weight('c', 'a'))
+        self.assertEqual(3, len(weighted.graph))
+
+    def test_csr_graph_from_graph(self):
+        myGraph = graph.Graph()
+        myGraph.add_edge(0, 1)
+        myGraph.add_edge(0, 2)
+        myGraph.add_edge(2, 3)
+        csr = graph.CSRGraph.from_graph(myGraph)
+
+        self.assertTrue(csr.directed)
+        self.assertEqual([1, 2], csr.graph[0])
+        self.assertEqual([], csr.graph[3])
+        self.assertEqual(1, csr.get_edge_weight(2, 3))
+        self.assertIsNone(csr.get_edge_weight(3, 2))
+        self.assertEqual(dict(myGraph.graph), dict(csr.to_graph().graph))
+
+        weightedGraph = graph.WeightedGraph()
+        weightedGraph.add_edge(0, 1, 3)
+        weightedGraph.add_edge(1, 2, 1)
+        csr = graph.CSRGraph.from_graph(weightedGraph)
+        self.assertEqual(3, csr.get_edge_weight(1, 0))
+        self.assertEqual(weightedGraph.kruskal_mst(), csr.to_weighted_graph().kruskal_mst())
+
+    def test_csr_graph_from_edges(self):
+        csr = graph.CSRGraph.from_edges([(2, 0, 5), (0, 1), (2, 1, 3)])
+        self.assertEqual([2, 0, 1], csr.vertices)
+        self.assertEqual([0, 1], csr.graph[2])
+        self.assertEqual(5, csr.get_edge_weight(2, 0))
+        self.assertEqual(1, csr.get_edge_weight(0, 1))
+        self.assertIsNone(csr.get_edge_weight(1, 0))
+        self.assertEqual(0, csr.version)
+
+    def test_csr_graph_save_and_load(self):
+        myGraph = graph.WeightedUndirectedGraph()
+        myGraph.gridify(5, 1)
+        csr = graph.CSRGraph.from_graph(myGraph)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'graph.bin')
+            csr.save(path)
+            loaded = graph.CSRGraph.load(path)
+            try:
+                self.assertIsInstance(loaded.targets, memoryview)
+                self.assertFalse(loaded.directed)
+                self.assertEqual(csr.vertices, loaded.vertices)
+                self.assertEqual(list(csr.offsets), list(loaded.offsets))
+                self.assertEqual(csr.graph[(2, 2)], loaded.graph[(2, 2)])
+                self.assertAlmostEqual(1.4142135623730951, loaded.get_edge_weight((0, 0), (1, 1)))
+                self.assertEqual(myGraph.weights, loaded.to_weighted_undirected_graph().weights)
+
+                copied = pickle.loads(pickle.dumps(loaded))
+                self.assertEqual(list(csr.weights), list(copied.weights))
+            finally:
+                loaded.close()
+
+            with open(path, 'wb') as out:
+                out.write(b'not a graph' * 10)
+            self.assertRaises(ValueError, graph.CSRGraph.load, path)
+
+    def test_csr_graph_from_edges_deduplicate(self):
+        edges = [(0, 1, 2), (1, 0, 3), (1, 2, 4), (0, 1, 5), (2, 2, 1), (2, 2, 6)]
+        csr = graph.CSRGraph.from_edges(edges, False, deduplicate=True)
+        self.assertEqual(5, len(csr.targets))
+        self.assertEqual(5, csr.get_edge_weight(1, 0))
+        self.assertEqual(5, csr.get_edge_weight(0, 1))
+        self.assertEqual(6, csr.get_edge_weight(2, 2))
+        self.assertEqual([1, 2], sorted(csr.graph[2]))
+
+        csr = graph.CSRGraph.from_edges(edges, True, deduplicate=True)
+        self.assertEqual(4, len(csr.targets))
+        self.assertEqual(5, csr.get_edge_weight(0, 1))
+        self.assertEqual(3, csr.get_edge_weight(1, 0))
+
+        self.assertEqual(len(edges), len(graph.CSRGraph.from_edges(edges).targets))
+
+        rng = random.Random(5)
+        edges = [(rng.randrange(30), rng.randrange(30), rng.randrange(10)) for _ in range(300)]
+        weights = dict(((u, v), weight) for u, v, weight in edges)
+        csr = graph.CSRGraph.from_edges(edges, True, range(30), deduplicate=True)
+        self.assertEqual(sorted((u, v, weight) for (u, v), weight in weights.items()), sorted(csr.edges()))
+
+    def test_weighted_undirected_graph_from_edges(self):
+        edges = [('a', 'b', 1), ('b', 'c', 2.5), ('a', 'c', 4), ('b', 'a', 7), ('c', 'c', 1)]
+        expected = graph.WeightedUndirectedGraph()
+        for u, v, weight in edges:
+            expected.add_edge(u, v, weight)
+        myGraph = graph.WeightedUndirectedGraph.from_edges(edges)
+        self.assertEqual(expected.graph, myGraph.graph)
+        self.assertEqual(expected.weights, myGraph.weights)
+        self.assertEqual(7, myGraph.get_edge_weight('a', 'b'))
+        self.assertGreater(myGraph.version, 0)
+
+    def test_csr_graph_from_edge_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'edges.txt')
+            with open(path, 'w') as out:
+                out.write('# a comment\n0 1\n1 2 2.5\n\n% another\n2 0 4\n1 0 3\n')
+            edges = list(graph.CSRGraph.read_edge_file(path))
+            self.assertEqual([(0, 1, 1), (1, 2, 2.5), (2, 0, 4.0), (1, 0, 3.0)], edges)
+            csr = graph.CSRGraph.from_edge_file(path, directed=False)
+            self.assertEqual(6, len(csr.targets))
+            self.assertEqual(3, csr.get_edge_weight(0, 1))
+
+            path = os.path.join(directory, 'edges.csv')
+            with open(path, 'w') as out:
+                out.write('source,target,weight\na, b ,2\nb,c,3\n')
+            csr = graph.CSRGraph.from_edge_file(path, delimiter=',', vertex_type=str, header=True)
+            self.assertEqual(['a', 'b', 'c'], csr.vertices)
+            self.assertEqual(3, csr.get_edge_weight('b', 'c'))
+
+            path = os.path.join(directory, 'edges.bin')
+            graph.CSRGraph.write_binary_edge_file(path, [(0, 1, 1.5), (1, 2), (0, 1, 2.5)])
+            self.assertEqual([(0, 1, 1.5), (1, 2, 1), (0, 1, 2.5)],
+                             list(graph.CSRGraph.read_binary_edge_file(path)))
+            csr = graph.CSRGraph.from_binary_edge_file(path, directed=False)
+            self.assertEqual(2.5, csr.get_edge_weight(1, 0))
+            self.assertEqual(4, len(csr.targets))
+
+            # stopping early releases the file
+            edges = graph.CSRGraph.read_binary_edge_file(path)
+            self.assertEqual((0, 1, 1.5), next(edges))
+            edges.close()
+
+            graph.CSRGraph.write_binary_edge_file(path, [(3, 4), (4, 5)], weighted=False)
+            self.assertEqual([(3, 4, 1), (4, 5, 1)], list(graph.CSRGraph.read_binary_edge_file(path, False)))
+            self.assertRaises(ValueError, list, graph.CSRGraph.read_binary_edge_file(path, True))
+
+            graph.CSRGraph.write_binary_edge_file(path, [])
+            self.assertEqual(0, len(graph.CSRGraph.from_binary_edge_file(path)))
+
     def test_gridify_weighted_undirected_graph(self):
         rt2 = 1.4142135623730951
         myGraph = graph.WeightedUndirectedGraph()
@@ -319,6 +1028,57 @@ class TestGraph(unittest.TestCase):
         self.assertIsNone(myGraph.get_edge_weight((3, 3), (3, 4)))
 
 
+    def test_grid_graph(self):
+        rt2 = 1.4142135623730951
+        myGraph = graph.GridGraph(4)
+
+        self.assertEqual(1, myGraph.get_edge_weight((0, 0), (0, 1)))
+        self.assertAlmostEqual(rt2, myGraph.get_edge_weight((0, 0), (1, 1)))
+
+        self.assertIsNone(myGraph.get_edge_weight((0, 0), (2, 0)))
+        self.assertEqual(1, myGraph.get_edge_weight((2, 3), (3, 3)))
+        self.assertIsNone(myGraph.get_edge_weight((3, 3), (3, 4)))
+
+        self.assertEqual([(0, 1), (1, 0), (1, 1)], myGraph.graph[(0, 0)])
+        self.assertEqual(16, len(myGraph.graph))
+
+        myGraph.set_blocked((1, 1))
+        self.assertTrue(myGraph.is_blocked((1, 1)))
+        self.assertNotIn((1, 1), myGraph.graph)
+        self.assertNotIn((1, 1), myGraph.graph[(0, 0)])
+        self.assertIsNone(myGraph.get_edge_weight((0, 0), (1, 1)))
+        self.assertRaises(KeyError, lambda: myGraph.graph[(1, 1)])
+        self.assertEqual(15, len(list(myGraph.graph)))
+
+        myGraph.set_blocked((1, 1), False)
+        myGraph.set_cost((1, 1), 3)
+        self.assertEqual(3, myGraph.get_cost((1, 1)))
+        self.assertEqual(2, myGraph.get_edge_weight((1, 0), (1, 1)))
+        self.assertAlmostEqual(2 * rt2, myGraph.get_edge_weight((0, 0), (1, 1)))
+
+    def test_grid_graph_matches_gridify(self):
+        gridified = graph.WeightedUndirectedGraph()
+        gridified.gridify(5, 2)
+        grid = graph.GridGraph(5, weight=2)
+
+        self.assertEqual(set(gridified.graph.keys()), set(grid.graph.keys()))
+        for vertex in gridified.graph:
+            self.assertEqual(gridified.graph[vertex], grid.graph[vertex])
+            for neighbor in gridified.graph[vertex]:
+                self.assertAlmostEqual(gridified.get_edge_weight(vertex, neighbor),
+                                       grid.get_edge_weight(vertex, neighbor))
+
+    def test_grid_graph_layout(self):
+        grid = graph.GridGraph(3, 4)
+        self.assertEqual(0, grid.index((0, 0)))
+        self.assertEqual(4 * 2 + 3, grid.index((2, 3)))
+        grid.set_blocked((1, 2))
+        self.assertEqual(1, grid.blocked[grid.index((1, 2))])
+
+        neighbors = [(1 + dx, 1 + dy) for dx, dy in graph.GridGraph.NEIGHBOR_OFFSETS]
+        self.assertEqual([v for v in neighbors if v != (1, 2)], grid.neighbors((1, 1)))
+
+
 class TestHeap(unittest.TestCase):
     def test_heap(self):
         myHeap = heap.Heap()
@@ -352,6 +1112,70 @@ class TestHeap(unittest.TestCase):
         self.assertEqual(myHeap.queue, expectedResult)
 
 
+class TestIndexedHeap(unittest.TestCase):
+    def test_push_pop(self):
+        myHeap = heap.IndexedHeap()
+        myHeap.push('a', 6)
+        myHeap.push('b', 3)
+        myHeap.push('c', 5)
+        myHeap.push('d', 12)
+        myHeap.push('e', 1)
+
+        self.assertEqual(len(myHeap), 5)
+        self.assertTrue('c' in myHeap)
+        self.assertEqual(myHeap.priority('d'), 12)
+        self.assertEqual(myHeap.peek(), ('e', 1))
+
+        result = [myHeap.pop() for _ in range(5)]
+        self.assertEqual(result, [('e', 1), ('b', 3), ('c', 5), ('a', 6), ('d', 12)])
+        self.assertTrue(myHeap.is_empty())
+        self.assertIsNone(myHeap.pop())
+        self.assertIsNone(myHeap.priority('a'))
+
+    def test_decrease_key(self):
+        myHeap = heap.IndexedHeap()
+        for i in range(10):
+            myHeap.push(i, 10 + i)
+
+        self.assertTrue(myHeap.decrease_key(7, 1))
+        self.assertFalse(myHeap.decrease_key(3, 50))
+        self.assertFalse(myHeap.push_or_decrease(4, 20))
+        self.assertTrue(myHeap.push_or_decrease(10, 0))
+
+        self.assertEqual(myHeap.pop(), (10, 0))
+        self.assertEqual(myHeap.pop(), (7, 1))
+        self.assertEqual(myHeap.pop(), (0, 10))
+
+    def test_remove(self):
+        myHeap = heap.IndexedHeap()
+        for i in range(10):
+            myHeap.push(i, 9 - i)
+
+        self.assertEqual(myHeap.remove(3), 6)
+        self.assertEqual(myHeap.remove(9), 0)
+        self.assertFalse(3 in myHeap)
+        self.assertEqual([myHeap.pop()[0] for _ in range(8)], [8, 7, 6, 5, 4, 2, 1, 0])
+
+    def test_equal_priorities_are_fifo(self):
+        myHeap = heap.IndexedHeap()
+        for i in range(6):
+            myHeap.push(i, 1)
+        self.assertEqual([myHeap.pop()[0] for _ in range(6)], [0, 1, 2, 3, 4, 5])
+
+    def test_random(self):
+        myHeap = heap.IndexedHeap()
+        priorities = {}
+        for i in range(200):
+            priorities[i] = random.randint(0, 1000)
+            myHeap.push(i, priorities[i])
+        for i in random.sample(range(200), 50):
+            priorities[i] -= random.randint(0, 500)
+            myHeap.decrease_key(i, priorities[i])
+
+        popped = [myHeap.pop()[1] for _ in range(200)]
+        self.assertEqual(popped, sorted(priorities.values()))
+
+
 class TestTrie(unittest.TestCase):
     def test_stack(self):
         myTrie = trie.Trie()
@@ -678,6 +1502,169 @@ class TestQuadTree(unittest.TestCase):
         self.assertIsNotNone(next((e for e in retr if e.aabb.mincorner.x == 900), None), str(retr))
         self.assertIsNotNone(next((e for e in retr if e.aabb.mincorner.x == 490), None), str(retr))
         
+    def _assert_placed(self, _tree):
+        # every entity is in the lowest node it fits in
+        _stack = [_tree]
+        while _stack:
+            curr = _stack.pop()
+            if curr.children:
+                for ent in curr.entities:
+                    self.assertEqual(-1, curr.get_quadrant(ent))
+                for quad, child in enumerate(curr.children):
+                    for ent in child.entities:
+                        self.assertEqual(quad, curr.get_quadrant(ent))
+                _stack.extend(curr.children)
+
+    def test_build(self):
+        _ents = []
+        for i in range(500):
+            w = random.randrange(1, 10)
+            h = random.randrange(1, 10)
+            _ents.append(quadtree.QuadTreeEntity(rect2.Rect2(w, h, vector2.Vector2(random.uniform(0, 1000 - w), random.uniform(0, 1000 - h)))))
+        
+        _tree = quadtree.QuadTree(8, 5, self.big_rect)
+        _tree.build(_ents[:300])
+        self.assertEqual(300, _tree.sum_entities())
+        self.assertIsNotNone(_tree.children)
+        self._assert_placed(_tree)
+        
+        _tree.build(_ents[300:])
+        self.assertEqual(500, _tree.sum_entities())
+        self._assert_placed(_tree)
+        
+        # leaves only hold more than bucket_size at max_depth
+        def check_leaf(curr):
+            if not curr.children and curr.depth < curr.max_depth:
+                self.assertLessEqual(len(curr.entities), curr.bucket_size)
+        _tree._iter_helper(check_leaf)
+        
+        _small = quadtree.QuadTree(8, 5, self.big_rect)
+        _small.build(_ents[:8])
+        self.assertIsNone(_small.children)
+        
+    def test_remove(self):
+        _tree = quadtree.QuadTree(2, 5, self.big_rect)
+        ent1 = quadtree.QuadTreeEntity(rect2.Rect2(5, 5, vector2.Vector2(15, 15)))
+        ent2 = quadtree.QuadTreeEntity(rect2.Rect2(5, 5, vector2.Vector2(700, 15)))
+        ent3 = quadtree.QuadTreeEntity(rect2.Rect2(5, 5, vector2.Vector2(700, 700)))
+        ent4 = quadtree.QuadTreeEntity(rect2.Rect2(20, 20, vector2.Vector2(490, 490)))
+        for ent in (ent1, ent2, ent3, ent4):
+            _tree.insert_and_think(ent)
+        self.assertIsNotNone(_tree.children)
+        self.assertEqual([ent4], _tree.entities)
+        
+        self.assertTrue(_tree.remove(ent2))
+        self.assertFalse(_tree.remove(ent2))
+        self.assertIsNotNone(_tree.children) # 3 left, more than bucket_size
+        self.assertEqual(3, _tree.sum_entities())
+        
+        self.assertTrue(_tree.remove(ent4))
+        self.assertIsNone(_tree.children) # 2 left, merged
+        self.assertEqual(set([id(ent1), id(ent3)]), set(id(ent) for ent in _tree.entities))
+        
+        _tree.insert_and_think(ent2)
+        self.assertIsNotNone(_tree.children)
+        self.assertTrue(_tree.remove(ent1))
+        self.assertIsNone(_tree.children)
+        self.assertEqual(set([id(ent2), id(ent3)]), set(id(ent) for ent in _tree.entities))
+        
+        # entities moved without update are still found
+        ent3.aabb = rect2.Rect2(5, 5, vector2.Vector2(100, 100))
+        self.assertTrue(_tree.remove(ent3))
+        self.assertEqual([ent2], _tree.entities)
+        
+    def test_remove_many(self):
+        _tree = quadtree.QuadTree(4, 6, self.big_rect)
+        _ents = []
+        for i in range(300):
+            _ents.append(quadtree.QuadTreeEntity(rect2.Rect2(3, 3, vector2.Vector2(random.uniform(0, 997), random.uniform(0, 997)))))
+            _tree.insert_and_think(_ents[-1])
+        random.shuffle(_ents)
+        for i, ent in enumerate(_ents):
+            self.assertTrue(_tree.remove(ent))
+            if i % 50 == 0:
+                self.assertEqual(len(_ents) - i - 1, _tree.sum_entities())
+                self._assert_placed(_tree)
+        self.assertIsNone(_tree.children)
+        self.assertEqual([], _tree.entities)
+        
+    def test_update(self):
+        _tree = quadtree.QuadTree(2, 5, self.big_rect)
+        ent1 = quadtree.QuadTreeEntity(rect2.Rect2(5, 5, vector2.Vector2(15, 15)))
+        ent2 = quadtree.QuadTreeEntity(rect2.Rect2(5, 5, vector2.Vector2(700, 15)))
+        ent3 = quadtree.QuadTreeEntity(rect2.Rect2(5, 5, vector2.Vector2(700, 700)))
+        for ent in (ent1, ent2, ent3):
+            _tree.insert_and_think(ent)
+        
+        # within its quadrant
+        self.assertFalse(_tree.update(ent1, rect2.Rect2(5, 5, vector2.Vector2(100, 100))))
+        self.assertEqual(100, ent1.aabb.mincorner.x)
+        self.assertIs(ent1, _tree.children[0].entities[0])
+        
+        # onto a line
+        self.assertTrue(_tree.update(ent1, rect2.Rect2(5, 5, vector2.Vector2(498, 100))))
+        self.assertEqual([ent1], _tree.entities)
+        
+        # into another quadrant
+        self.assertTrue(_tree.update(ent1, rect2.Rect2(5, 5, vector2.Vector2(100, 700))))
+        self.assertEqual([ent1], _tree.children[3].entities)
+        self.assertEqual([], _tree.entities)
+        self._assert_placed(_tree)
+        
+        _other = quadtree.QuadTreeEntity(rect2.Rect2(5, 5))
+        self.assertRaises(ValueError, _tree.update, _other, rect2.Rect2(5, 5))
+        
+    def test_update_many(self):
+        _tree = quadtree.QuadTree(4, 6, self.big_rect)
+        _ents = []
+        for i in range(300):
+            _ents.append(quadtree.QuadTreeEntity(rect2.Rect2(3, 3, vector2.Vector2(random.uniform(0, 997), random.uniform(0, 997)))))
+        _tree.build(_ents)
+        for frame in range(5):
+            for ent in _ents:
+                x = min(997, max(0, ent.aabb.mincorner.x + random.uniform(-20, 20)))
+                y = min(997, max(0, ent.aabb.mincorner.y + random.uniform(-20, 20)))
+                _tree.update(ent, rect2.Rect2(3, 3, vector2.Vector2(x, y)))
+            self.assertEqual(300, _tree.sum_entities())
+            self._assert_placed(_tree)
+        
+    def test_find_all_pairs(self):
+        _tree = quadtree.QuadTree(2, 2, self.big_rect)
+        self.assertEqual([], list(_tree.find_all_pairs()))
+        
+        ent1 = quadtree.QuadTreeEntity(rect2.Rect2(5, 5, vector2.Vector2(25, 25)))
+        ent2 = quadtree.QuadTreeEntity(rect2.Rect2(20, 10, vector2.Vector2(490, 300)))
+        ent3 = quadtree.QuadTreeEntity(rect2.Rect2(15, 10, vector2.Vector2(700, 450)))
+        ent4 = quadtree.QuadTreeEntity(rect2.Rect2(5, 5, vector2.Vector2(900, 900)))
+        _tree.insert_and_think(ent1)
+        self.assertEqual([], list(_tree.find_all_pairs()))
+        for ent in (ent2, ent3, ent4):
+            _tree.insert_and_think(ent)
+        
+        # the same pairs as test_retrieve
+        pairs = set(frozenset((id(a), id(b))) for a, b in _tree.find_all_pairs())
+        self.assertEqual(set([frozenset((id(ent1), id(ent2))), frozenset((id(ent2), id(ent3))),
+                              frozenset((id(ent2), id(ent4)))]), pairs)
+        
+    def test_find_all_pairs_matches_retrieve(self):
+        _tree = quadtree.QuadTree(4, 5, self.big_rect)
+        _ents = []
+        for i in range(400):
+            w = random.randrange(1, 40)
+            h = random.randrange(1, 40)
+            _ents.append(quadtree.QuadTreeEntity(rect2.Rect2(w, h, vector2.Vector2(random.uniform(0, 1000 - w), random.uniform(0, 1000 - h)))))
+        _tree.build(_ents)
+        
+        expected = set()
+        for ent in _ents:
+            for other in _tree.retrieve_collidables(ent):
+                if other is not ent:
+                    expected.add(frozenset((id(ent), id(other))))
+        
+        pairs = [frozenset((id(a), id(b))) for a, b in _tree.find_all_pairs()]
+        self.assertEqual(len(pairs), len(set(pairs)))
+        self.assertEqual(expected, set(pairs))
+        
     def test_ents_per_depth(self):
         _tree = quadtree.QuadTree(3, 5, self.big_rect)
         _tree.insert_and_think(quadtree.QuadTreeEntity(rect2.Rect2(5, 5, vector2.Vector2(75, 35)))) 
@@ -786,5 +1773,264 @@ class TestQuadTree(unittest.TestCase):
         self.maxDiff = None
         self.assertEqual("quadtree(at rect(100x100 at <0, 0>) with 0 entities here (2 in total); (nodes, entities) per depth: [ 0: (1, 0), 1: (4, 2) ] (allowed max depth: 5, actual: 1), avg ent/leaf: 0.5 (target 1), misplaced weight 0.0 (0 best, >1 bad)", str(_tree))
         
+
+class TestQuadTreeUpdateBenchmark(unittest.TestCase):
+    # Moves some of the entities a little each frame, comparing building
+    # a new tree with insert_and_think, building it with build, and
+    # updating the moved entities in one tree. Rebuilding inserts every
+    # entity however few move; updating only inserts again the moved
+    # entities that leave their node, which is checked by count.
+    entity_count = 10000
+    frames = 3
+
+    def run_frames(self, moving_fraction):
+        rng = random.Random(6)
+        world = rect2.Rect2(1000, 1000)
+        ents = [quadtree.QuadTreeEntity(rect2.Rect2(2, 2, vector2.Vector2(rng.uniform(0, 998), rng.uniform(0, 998))))
+                for _ in range(self.entity_count)]
+        moving = ents[:int(len(ents) * moving_fraction)]
+        start = [ent.aabb for ent in moving]
+        frames = []
+        for _ in range(self.frames):
+            frame = []
+            for aabb in (frames[-1] if frames else start):
+                x = min(998, max(0, aabb.mincorner.x + rng.uniform(-3, 3)))
+                y = min(998, max(0, aabb.mincorner.y + rng.uniform(-3, 3)))
+                frame.append(rect2.Rect2(2, 2, vector2.Vector2(x, y)))
+            frames.append(frame)
+
+        started_at = time.time()
+        for frame in frames:
+            for ent, aabb in zip(moving, frame):
+                ent.aabb = aabb
+            tree = quadtree.QuadTree(16, 8, world)
+            for ent in ents:
+                tree.insert_and_think(ent)
+        insert_time = time.time() - started_at
+
+        started_at = time.time()
+        for frame in frames:
+            for ent, aabb in zip(moving, frame):
+                ent.aabb = aabb
+            tree = quadtree.QuadTree(16, 8, world)
+            tree.build(ents)
+        build_time = time.time() - started_at
+
+        for ent, aabb in zip(moving, start):
+            ent.aabb = aabb
+        tree = quadtree.QuadTree(16, 8, world)
+        tree.build(ents)
+        moved = 0
+        started_at = time.time()
+        for frame in frames:
+            for ent, aabb in zip(moving, frame):
+                if tree.update(ent, aabb):
+                    moved += 1
+        update_time = time.time() - started_at
+        self.assertEqual(self.entity_count, tree.sum_entities())
+
+        print('{} entities, {} moving, {} frames: insert_and_think {}s, build {}s, update {}s ({} inserted again)'.format(
+            self.entity_count, len(moving), self.frames, round(insert_time, 4), round(build_time, 4),
+            round(update_time, 4), moved))
+        return moved
+
+    def test_all_moving(self):
+        self.run_frames(1)
+
+    def test_some_moving(self):
+        moved = self.run_frames(0.1)
+        # a rebuild inserts every entity each frame
+        self.assertLess(moved * 10, self.entity_count * self.frames)
+
+
+class TestQuadTreePairsBenchmark(unittest.TestCase):
+    # Compares finding every candidate pair with find_all_pairs and with
+    # retrieve_collidables for each entity (skipping the entity itself
+    # and pairs already found), on small entities spread evenly over a
+    # world that grows with their number. The 100,000 and 1,000,000
+    # entity runs take from seconds to minutes, so they only run with
+    # PYGORITHM_LARGE_BENCHMARKS set.
+
+    def run_pairs(self, entity_count):
+        rng = random.Random(1)
+        side = (entity_count * 400) ** 0.5
+        ents = [quadtree.QuadTreeEntity(rect2.Rect2(2, 2, vector2.Vector2(rng.uniform(0, side - 2), rng.uniform(0, side - 2))))
+                for _ in range(entity_count)]
+        tree = quadtree.QuadTree(16, 10, rect2.Rect2(side, side))
+        tree.build(ents)
+
+        started_at = time.time()
+        found = set()
+        for ent in ents:
+            for other in tree.retrieve_collidables(ent):
+                if other is not ent:
+                    key = (id(ent), id(other)) if id(ent) < id(other) else (id(other), id(ent))
+                    found.add(key)
+        retrieve_time = time.time() - started_at
+
+        started_at = time.time()
+        pair_count = 0
+        for _ in tree.find_all_pairs():
+            pair_count += 1
+        pairs_time = time.time() - started_at
+
+        self.assertEqual(len(found), pair_count)
+        print('{} entities, {} pairs: retrieve_collidables per entity {}s, find_all_pairs {}s'.format(
+            entity_count, pair_count, round(retrieve_time, 4), round(pairs_time, 4)))
+
+    def test_10k(self):
+        self.run_pairs(10000)
+
+    @unittest.skipUnless(os.environ.get('PYGORITHM_LARGE_BENCHMARKS'), 'set PYGORITHM_LARGE_BENCHMARKS to run')
+    def test_100k(self):
+        self.run_pairs(100000)
+
+    @unittest.skipUnless(os.environ.get('PYGORITHM_LARGE_BENCHMARKS'), 'set PYGORITHM_LARGE_BENCHMARKS to run')
+    def test_1m(self):
+        self.run_pairs(1000000)
+
+
+class TestLooseQuadTree(unittest.TestCase):
+    def setUp(self):
+        self.big_rect = rect2.Rect2(1000, 1000)
+        self.rng = random.Random(9)
+
+    def random_ents(self, count, min_size, max_size):
+        rng = self.rng
+        ents = []
+        for _ in range(count):
+            w = rng.uniform(min_size, max_size)
+            h = rng.uniform(min_size, max_size)
+            ents.append(quadtree.QuadTreeEntity(rect2.Rect2(w, h, vector2.Vector2(rng.uniform(0, 1000 - w), rng.uniform(0, 1000 - h)))))
+        return ents
+
+    def overlapping_pairs(self, ents):
+        result = set()
+        for i, ent in enumerate(ents):
+            for other in ents[i + 1:]:
+                touching, overlapping, _ = rect2.Rect2.find_intersection(ent.aabb, other.aabb, find_mtv=False)
+                if touching or overlapping:
+                    result.add(frozenset((id(ent), id(other))))
+        return result
+
+    def test_constructor(self):
+        _tree = quadtree.LooseQuadTree(64, 5, self.big_rect)
+        self.assertEqual(2, _tree.looseness)
+        self.assertEqual((-500, -500, 1500, 1500), _tree._loose)
+        self.assertRaises(ValueError, quadtree.LooseQuadTree, 64, 5, self.big_rect, looseness=0.5)
+
+        _tree = quadtree.LooseQuadTree(64, 5, self.big_rect, looseness=1.5)
+        _tree.split()
+        self.assertIsInstance(_tree.children[2], quadtree.LooseQuadTree)
+        self.assertEqual(1.5, _tree.children[2].looseness)
+        self.assertEqual((375, 375, 1125, 1125), _tree.children[2]._loose)
+
+    def test_get_quadrant(self):
+        _tree = quadtree.LooseQuadTree(64, 5, self.big_rect)
+        # small entities on a line go by their center
+        self.assertEqual(0, _tree.get_quadrant(quadtree.QuadTreeEntity(rect2.Rect2(10, 10, vector2.Vector2(494, 100)))))
+        self.assertEqual(1, _tree.get_quadrant(quadtree.QuadTreeEntity(rect2.Rect2(10, 10, vector2.Vector2(496, 100)))))
+        self.assertEqual(2, _tree.get_quadrant(quadtree.QuadTreeEntity(rect2.Rect2(10, 10, vector2.Vector2(495, 495)))))
+        self.assertEqual(3, _tree.get_quadrant(quadtree.QuadTreeEntity(rect2.Rect2(10, 10, vector2.Vector2(100, 700)))))
+        # as long as they fit in the child's loose bounds (-250 to 750 for quadrant 0)
+        self.assertEqual(0, _tree.get_quadrant(quadtree.QuadTreeEntity(rect2.Rect2(500, 10, vector2.Vector2(200, 100)))))
+        self.assertEqual(0, _tree.get_quadrant(quadtree.QuadTreeEntity(rect2.Rect2(600, 10, vector2.Vector2(150, 100)))))
+        self.assertEqual(-1, _tree.get_quadrant(quadtree.QuadTreeEntity(rect2.Rect2(620, 10, vector2.Vector2(140, 100)))))
+
+    def test_depth_by_size(self):
+        _tree = quadtree.LooseQuadTree(1, 5, self.big_rect)
+        _small = self.random_ents(50, 1, 5)
+        _large = self.random_ents(5, 200, 240)
+        _tree.build(_small + _large)
+        self.assertEqual(55, _tree.sum_entities())
+        depths = {}
+        def handler(curr):
+            for ent in curr.entities:
+                depths[id(ent)] = curr.depth
+        _tree._iter_helper(handler)
+        for ent in _large:
+            # fits in a 500 node's 1000 loose bounds, not in a 250 node's 500 ones
+            self.assertIn(depths[id(ent)], (1, 2))
+        for ent in _small:
+            self.assertGreaterEqual(depths[id(ent)], 2)
+
+    def test_pairs_and_retrieve_find_every_overlap(self):
+        for looseness in (1, 1.5, 2):
+            ents = self.random_ents(300, 1, 80)
+            _tree = quadtree.LooseQuadTree(4, 6, self.big_rect, looseness=looseness)
+            _tree.build(ents)
+            expected = self.overlapping_pairs(ents)
+
+            pairs = [frozenset((id(a), id(b))) for a, b in _tree.find_all_pairs()]
+            self.assertEqual(len(pairs), len(set(pairs)))
+            self.assertTrue(expected <= set(pairs))
+            for pair in pairs:
+                self.assertEqual(2, len(pair))
+
+            for ent in ents:
+                found = set(id(other) for other in _tree.retrieve_collidables(ent))
+                self.assertIn(id(ent), found)
+                for pair in expected:
+                    if id(ent) in pair:
+                        self.assertTrue(pair <= found)
+
+    def test_update_and_remove(self):
+        ents = self.random_ents(200, 1, 60)
+        _tree = quadtree.LooseQuadTree(4, 6, self.big_rect)
+        _tree.build(ents)
+        for frame in range(3):
+            for ent in ents:
+                x = min(1000 - ent.aabb.width, max(0, ent.aabb.mincorner.x + self.rng.uniform(-30, 30)))
+                y = min(1000 - ent.aabb.height, max(0, ent.aabb.mincorner.y + self.rng.uniform(-30, 30)))
+                _tree.update(ent, rect2.Rect2(ent.aabb.width, ent.aabb.height, vector2.Vector2(x, y)))
+            self.assertEqual(200, _tree.sum_entities())
+            expected = self.overlapping_pairs(ents)
+            self.assertTrue(expected <= set(frozenset((id(a), id(b))) for a, b in _tree.find_all_pairs()))
+
+        for ent in ents:
+            self.assertTrue(_tree.remove(ent))
+        self.assertIsNone(_tree.children)
+        self.assertEqual(0, _tree.sum_entities())
+
+
+class TestLooseQuadTreeBenchmark(unittest.TestCase):
+    # Compares QuadTree and LooseQuadTree as the largest entities grow,
+    # by the number of candidate pairs find_all_pairs finds (each needs
+    # a narrow phase test), how many entities are stuck at the root, and
+    # the time to build the tree and find the pairs. The entities are
+    # mostly small with a few large ones.
+    entity_count = 5000
+
+    def test_entity_sizes(self):
+        world = rect2.Rect2(1000, 1000)
+        results = []
+        for max_size in (2, 10, 50):
+            rng = random.Random(3)
+            ents = []
+            for _ in range(self.entity_count):
+                size = rng.uniform(1, max_size) if rng.random() < 0.9 else rng.uniform(1, max_size * 4)
+                ents.append(quadtree.QuadTreeEntity(rect2.Rect2(size, size, vector2.Vector2(
+                    rng.uniform(0, 1000 - size), rng.uniform(0, 1000 - size)))))
+
+            line = []
+            for cls in (quadtree.QuadTree, quadtree.LooseQuadTree):
+                started_at = time.time()
+                tree = cls(16, 8, world)
+                tree.build(ents)
+                pair_count = sum(1 for _ in tree.find_all_pairs())
+                elapsed = time.time() - started_at
+                line.append((pair_count, len(tree.entities), elapsed))
+            results.append(line)
+            print('sizes up to {}: QuadTree {} pairs, {} at the root, {}s; LooseQuadTree {} pairs, {} at the root, {}s'.format(
+                max_size * 4, line[0][0], line[0][1], round(line[0][2], 4), line[1][0], line[1][1], round(line[1][2], 4)))
+
+        # the loose tree compares neighboring nodes, so it has more candidates
+        # when every entity is small, but they grow with the overlaps rather
+        # than with how many entities touch the lines near the root
+        first, last = results[0], results[-1]
+        self.assertLess(last[1][0] / first[1][0], last[0][0] / first[0][0])
+        self.assertLess(last[1][0], last[0][0])
+        self.assertEqual(0, last[1][1])
+
 if __name__ == '__main__':
     unittest.main()
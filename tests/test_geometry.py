@@ -2,6 +2,7 @@ import unittest
 import math
 import random
 import sys
+import time
 
 from pygorithm.geometry import (
     rect_broad_phase,
@@ -10,8 +11,11 @@ from pygorithm.geometry import (
     line2,
     polygon2,
     rect2,
-    extrapolated_intersection
+    extrapolated_intersection,
+    sweep_and_prune,
+    spatial_hash_grid
     )
+from pygorithm.data_structures import quadtree
 
 class TestCollisionDetection(unittest.TestCase):
     def setUp(self):
@@ -2183,5 +2187,333 @@ class TestExtrapolatedIntersection(unittest.TestCase):
     def test_two_moving_intr_later_diff_vel(self):
         pass
 
+
+class TestSweepAndPrune(unittest.TestCase):
+    def setUp(self):
+        self.rng = random.Random(5)
+
+    def random_ents(self, count, max_size=60):
+        rng = self.rng
+        ents = []
+        for _ in range(count):
+            w = rng.uniform(1, max_size)
+            h = rng.uniform(1, max_size)
+            ents.append(quadtree.QuadTreeEntity(rect2.Rect2(w, h, vector2.Vector2(rng.uniform(0, 1000 - w), rng.uniform(0, 1000 - h)))))
+        return ents
+
+    @staticmethod
+    def touching(first, second):
+        a = first.aabb
+        b = second.aabb
+        return (a.mincorner.x <= b.mincorner.x + b.width and b.mincorner.x <= a.mincorner.x + a.width and
+                a.mincorner.y <= b.mincorner.y + b.height and b.mincorner.y <= a.mincorner.y + a.height)
+
+    def expected_pairs(self, ents):
+        pairs = set()
+        for i in range(len(ents)):
+            for j in range(i + 1, len(ents)):
+                if self.touching(ents[i], ents[j]):
+                    pairs.add(frozenset((id(ents[i]), id(ents[j]))))
+        return pairs
+
+    @staticmethod
+    def found_pairs(sap):
+        pairs = [frozenset((id(a), id(b))) for a, b in sap.find_all_pairs()]
+        return set(pairs), len(pairs)
+
+    def assert_pairs(self, sap, ents):
+        found, count = self.found_pairs(sap)
+        self.assertEqual(len(found), count)
+        self.assertEqual(self.expected_pairs(ents), found)
+
+    def test_constructor(self):
+        sap = sweep_and_prune.SweepAndPrune()
+        self.assertEqual(2, sap.axes)
+        self.assertEqual(0, len(sap))
+        self.assertEqual([], list(sap.find_all_pairs()))
+        self.assertRaises(ValueError, sweep_and_prune.SweepAndPrune, 3)
+
+    def test_touching(self):
+        for axes in (1, 2):
+            sap = sweep_and_prune.SweepAndPrune(axes)
+            ent1 = quadtree.QuadTreeEntity(rect2.Rect2(10, 10))
+            ent2 = quadtree.QuadTreeEntity(rect2.Rect2(10, 10, vector2.Vector2(10, 10)))
+            ent3 = quadtree.QuadTreeEntity(rect2.Rect2(10, 10, vector2.Vector2(21, 0)))
+            sap.insert(ent1)
+            sap.insert(ent2)
+            sap.insert(ent3)
+            self.assertEqual(3, len(sap))
+            self.assertEqual([set((ent1, ent2))], [set(pair) for pair in sap.find_all_pairs()])
+            self.assertRaises(ValueError, sap.insert, ent1)
+
+    def test_insert_and_build(self):
+        ents = self.random_ents(200)
+        for axes in (1, 2):
+            sap = sweep_and_prune.SweepAndPrune(axes)
+            for ent in ents:
+                sap.insert(ent)
+            self.assert_pairs(sap, ents)
+
+            built = sweep_and_prune.SweepAndPrune(axes)
+            built.build(ents)
+            self.assertEqual(len(ents), len(built))
+            self.assert_pairs(built, ents)
+
+    def test_remove(self):
+        ents = self.random_ents(150)
+        for axes in (1, 2):
+            sap = sweep_and_prune.SweepAndPrune(axes)
+            sap.build(ents)
+            remaining = list(ents)
+            self.rng.shuffle(remaining)
+            while len(remaining) > 100:
+                self.assertTrue(sap.remove(remaining.pop()))
+            self.assertFalse(sap.remove(ents[0] if ents[0] not in remaining else quadtree.QuadTreeEntity(rect2.Rect2(1, 1))))
+            self.assertEqual(100, len(sap))
+            self.assert_pairs(sap, remaining)
+
+    def test_update(self):
+        rng = self.rng
+        for axes in (1, 2):
+            ents = self.random_ents(150)
+            sap = sweep_and_prune.SweepAndPrune(axes)
+            sap.build(ents)
+            for _ in range(10):
+                for ent in ents:
+                    aabb = ent.aabb
+                    w = max(1, aabb.width + rng.uniform(-5, 5))
+                    h = max(1, aabb.height + rng.uniform(-5, 5))
+                    new_pos = vector2.Vector2(aabb.mincorner.x + rng.uniform(-20, 20), aabb.mincorner.y + rng.uniform(-20, 20))
+                    sap.update(ent, rect2.Rect2(w, h, new_pos))
+                self.assert_pairs(sap, ents)
+            self.assertRaises(ValueError, sap.update, quadtree.QuadTreeEntity(rect2.Rect2(1, 1)), rect2.Rect2(2, 2))
+
+    def test_retrieve_collidables(self):
+        ents = self.random_ents(200)
+        sap = sweep_and_prune.SweepAndPrune()
+        sap.build(ents)
+
+        probe = quadtree.QuadTreeEntity(rect2.Rect2(100, 80, vector2.Vector2(400, 450)))
+        expected = set(id(ent) for ent in ents if self.touching(probe, ent))
+        self.assertEqual(expected, set(id(ent) for ent in sap.retrieve_collidables(probe)))
+
+        collidables = sap.retrieve_collidables(ents[0])
+        self.assertTrue(any(ent is ents[0] for ent in collidables))
+        self.assertEqual([], sap.retrieve_collidables(ents[0], lambda ent: False))
+
+    def test_get_code(self):
+        self.assertIsNotNone(sweep_and_prune.SweepAndPrune.get_code())
+
+class TestSweepAndPruneBenchmark(unittest.TestCase):
+    # Moves every entity a little each frame, as in a simulation, and finds
+    # the candidate pairs with a sweep and prune kept up to date and with a
+    # quadtree rebuilt every frame.
+
+    def test_coherent_motion(self):
+        rng = random.Random(3)
+        count = 3000
+        side = (count * 400) ** 0.5
+        ents = [quadtree.QuadTreeEntity(rect2.Rect2(4, 4, vector2.Vector2(rng.uniform(0, side - 4), rng.uniform(0, side - 4))))
+                for _ in range(count)]
+        velocities = [(rng.uniform(-0.5, 0.5), rng.uniform(-0.5, 0.5)) for _ in range(count)]
+        frames = 10
+
+        sap = sweep_and_prune.SweepAndPrune()
+        sap.build(ents)
+        sap_time = 0
+        tree_time = 0
+        for _ in range(frames):
+            moved = [rect2.Rect2(4, 4, vector2.Vector2(ent.aabb.mincorner.x + vel[0], ent.aabb.mincorner.y + vel[1]))
+                     for ent, vel in zip(ents, velocities)]
+
+            started_at = time.time()
+            for ent, aabb in zip(ents, moved):
+                sap.update(ent, aabb)
+            sap_pairs = sum(1 for _ in sap.find_all_pairs())
+            sap_time += time.time() - started_at
+
+            started_at = time.time()
+            tree = quadtree.QuadTree(16, 10, rect2.Rect2(side + 20, side + 20, vector2.Vector2(-10, -10)))
+            tree.build(ents)
+            tree_pairs = sum(1 for _ in tree.find_all_pairs())
+            tree_time += time.time() - started_at
+
+            self.assertLessEqual(sap_pairs, tree_pairs)
+
+        print('{} entities, {} frames: sweep and prune {}s ({} pairs), quadtree rebuild {}s ({} candidate pairs)'.format(
+            count, frames, round(sap_time, 4), sap_pairs, round(tree_time, 4), tree_pairs))
+
+
+class TestSpatialHashGrid(unittest.TestCase):
+    def setUp(self):
+        self.rng = random.Random(6)
+
+    def random_ents(self, count, max_size=60):
+        rng = self.rng
+        ents = []
+        for _ in range(count):
+            w = rng.uniform(1, max_size)
+            h = rng.uniform(1, max_size)
+            ents.append(quadtree.QuadTreeEntity(rect2.Rect2(w, h, vector2.Vector2(rng.uniform(-500, 500 - w), rng.uniform(-500, 500 - h)))))
+        return ents
+
+    def assert_pairs(self, grid, ents):
+        pairs = [frozenset((id(a), id(b))) for a, b in grid.find_all_pairs()]
+        self.assertEqual(len(set(pairs)), len(pairs))
+        expected = set()
+        for i in range(len(ents)):
+            for j in range(i + 1, len(ents)):
+                if TestSweepAndPrune.touching(ents[i], ents[j]):
+                    expected.add(frozenset((id(ents[i]), id(ents[j]))))
+        self.assertEqual(expected, set(pairs))
+
+    def test_constructor(self):
+        grid = spatial_hash_grid.SpatialHashGrid(10)
+        self.assertEqual(10, grid.cell_size)
+        self.assertEqual(0, len(grid))
+        self.assertEqual([], list(grid.find_all_pairs()))
+        self.assertRaises(ValueError, spatial_hash_grid.SpatialHashGrid, 0)
+
+    def test_touching(self):
+        grid = spatial_hash_grid.SpatialHashGrid(10)
+        ent1 = quadtree.QuadTreeEntity(rect2.Rect2(10, 10))
+        ent2 = quadtree.QuadTreeEntity(rect2.Rect2(10, 10, vector2.Vector2(10, 10)))
+        ent3 = quadtree.QuadTreeEntity(rect2.Rect2(5, 5, vector2.Vector2(-15, 3)))
+        grid.build([ent1, ent2, ent3])
+        self.assertEqual(3, len(grid))
+        self.assertEqual([set((ent1, ent2))], [set(pair) for pair in grid.find_all_pairs()])
+        self.assertRaises(ValueError, grid.insert, ent1)
+
+    def test_insert(self):
+        ents = self.random_ents(200)
+        for cell_size in (7, 40, 300):
+            grid = spatial_hash_grid.SpatialHashGrid(cell_size)
+            grid.build(ents)
+            self.assert_pairs(grid, ents)
+
+    def test_remove(self):
+        ents = self.random_ents(150)
+        grid = spatial_hash_grid.SpatialHashGrid(25)
+        grid.build(ents)
+        remaining = list(ents)
+        self.rng.shuffle(remaining)
+        removed = []
+        while len(remaining) > 100:
+            removed.append(remaining.pop())
+            self.assertTrue(grid.remove(removed[-1]))
+        self.assertFalse(grid.remove(removed[0]))
+        self.assertEqual(100, len(grid))
+        self.assert_pairs(grid, remaining)
+
+        for ent in remaining:
+            grid.remove(ent)
+        self.assertEqual(0, len(grid))
+        self.assertEqual([], grid.retrieve_region(rect2.Rect2(1000, 1000, vector2.Vector2(-500, -500))))
+
+    def test_update(self):
+        rng = self.rng
+        ents = self.random_ents(150)
+        grid = spatial_hash_grid.SpatialHashGrid(30)
+        grid.build(ents)
+        changed = 0
+        for _ in range(10):
+            for ent in ents:
+                aabb = ent.aabb
+                w = max(1, aabb.width + rng.uniform(-5, 5))
+                h = max(1, aabb.height + rng.uniform(-5, 5))
+                new_pos = vector2.Vector2(aabb.mincorner.x + rng.uniform(-20, 20), aabb.mincorner.y + rng.uniform(-20, 20))
+                if grid.update(ent, rect2.Rect2(w, h, new_pos)):
+                    changed += 1
+            self.assert_pairs(grid, ents)
+        self.assertGreater(changed, 0)
+
+        ent = quadtree.QuadTreeEntity(rect2.Rect2(2, 2, vector2.Vector2(1, 1)))
+        grid.insert(ent)
+        self.assertFalse(grid.update(ent, rect2.Rect2(2, 2, vector2.Vector2(3, 3))))
+        self.assertEqual(3, ent.aabb.mincorner.x)
+        self.assertRaises(ValueError, grid.update, quadtree.QuadTreeEntity(rect2.Rect2(1, 1)), rect2.Rect2(2, 2))
+
+    def test_retrieve(self):
+        ents = self.random_ents(200)
+        grid = spatial_hash_grid.SpatialHashGrid(50)
+        grid.build(ents)
+
+        region = rect2.Rect2(300, 120, vector2.Vector2(-140, 20))
+        probe = quadtree.QuadTreeEntity(region)
+        expected = set(id(ent) for ent in ents if TestSweepAndPrune.touching(probe, ent))
+        found = [id(ent) for ent in grid.retrieve_region(region)]
+        self.assertEqual(len(set(found)), len(found))
+        self.assertEqual(expected, set(found))
+        self.assertEqual(expected, set(id(ent) for ent in grid.retrieve_collidables(probe)))
+
+        collidables = grid.retrieve_collidables(ents[0])
+        self.assertTrue(any(ent is ents[0] for ent in collidables))
+        self.assertEqual([], grid.retrieve_collidables(ents[0], lambda ent: False))
+
+    def test_get_code(self):
+        self.assertIsNotNone(spatial_hash_grid.SpatialHashGrid.get_code())
+
+class TestSpatialHashGridBenchmark(unittest.TestCase):
+    # Compares a spatial hash grid to a quadtree on entities of about the
+    # same size, spread evenly over the world or gathered in a few tight
+    # clusters: building, finding every pair, and asking for the
+    # collidables of each entity. The grid only returns the entities that
+    # touch, while the quadtree returns every entity of the nodes it
+    # visits for the caller to check, so the indexes are compared on the
+    # number of candidates they return rather than on time.
+
+    count = 5000
+
+    def uniform_ents(self, rng, side):
+        return [quadtree.QuadTreeEntity(rect2.Rect2(4, 4, vector2.Vector2(rng.uniform(0, side - 4), rng.uniform(0, side - 4))))
+                for _ in range(self.count)]
+
+    def clustered_ents(self, rng, side):
+        centers = [(rng.uniform(side * 0.2, side * 0.8), rng.uniform(side * 0.2, side * 0.8)) for _ in range(8)]
+        ents = []
+        for _ in range(self.count):
+            cx, cy = rng.choice(centers)
+            x = min(max(rng.gauss(cx, side * 0.03), 0), side - 4)
+            y = min(max(rng.gauss(cy, side * 0.03), 0), side - 4)
+            ents.append(quadtree.QuadTreeEntity(rect2.Rect2(4, 4, vector2.Vector2(x, y))))
+        return ents
+
+    def time_index(self, index, ents):
+        started_at = time.time()
+        index.build(ents)
+        build_time = time.time() - started_at
+
+        started_at = time.time()
+        pair_count = sum(1 for _ in index.find_all_pairs())
+        pairs_time = time.time() - started_at
+
+        started_at = time.time()
+        candidate_count = 0
+        for ent in ents:
+            candidate_count += len(index.retrieve_collidables(ent))
+        retrieve_time = time.time() - started_at
+        return build_time, pairs_time, retrieve_time, pair_count, candidate_count
+
+    def run_workload(self, name, make_ents):
+        rng = random.Random(4)
+        side = (self.count * 400) ** 0.5
+        ents = make_ents(rng, side)
+
+        grid = self.time_index(spatial_hash_grid.SpatialHashGrid(8), ents)
+        tree = self.time_index(quadtree.QuadTree(16, 10, rect2.Rect2(side, side)), ents)
+
+        print('{} {} entities: grid build {}s, pairs {}s ({} pairs), retrieve {}s ({} candidates); '
+              'quadtree build {}s, pairs {}s ({} candidate pairs), retrieve {}s ({} candidates)'.format(
+                  self.count, name, round(grid[0], 4), round(grid[1], 4), grid[3], round(grid[2], 4), grid[4],
+                  round(tree[0], 4), round(tree[1], 4), tree[3], round(tree[2], 4), tree[4]))
+        return grid[4], tree[4]
+
+    def test_uniform(self):
+        grid_candidates, tree_candidates = self.run_workload('uniform', self.uniform_ents)
+        self.assertLess(grid_candidates, tree_candidates)
+
+    def test_clustered(self):
+        self.run_workload('clustered', self.clustered_ents)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -1,10 +1,36 @@
 import unittest
+import gc
 import math
+import os
+import pickle
+import random
+import tempfile
 import time
+import tracemalloc
+import weakref
 
-from pygorithm.pathfinding import (dijkstra, astar)
+from pygorithm.pathfinding import (dijkstra, astar, jps, path_cache, batch, hpa, dstar_lite, landmarks, contraction, flow_field)
 from pygorithm.data_structures import graph
 
+def euclidean_heuristic(graph, v1, v2):
+    dx = v2[0] - v1[0]
+    dy = v2[1] - v1[1]
+    return math.sqrt(dx * dx + dy * dy)
+
+def zero_heuristic(graph, v1, v2):
+    return 0
+
+def measure(build):
+    # calls build and returns its result, the time it took and the peak
+    # memory it allocated
+    tracemalloc.start()
+    started_at = time.time()
+    result = build()
+    elapsed = time.time() - started_at
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
 class TimedTestCase(unittest.TestCase):
     # https://hackernoon.com/timing-tests-in-python-for-fun-and-profit-1663144571
     def setUp(self):
@@ -48,6 +74,67 @@ class TestDijkstraTimed(SimplePathfindingTestCaseTimed):
        my_pathfinder = dijkstra.Dijkstra()
        return my_pathfinder.find_path(my_graph, (0, 0), (3, 0))
 
+class TestDijkstraWeighted(unittest.TestCase):
+    def test_find_path_respects_weights(self):
+        # the direct edge has the fewest hops but is the most expensive
+        my_graph = graph.WeightedUndirectedGraph()
+        my_graph.add_edge('a', 'd', 10)
+        my_graph.add_edge('a', 'b', 1)
+        my_graph.add_edge('b', 'c', 2)
+        my_graph.add_edge('c', 'd', 3)
+        
+        my_pathfinder = dijkstra.Dijkstra()
+        self.assertEqual(['a', 'b', 'c', 'd'], my_pathfinder.find_path(my_graph, 'a', 'd'))
+        
+        my_graph.add_edge('a', 'd', 5)
+        self.assertEqual(['a', 'd'], my_pathfinder.find_path(my_graph, 'a', 'd'))
+        
+        my_graph.add_edge('e', 'f', 1)
+        self.assertIsNone(my_pathfinder.find_path(my_graph, 'a', 'f'))
+    
+    def test_shortest_path_tree(self):
+        my_graph = graph.WeightedUndirectedGraph()
+        my_graph.gridify(5, 1)
+        my_graph.remove_edge((2, 0))
+        my_graph.remove_edge((2, 1))
+        my_graph.remove_edge((2, 2))
+        my_graph.remove_edge((2, 3))
+        my_graph.add_edge((9, 9), (9, 8), 1)
+        
+        my_pathfinder = dijkstra.Dijkstra()
+        distances, parents = my_pathfinder.shortest_path_tree(my_graph, (0, 0))
+        
+        self.assertEqual(21, len(distances))
+        self.assertEqual(set(distances.keys()), set(parents.keys()))
+        self.assertEqual(0, distances[(0, 0)])
+        self.assertIsNone(parents[(0, 0)])
+        self.assertAlmostEqual(9.242640687119284, distances[(3, 0)])
+        self.assertNotIn((9, 9), distances)
+        self.assertIsNone(my_pathfinder.path_from_tree(parents, (9, 9)))
+        
+        for vertex in distances:
+            path = my_pathfinder.path_from_tree(parents, vertex)
+            self.assertEqual((0, 0), path[0])
+            self.assertEqual(vertex, path[-1])
+            
+            total_weight = 0
+            for i in range(1, len(path)):
+                total_weight += my_graph.get_edge_weight(path[i - 1], path[i])
+            self.assertAlmostEqual(distances[vertex], total_weight)
+            
+            single_path = my_pathfinder.find_path(my_graph, (0, 0), vertex)
+            single_weight = 0
+            for i in range(1, len(single_path)):
+                single_weight += my_graph.get_edge_weight(single_path[i - 1], single_path[i])
+            self.assertAlmostEqual(distances[vertex], single_weight)
+    
+    def test_reverse_path(self):
+        start = {'vertex': 'a', 'parent': None}
+        middle = {'vertex': 'b', 'parent': start}
+        end = {'vertex': 'c', 'parent': middle}
+        self.assertEqual(['a', 'b', 'c'], dijkstra.Dijkstra.reverse_path(end))
+        self.assertEqual(['a'], dijkstra.Dijkstra.reverse_path(start))
+
 class TestAStarUnidirectionalTimed(SimplePathfindingTestCaseTimed):
     def find_path(self, my_graph, v1, v2):
         my_pathfinder = astar.OneDirectionalAStar()
@@ -68,4 +155,1042 @@ class TestAStarBiDirectionalTimed(SimplePathfindingTestCaseTimed):
             dy = v2[1] - v1[1]
             return math.sqrt(dx * dx + dy * dy)
         
-        return my_pathfinder.find_path(my_graph, v1, v2, my_heuristic)
\ No newline at end of file
+        return my_pathfinder.find_path(my_graph, v1, v2, my_heuristic)
+
+class TestJumpPointSearchTimed(SimplePathfindingTestCaseTimed):
+    def find_path(self, my_graph, v1, v2):
+        my_pathfinder = jps.JumpPointSearch()
+        return my_pathfinder.find_path(my_graph, v1, v2, euclidean_heuristic)
+
+class CountingPathfinder(object):
+    # Wraps a pathfinder and counts how many times find_path is called
+    def __init__(self, wrapped):
+        self.wrapped = wrapped
+        self.calls = 0
+    
+    def find_path(self, *args):
+        self.calls += 1
+        return self.wrapped.find_path(*args)
+
+class TestPathCache(unittest.TestCase):
+    def setUp(self):
+        self.my_graph = graph.WeightedUndirectedGraph()
+        self.my_graph.gridify(5, 1)
+        self.pathfinder = CountingPathfinder(dijkstra.Dijkstra())
+        
+    def test_hit_and_miss(self):
+        cache = path_cache.PathCache(self.pathfinder)
+        
+        first = cache.find_path(self.my_graph, (0, 0), (4, 4))
+        second = cache.find_path(self.my_graph, (0, 0), (4, 4))
+        self.assertEqual(first, second)
+        self.assertEqual(1, self.pathfinder.calls)
+        
+        # the cache hands out copies
+        second.append('x')
+        self.assertEqual(first, cache.find_path(self.my_graph, (0, 0), (4, 4)))
+        
+        cache.find_path(self.my_graph, (4, 4), (0, 0))
+        self.assertEqual(2, self.pathfinder.calls)
+        
+        stats = cache.stats()
+        self.assertEqual(2, stats['hits'])
+        self.assertEqual(2, stats['misses'])
+        self.assertEqual(0, stats['evictions'])
+        self.assertEqual(2, stats['paths'])
+        self.assertEqual(10, stats['vertices'])
+    
+    def test_invalidated_by_mutation(self):
+        cache = path_cache.PathCache(self.pathfinder)
+        
+        self.assertEqual(5, len(cache.find_path(self.my_graph, (0, 0), (4, 4))))
+        self.my_graph.remove_edge((2, 2))
+        path = cache.find_path(self.my_graph, (0, 0), (4, 4))
+        self.assertNotIn((2, 2), path)
+        self.assertEqual(2, self.pathfinder.calls)
+        self.assertEqual(1, cache.stats()['invalidations'])
+        
+        self.my_graph.add_edge((5, 5), (6, 6), 1)
+        self.assertIsNone(cache.find_path(self.my_graph, (0, 0), (6, 6)))
+        self.assertIsNone(cache.find_path(self.my_graph, (0, 0), (6, 6)))
+        self.assertEqual(3, self.pathfinder.calls)
+        
+    def test_eviction(self):
+        cache = path_cache.PathCache(self.pathfinder, max_paths=2)
+        cache.find_path(self.my_graph, (0, 0), (1, 1))
+        cache.find_path(self.my_graph, (0, 0), (2, 2))
+        cache.find_path(self.my_graph, (0, 0), (1, 1))
+        cache.find_path(self.my_graph, (0, 0), (3, 3))
+        self.assertEqual(2, len(cache))
+        self.assertEqual(1, cache.stats()['evictions'])
+        
+        # (0, 0) -> (2, 2) was the least recently used
+        cache.find_path(self.my_graph, (0, 0), (1, 1))
+        self.assertEqual(3, self.pathfinder.calls)
+        cache.find_path(self.my_graph, (0, 0), (2, 2))
+        self.assertEqual(4, self.pathfinder.calls)
+        
+    def test_releases_graphs(self):
+        cache = path_cache.PathCache(self.pathfinder, max_paths=1)
+        other_graph = graph.WeightedUndirectedGraph()
+        other_graph.gridify(3, 1)
+        other_ref = weakref.ref(other_graph)
+        cache.find_path(other_graph, (0, 0), (2, 2))
+        
+        # evicting the last path of a graph forgets the graph
+        cache.find_path(self.my_graph, (0, 0), (1, 1))
+        del other_graph
+        gc.collect()
+        self.assertIsNone(other_ref())
+        
+        # also after the graph changed and its paths were invalidated
+        other_graph = graph.WeightedUndirectedGraph()
+        other_graph.gridify(3, 1)
+        other_ref = weakref.ref(other_graph)
+        cache.find_path(other_graph, (0, 0), (2, 2))
+        other_graph.remove_edge((1, 1))
+        cache.find_path(other_graph, (0, 0), (2, 2))
+        self.assertEqual(1, cache.stats()['invalidations'])
+        cache.find_path(self.my_graph, (0, 0), (1, 1))
+        del other_graph
+        gc.collect()
+        self.assertIsNone(other_ref())
+        
+        # and clearing the cache forgets every graph
+        other_graph = graph.WeightedUndirectedGraph()
+        other_graph.gridify(3, 1)
+        other_ref = weakref.ref(other_graph)
+        cache.find_path(other_graph, (0, 0), (2, 2))
+        cache.clear()
+        del other_graph
+        gc.collect()
+        self.assertIsNone(other_ref())
+    
+    def test_memory_bound(self):
+        cache = path_cache.PathCache(self.pathfinder, max_vertices=6)
+        cache.find_path(self.my_graph, (0, 0), (1, 1))
+        cache.find_path(self.my_graph, (0, 0), (2, 2))
+        self.assertEqual(5, cache.stats()['vertices'])
+        cache.find_path(self.my_graph, (0, 0), (4, 4))
+        self.assertEqual(5, cache.stats()['vertices'])
+        self.assertEqual(2, cache.stats()['evictions'])
+        self.assertEqual(1, len(cache))
+    
+    def test_astar_heuristic_is_part_of_key(self):
+        pathfinder = CountingPathfinder(astar.OneDirectionalAStar())
+        cache = path_cache.PathCache(pathfinder)
+        
+        cache.find_path(self.my_graph, (0, 0), (4, 2), zero_heuristic)
+        cache.find_path(self.my_graph, (0, 0), (4, 2), euclidean_heuristic)
+        cache.find_path(self.my_graph, (0, 0), (4, 2), euclidean_heuristic)
+        self.assertEqual(2, pathfinder.calls)
+
+class GridGraphPathfindingTestCaseTimed(SimplePathfindingTestCaseTimed):
+    def test_find_path_package_example_grid_graph(self):
+        # same as the package example, but on a GridGraph with
+        # the x=2 column blocked except for (2,4)
+        my_graph = graph.GridGraph(5)
+        my_graph.set_blocked((2, 0))
+        my_graph.set_blocked((2, 1))
+        my_graph.set_blocked((2, 2))
+        my_graph.set_blocked((2, 3))
+        
+        my_path = self.find_path(my_graph, (0, 0), (3, 0))
+        
+        self.assertIsNotNone(my_path)
+        
+        total_weight = 0
+        for i in range(1, len(my_path)):
+            total_weight += my_graph.get_edge_weight(my_path[i - 1], my_path[i])
+            
+        self.assertAlmostEqual(9.242640687119284, total_weight)
+
+class TestDijkstraGridGraphTimed(GridGraphPathfindingTestCaseTimed, TestDijkstraTimed):
+    pass
+
+class TestAStarUnidirectionalGridGraphTimed(GridGraphPathfindingTestCaseTimed, TestAStarUnidirectionalTimed):
+    pass
+
+class TestAStarBiDirectionalGridGraphTimed(GridGraphPathfindingTestCaseTimed, TestAStarBiDirectionalTimed):
+    pass
+
+class TestJumpPointSearchGridGraphTimed(GridGraphPathfindingTestCaseTimed, TestJumpPointSearchTimed):
+    pass
+
+class TestGridGraphBenchmark(unittest.TestCase):
+    # Compares building a GridGraph against gridify on the same grid.
+    # Not a strict performance test; the printed numbers are what's
+    # interesting. Only the memory is asserted, as the times depend on
+    # the machine's load.
+    size = 100
+    
+    def test_build_time_and_memory(self):
+        def build_gridify():
+            my_graph = graph.WeightedUndirectedGraph()
+            my_graph.gridify(self.size, 1)
+            return my_graph
+        
+        def build_grid_graph():
+            return graph.GridGraph(self.size)
+        
+        _, gridify_time, gridify_peak = measure(build_gridify)
+        _, grid_time, grid_peak = measure(build_grid_graph)
+        
+        print('{}x{} gridify: {}s {}KiB, GridGraph: {}s {}KiB'.format(
+            self.size, self.size,
+            round(gridify_time, 4), gridify_peak // 1024,
+            round(grid_time, 4), grid_peak // 1024))
+        
+        self.assertLess(grid_peak * 10, gridify_peak)
+
+class CountingGraph(object):
+    # Wraps a graph and counts how many vertices have their neighbors
+    # looked up, which is once per expanded vertex for every pathfinder
+    def __init__(self, wrapped):
+        self.wrapped = wrapped
+        self.graph = self
+        self.expanded = 0
+    
+    def __getitem__(self, vertex):
+        self.expanded += 1
+        return self.wrapped.graph[vertex]
+    
+    def __contains__(self, vertex):
+        return vertex in self.wrapped.graph
+    
+    def __iter__(self):
+        return iter(self.wrapped.graph)
+    
+    def get_edge_weight(self, u, v):
+        return self.wrapped.get_edge_weight(u, v)
+
+class TestJumpPointSearchBenchmark(unittest.TestCase):
+    # Compares the number of expanded vertices between A* and JPS.
+    # The paths must cost the same; JPS should expand an order of
+    # magnitude fewer vertices on open maps.
+    size = 100
+    
+    @staticmethod
+    def path_cost(my_graph, path):
+        total_weight = 0
+        for i in range(1, len(path)):
+            total_weight += my_graph.get_edge_weight(path[i - 1], path[i])
+        return total_weight
+    
+    def compare(self, name, my_graph, start, end):
+        results = []
+        for pathfinder in (astar.OneDirectionalAStar(), jps.JumpPointSearch()):
+            counting_graph = CountingGraph(my_graph)
+            started_at = time.time()
+            path = pathfinder.find_path(counting_graph, start, end, euclidean_heuristic)
+            elapsed = time.time() - started_at
+            self.assertIsNotNone(path)
+            results.append((counting_graph.expanded, elapsed, self.path_cost(my_graph, path)))
+        
+        (astar_expanded, astar_time, astar_cost), (jps_expanded, jps_time, jps_cost) = results
+        print('{}: A* expanded {} ({}s), JPS expanded {} ({}s)'.format(
+            name, astar_expanded, round(astar_time, 4), jps_expanded, round(jps_time, 4)))
+        self.assertAlmostEqual(astar_cost, jps_cost)
+        return astar_expanded, jps_expanded
+    
+    def test_open_map(self):
+        my_graph = graph.GridGraph(self.size)
+        astar_expanded, jps_expanded = self.compare('open map', my_graph, (0, 0), (self.size - 1, self.size // 2))
+        self.assertLessEqual(jps_expanded * 10, astar_expanded)
+    
+    def test_walls(self):
+        my_graph = graph.GridGraph(self.size)
+        for y in range(0, self.size * 3 // 4):
+            my_graph.set_blocked((self.size // 3, y))
+        for y in range(self.size // 4, self.size):
+            my_graph.set_blocked((self.size * 2 // 3, y))
+        astar_expanded, jps_expanded = self.compare('walls', my_graph, (0, 0), (self.size - 1, self.size - 1))
+        self.assertLessEqual(jps_expanded * 10, astar_expanded)
+    
+    def test_gridify(self):
+        my_graph = graph.WeightedUndirectedGraph()
+        my_graph.gridify(30, 1)
+        for y in range(0, 25):
+            my_graph.remove_edge((15, y))
+        self.compare('gridify', my_graph, (0, 0), (29, 0))
+
+class TestBatchPathfinding(unittest.TestCase):
+    def setUp(self):
+        self.my_graph = graph.GridGraph(10)
+        for y in range(0, 8):
+            self.my_graph.set_blocked((5, y))
+        self.my_graph.set_blocked((9, 9))
+        self.pairs = [((0, 0), (9, 0)), ((9, 0), (0, 0)), ((0, 9), (9, 5)),
+                      ((1, 1), (9, 9)), ((3, 3), (3, 3)), ((0, 0), (8, 8))]
+    
+    def expected(self, pathfinder, heuristic_fn):
+        result = []
+        for start, end in self.pairs:
+            if heuristic_fn is None:
+                result.append(pathfinder.find_path(self.my_graph, start, end))
+            else:
+                result.append(pathfinder.find_path(self.my_graph, start, end, heuristic_fn))
+        return result
+    
+    def test_single_worker(self):
+        paths = batch.find_paths(self.my_graph, self.pairs, euclidean_heuristic)
+        self.assertEqual(self.expected(astar.OneDirectionalAStar(), euclidean_heuristic), paths)
+        self.assertIsNone(paths[3])
+        self.assertEqual([(3, 3)], paths[4])
+    
+    def test_many_workers_keep_order(self):
+        paths = batch.find_paths(self.my_graph, self.pairs, euclidean_heuristic, workers=3, chunksize=1)
+        self.assertEqual(self.expected(astar.OneDirectionalAStar(), euclidean_heuristic), paths)
+    
+    def test_other_pathfinders(self):
+        paths = batch.find_paths(self.my_graph, self.pairs, None, workers=2, pathfinder=dijkstra.Dijkstra())
+        self.assertEqual(self.expected(dijkstra.Dijkstra(), None), paths)
+        
+        paths = batch.find_paths(self.my_graph, iter(self.pairs[:3]), lambda g, v1, v2: 0,
+                                 workers=2, pathfinder=astar.BiDirectionalAStar())
+        self.assertEqual(3, len(paths))
+        self.assertEqual((0, 0), paths[0][0])
+        self.assertEqual((9, 0), paths[0][-1])
+
+class TestBatchPathfindingBenchmark(unittest.TestCase):
+    # Times the same batch with 1, 2, 4 and 8 workers. The speedup
+    # depends on the number of cores, so only the results are checked.
+    size = 40
+    count = 64
+    
+    def test_scaling(self):
+        my_graph = graph.GridGraph(self.size)
+        for y in range(0, self.size * 3 // 4):
+            my_graph.set_blocked((self.size // 2, y))
+        
+        pairs = []
+        for i in range(self.count):
+            pairs.append(((0, i % self.size), (self.size - 1, (i * 7) % self.size)))
+        
+        expected = None
+        for workers in (1, 2, 4, 8):
+            started_at = time.time()
+            paths = batch.find_paths(my_graph, pairs, euclidean_heuristic, workers=workers)
+            elapsed = time.time() - started_at
+            print('{} paths with {} workers: {}s'.format(len(pairs), workers, round(elapsed, 3)))
+            
+            if expected is None:
+                expected = paths
+            self.assertEqual(expected, paths)
+
+class TestAStarNodeBenchmark(unittest.TestCase):
+    # Compares the per-vertex bookkeeping A* used to do (a dict per
+    # vertex) with AStarNode, and checks that A* expands each vertex
+    # at most once.
+    count = 10000
+    size = 60
+    
+    def test_node_memory(self):
+        def build_dicts():
+            parent = None
+            for i in range(self.count):
+                parent = {'vertex': (i, i),
+                          'dist_start_to_here': i,
+                          'pred_dist_here_to_end': 1.5,
+                          'pred_total_dist': i + 1.5,
+                          'parent': parent}
+            return parent
+        
+        def build_nodes():
+            parent = None
+            for i in range(self.count):
+                parent = astar.AStarNode((i, i), parent, i, 1.5)
+            return parent
+        
+        _, dict_time, dict_peak = measure(build_dicts)
+        last_node, node_time, node_peak = measure(build_nodes)
+        
+        print('{} records: dict {}s {}KiB, AStarNode {}s {}KiB'.format(
+            self.count, round(dict_time, 4), dict_peak // 1024,
+            round(node_time, 4), node_peak // 1024))
+        
+        self.assertLess(node_peak, dict_peak)
+        self.assertEqual(self.count - 1 + 1.5, last_node.pred_total_dist)
+        self.assertEqual(self.count, len(astar.OneDirectionalAStar.reverse_path(last_node)))
+    
+    def test_each_vertex_expanded_once(self):
+        my_graph = graph.GridGraph(self.size)
+        for y in range(0, self.size - 1):
+            my_graph.set_blocked((self.size // 2, y))
+        
+        for pathfinder in (astar.OneDirectionalAStar(), astar.BiDirectionalAStar()):
+            counting_graph = CountingGraph(my_graph)
+            started_at = time.time()
+            path = pathfinder.find_path(counting_graph, (0, 0), (self.size - 1, 0), euclidean_heuristic)
+            elapsed = time.time() - started_at
+            print('{}: expanded {} of {} vertices ({}s)'.format(
+                type(pathfinder).__name__, counting_graph.expanded, len(my_graph.graph), round(elapsed, 4)))
+            
+            self.assertIsNotNone(path)
+            self.assertLessEqual(counting_graph.expanded, len(my_graph.graph))
+        
+        # unreachable: every reachable vertex is expanded exactly once
+        my_graph.set_blocked((self.size // 2, self.size - 1))
+        counting_graph = CountingGraph(my_graph)
+        path = astar.OneDirectionalAStar().find_path(counting_graph, (0, 0), (self.size - 1, 0), euclidean_heuristic)
+        self.assertIsNone(path)
+        self.assertEqual((self.size // 2) * self.size, counting_graph.expanded)
+
+class TestHierarchicalAStar(unittest.TestCase):
+    def setUp(self):
+        # the package example, on a bigger grid with 5x5 clusters
+        self.my_graph = graph.WeightedUndirectedGraph()
+        self.my_graph.gridify(20, 1)
+        for y in range(0, 19):
+            self.my_graph.remove_edge((7, y))
+        for y in range(3, 20):
+            self.my_graph.remove_edge((13, y))
+    
+    def check_path(self, path, start, end):
+        self.assertIsNotNone(path)
+        self.assertEqual(start, path[0])
+        self.assertEqual(end, path[-1])
+        total_weight = 0
+        for i in range(1, len(path)):
+            weight = self.my_graph.get_edge_weight(path[i - 1], path[i])
+            self.assertIsNotNone(weight)
+            total_weight += weight
+        return total_weight
+    
+    def test_find_path(self):
+        pathfinder = hpa.HierarchicalAStar(self.my_graph, 5)
+        
+        for start, end in (((0, 0), (19, 19)), ((19, 0), (0, 5)), ((6, 6), (8, 18)), ((1, 1), (3, 2))):
+            path = pathfinder.find_path(self.my_graph, start, end, euclidean_heuristic)
+            optimal = astar.OneDirectionalAStar().find_path(self.my_graph, start, end, euclidean_heuristic)
+            
+            total_weight = self.check_path(path, start, end)
+            self.assertLessEqual(total_weight, 1.2 * self.check_path(optimal, start, end))
+        
+        self.assertEqual([(4, 4)], pathfinder.find_path(self.my_graph, (4, 4), (4, 4), euclidean_heuristic))
+        self.assertRaises(ValueError, pathfinder.find_path, graph.GridGraph(20), (0, 0), (1, 1), euclidean_heuristic)
+    
+    def test_unreachable(self):
+        self.my_graph.remove_edge((7, 19))
+        pathfinder = hpa.HierarchicalAStar(self.my_graph, 5)
+        self.assertIsNone(pathfinder.find_path(self.my_graph, (0, 0), (19, 19), euclidean_heuristic))
+        self.assertIsNone(pathfinder.find_path(self.my_graph, (0, 0), (7, 0), euclidean_heuristic))
+    
+    def test_diagonal_only_crossing(self):
+        # the only way from the left clusters to the right ones
+        # is diagonally through the corner of four clusters
+        my_graph = graph.GridGraph(10)
+        for y in range(10):
+            if y != 4:
+                my_graph.set_blocked((4, y))
+            if y != 5:
+                my_graph.set_blocked((5, y))
+        pathfinder = hpa.HierarchicalAStar(my_graph, 5)
+        path = pathfinder.find_path(my_graph, (0, 0), (9, 9), euclidean_heuristic)
+        self.assertIsNotNone(path)
+        self.assertIn(((4, 4)), path)
+        self.assertIn(((5, 5)), path)
+    
+    def test_update_matches_build(self):
+        pathfinder = hpa.HierarchicalAStar(self.my_graph, 5)
+        
+        self.my_graph.remove_edge((7, 19))
+        self.my_graph.remove_edge((2, 2))
+        pathfinder.update((7, 19), (2, 2))
+        self.assertIsNone(pathfinder.find_path(self.my_graph, (0, 0), (19, 19), euclidean_heuristic))
+        
+        self.my_graph.add_edge((7, 19), (6, 19), 1)
+        self.my_graph.add_edge((7, 19), (8, 19), 1)
+        pathfinder.update((7, 19))
+        self.check_path(pathfinder.find_path(self.my_graph, (0, 0), (19, 19), euclidean_heuristic), (0, 0), (19, 19))
+        
+        rebuilt = hpa.HierarchicalAStar(self.my_graph, 5)
+        self.assertEqual(rebuilt.abstract.weights, pathfinder.abstract.weights)
+
+class TestHierarchicalAStarBenchmark(unittest.TestCase):
+    # Compares A* with HPA* on a big grid with walls, and an update
+    # after a local edit with building the abstract graph from scratch.
+    # The times are printed; the asserts are on expanded vertices, as
+    # the times depend on the machine's load.
+    size = 120
+    cluster_size = 10
+    
+    def test_long_paths(self):
+        my_graph = graph.GridGraph(self.size)
+        for i in range(1, 6):
+            x = i * self.size // 6
+            gap = (i * 37) % self.size
+            for y in range(self.size):
+                if abs(y - gap) > 2:
+                    my_graph.set_blocked((x, y))
+        
+        counting_graph = CountingGraph(my_graph)
+        started_at = time.time()
+        pathfinder = hpa.HierarchicalAStar(counting_graph, self.cluster_size)
+        build_time = time.time() - started_at
+        build_expanded = counting_graph.expanded
+        
+        pairs = [((0, 0), (self.size - 1, self.size - 1)), ((0, self.size - 1), (self.size - 1, 0)),
+                 ((3, self.size // 2), (self.size - 3, self.size // 3))]
+        results = []
+        for finder, finder_graph in ((astar.OneDirectionalAStar(), CountingGraph(my_graph)), (pathfinder, counting_graph)):
+            expanded_before = finder_graph.expanded
+            started_at = time.time()
+            paths = [finder.find_path(finder_graph, start, end, euclidean_heuristic) for start, end in pairs]
+            results.append((time.time() - started_at, finder_graph.expanded - expanded_before, paths))
+        
+        (astar_time, astar_expanded, astar_paths), (hpa_time, hpa_expanded, hpa_paths) = results
+        for astar_path, hpa_path in zip(astar_paths, hpa_paths):
+            astar_cost = sum(my_graph.get_edge_weight(astar_path[i - 1], astar_path[i]) for i in range(1, len(astar_path)))
+            hpa_cost = sum(my_graph.get_edge_weight(hpa_path[i - 1], hpa_path[i]) for i in range(1, len(hpa_path)))
+            self.assertLessEqual(hpa_cost, 1.1 * astar_cost)
+        
+        expanded_before = counting_graph.expanded
+        started_at = time.time()
+        my_graph.set_blocked((self.size // 2, self.size // 2 + 1))
+        pathfinder.update((self.size // 2, self.size // 2 + 1))
+        update_time = time.time() - started_at
+        update_expanded = counting_graph.expanded - expanded_before
+        
+        print('{}x{}: build {}s ({} expanded), update {}s ({} expanded), A* {}s ({} expanded), HPA* {}s ({} expanded)'.format(
+            self.size, self.size, round(build_time, 4), build_expanded, round(update_time, 4), update_expanded,
+            round(astar_time, 4), astar_expanded, round(hpa_time, 4), hpa_expanded))
+        self.assertLess(update_expanded * 10, build_expanded)
+        self.assertLess(hpa_expanded * 10, astar_expanded)
+
+class TestDStarLite(unittest.TestCase):
+    def setUp(self):
+        self.my_graph = graph.GridGraph(20)
+        for y in range(0, 18):
+            self.my_graph.set_blocked((7, y))
+    
+    def path_cost(self, path):
+        return sum(self.my_graph.get_edge_weight(path[i - 1], path[i]) for i in range(1, len(path)))
+    
+    def check_optimal(self, path, start, end):
+        optimal = astar.OneDirectionalAStar().find_path(self.my_graph, start, end, euclidean_heuristic)
+        if optimal is None:
+            self.assertIsNone(path)
+            return
+        self.assertIsNotNone(path)
+        self.assertEqual(start, path[0])
+        self.assertEqual(end, path[-1])
+        for i in range(1, len(path)):
+            self.assertIsNotNone(self.my_graph.get_edge_weight(path[i - 1], path[i]))
+        self.assertAlmostEqual(self.path_cost(optimal), self.path_cost(path))
+    
+    def test_find_path(self):
+        planner = dstar_lite.DStarLite()
+        for start, end in (((0, 0), (19, 0)), ((0, 19), (19, 0)), ((3, 3), (3, 3))):
+            self.check_optimal(planner.find_path(self.my_graph, start, end, euclidean_heuristic), start, end)
+    
+    def test_replan_after_changes(self):
+        planner = dstar_lite.DStarLite()
+        start = (0, 0)
+        end = (19, 0)
+        self.check_optimal(planner.find_path(self.my_graph, start, end, euclidean_heuristic), start, end)
+        
+        for vertex in ((7, 18), (8, 18), (5, 5)):
+            # blocking a cell removes its edges, so its old neighbors are passed too
+            old_neighbors = list(self.my_graph.graph[vertex])
+            self.my_graph.set_blocked(vertex)
+            planner.update(vertex, *old_neighbors)
+            self.check_optimal(planner.find_path(self.my_graph, start, end, euclidean_heuristic), start, end)
+        
+        self.my_graph.set_blocked((7, 3), False)
+        self.my_graph.set_cost((6, 3), 5)
+        planner.update((7, 3), (6, 3))
+        self.check_optimal(planner.find_path(self.my_graph, start, end, euclidean_heuristic), start, end)
+    
+    def test_moving_start(self):
+        planner = dstar_lite.DStarLite()
+        end = (19, 0)
+        path = planner.find_path(self.my_graph, (0, 0), end, euclidean_heuristic)
+        # follow the path, blocking a cell ahead after the first few steps
+        start = path[3]
+        self.my_graph.set_blocked((7, 17), False)
+        planner.update((7, 17))
+        path = planner.find_path(self.my_graph, start, end, euclidean_heuristic)
+        self.check_optimal(path, start, end)
+        
+        start = path[2]
+        old_neighbors = list(self.my_graph.graph[(7, 17)])
+        self.my_graph.set_blocked((7, 17))
+        planner.update((7, 17), *old_neighbors)
+        self.check_optimal(planner.find_path(self.my_graph, start, end, euclidean_heuristic), start, end)
+    
+    def test_unreachable(self):
+        planner = dstar_lite.DStarLite()
+        self.assertIsNotNone(planner.find_path(self.my_graph, (0, 0), (19, 0), euclidean_heuristic))
+        for y in (18, 19):
+            old_neighbors = list(self.my_graph.graph[(7, y)])
+            self.my_graph.set_blocked((7, y))
+            planner.update((7, y), *old_neighbors)
+        self.assertIsNone(planner.find_path(self.my_graph, (0, 0), (19, 0), euclidean_heuristic))
+    
+    def test_unreported_change_starts_over(self):
+        planner = dstar_lite.DStarLite()
+        planner.find_path(self.my_graph, (0, 0), (19, 0), euclidean_heuristic)
+        self.my_graph.set_blocked((7, 18))
+        self.my_graph.set_blocked((7, 19))
+        self.assertIsNone(planner.find_path(self.my_graph, (0, 0), (19, 0), euclidean_heuristic))
+    
+    def test_weighted_undirected_graph(self):
+        my_graph = graph.WeightedUndirectedGraph()
+        my_graph.add_edge('a', 'b', 1)
+        my_graph.add_edge('b', 'c', 1)
+        my_graph.add_edge('a', 'c', 5)
+        planner = dstar_lite.DStarLite()
+        self.assertEqual(['a', 'b', 'c'], planner.find_path(my_graph, 'a', 'c', zero_heuristic))
+        my_graph.remove_edge('b')
+        planner.update('b', 'a', 'c')
+        self.assertEqual(['a', 'c'], planner.find_path(my_graph, 'a', 'c', zero_heuristic))
+
+
+class TestDStarLiteBenchmark(unittest.TestCase):
+    # An agent walks across a grid with walls, and a cell next to
+    # it is blocked every few steps. Compares repairing the D* Lite
+    # search with a new A* search after every change, by the number of
+    # vertices whose neighbors each looks up. The times are only printed.
+    size = 100
+    
+    def test_replanning(self):
+        my_graph = graph.GridGraph(self.size)
+        for i in range(1, 5):
+            x = i * self.size // 5
+            gap = (i * 37) % self.size
+            for y in range(self.size):
+                if abs(y - gap) > 2:
+                    my_graph.set_blocked((x, y))
+        end = (self.size - 1, self.size - 1)
+        
+        planner = dstar_lite.DStarLite()
+        dstar_graph = CountingGraph(my_graph)
+        astar_graph = CountingGraph(my_graph)
+        started_at = time.time()
+        path = planner.find_path(dstar_graph, (0, 0), end, euclidean_heuristic)
+        initial_time = time.time() - started_at
+        initial_expanded = dstar_graph.expanded
+        
+        dstar_time = 0
+        astar_time = 0
+        replans = 0
+        start = (0, 0)
+        while start != end and replans < 20:
+            start = path[min(5, len(path) - 1)]
+            if start == end:
+                break
+            # block a cell just ahead of the agent, off the end
+            ahead = path[min(7, len(path) - 1)]
+            if ahead != end:
+                old_neighbors = list(my_graph.graph[ahead])
+                my_graph.set_blocked(ahead)
+            
+            started_at = time.time()
+            if ahead != end:
+                planner.update(ahead, *old_neighbors)
+            path = planner.find_path(dstar_graph, start, end, euclidean_heuristic)
+            dstar_time += time.time() - started_at
+            
+            started_at = time.time()
+            optimal = astar.OneDirectionalAStar().find_path(astar_graph, start, end, euclidean_heuristic)
+            astar_time += time.time() - started_at
+            
+            cost = sum(my_graph.get_edge_weight(path[i - 1], path[i]) for i in range(1, len(path)))
+            optimal_cost = sum(my_graph.get_edge_weight(optimal[i - 1], optimal[i]) for i in range(1, len(optimal)))
+            self.assertAlmostEqual(optimal_cost, cost)
+            replans += 1
+        
+        dstar_expanded = dstar_graph.expanded - initial_expanded
+        print('{}x{}: initial D* Lite {}s, {} replans: D* Lite {}s ({} looked up), A* {}s ({} looked up)'.format(
+            self.size, self.size, round(initial_time, 4), replans, round(dstar_time, 4), dstar_expanded,
+            round(astar_time, 4), astar_graph.expanded))
+        self.assertLess(dstar_expanded * 10, astar_graph.expanded)
+
+def road_graph(size, seed):
+    # A size x size road network with integer vertices, random weights
+    # and some roads missing, so there is no geometric heuristic
+    rng = random.Random(seed)
+    my_graph = graph.WeightedUndirectedGraph()
+    for y in range(size):
+        for x in range(size):
+            if x + 1 < size and rng.random() < 0.9:
+                my_graph.add_edge(y * size + x, y * size + x + 1, rng.randint(1, 10))
+            if y + 1 < size and rng.random() < 0.9:
+                my_graph.add_edge(y * size + x, (y + 1) * size + x, rng.randint(1, 10))
+    return my_graph
+
+class TestLandmarkHeuristic(unittest.TestCase):
+    def setUp(self):
+        self.my_graph = road_graph(15, 3)
+        self.heuristic = landmarks.LandmarkHeuristic(self.my_graph, 4)
+        self.distances, _ = dijkstra.Dijkstra().shortest_path_tree(self.my_graph, 0)
+    
+    def test_admissable(self):
+        self.assertEqual(4, len(self.heuristic.landmarks))
+        self.assertEqual(4 * len(self.heuristic.vertices), len(self.heuristic.distances))
+        self.assertEqual(0, self.heuristic(self.my_graph, 0, 0))
+        for vertex, dist in self.distances.items():
+            self.assertLessEqual(self.heuristic(self.my_graph, 0, vertex), dist + 1e-9)
+            self.assertLessEqual(self.heuristic(self.my_graph, vertex, 0), dist + 1e-9)
+        # exact from every landmark
+        landmark = self.heuristic.landmarks[0]
+        landmark_distances, _ = dijkstra.Dijkstra().shortest_path_tree(self.my_graph, landmark)
+        for vertex, dist in landmark_distances.items():
+            self.assertAlmostEqual(dist, self.heuristic(self.my_graph, landmark, vertex))
+    
+    def test_astar_is_optimal(self):
+        pathfinder = astar.OneDirectionalAStar()
+        for end in (224, 14, 100):
+            path = pathfinder.find_path(self.my_graph, 0, end, self.heuristic)
+            cost = sum(self.my_graph.get_edge_weight(path[i - 1], path[i]) for i in range(1, len(path)))
+            self.assertEqual(self.distances[end], cost)
+    
+    def test_given_landmarks(self):
+        heuristic = landmarks.LandmarkHeuristic(self.my_graph, landmarks=[0])
+        self.assertEqual([0], heuristic.landmarks)
+        self.assertEqual(self.distances[224], heuristic(self.my_graph, 224, 0))
+    
+    def test_disconnected(self):
+        self.my_graph.add_edge('a', 'b', 1)
+        heuristic = landmarks.LandmarkHeuristic(self.my_graph, 4)
+        self.assertIn(heuristic.landmarks[1], ('a', 'b'))
+        self.assertEqual(float('inf'), heuristic(self.my_graph, 0, 'a'))
+        self.assertEqual(1, heuristic(self.my_graph, 'a', 'b'))
+        self.assertEqual(0, heuristic(self.my_graph, 0, 'not in graph'))
+    
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'landmarks.bin')
+            self.heuristic.save(path)
+            loaded = landmarks.LandmarkHeuristic.load(path)
+            try:
+                self.assertIsInstance(loaded.distances, memoryview)
+                self.assertEqual(self.heuristic.landmarks, loaded.landmarks)
+                self.assertEqual(self.heuristic.vertices, loaded.vertices)
+                self.assertEqual(list(self.heuristic.distances), list(loaded.distances))
+                for vertex in (5, 77, 224):
+                    self.assertEqual(self.heuristic(self.my_graph, 0, vertex), loaded(self.my_graph, 0, vertex))
+                
+                copied = pickle.loads(pickle.dumps(loaded))
+                self.assertEqual(list(self.heuristic.distances), list(copied.distances))
+            finally:
+                loaded.close()
+            
+            with open(path, 'wb') as out:
+                out.write(b'not a table' * 10)
+            self.assertRaises(ValueError, landmarks.LandmarkHeuristic.load, path)
+
+class TestLandmarkHeuristicBenchmark(unittest.TestCase):
+    # Compares the vertices A* expands on a road network with no
+    # heuristic (like Dijkstra) and with landmarks, and building the
+    # tables with loading them from a file. Only the expanded vertices
+    # are asserted; the times are printed.
+    size = 80
+    
+    def test_road_network(self):
+        my_graph = road_graph(self.size, 7)
+        started_at = time.time()
+        heuristic = landmarks.LandmarkHeuristic(my_graph, 8)
+        build_time = time.time() - started_at
+        
+        pairs = [(0, self.size * self.size - 1), (self.size - 1, self.size * (self.size - 1)),
+                 (self.size * self.size // 2, 5)]
+        results = []
+        for heuristic_fn in (zero_heuristic, heuristic):
+            counting_graph = CountingGraph(my_graph)
+            started_at = time.time()
+            paths = [astar.OneDirectionalAStar().find_path(counting_graph, start, end, heuristic_fn)
+                     for start, end in pairs]
+            results.append((counting_graph.expanded, time.time() - started_at, paths))
+        
+        (zero_expanded, zero_time, zero_paths), (alt_expanded, alt_time, alt_paths) = results
+        for zero_path, alt_path in zip(zero_paths, alt_paths):
+            zero_cost = sum(my_graph.get_edge_weight(zero_path[i - 1], zero_path[i]) for i in range(1, len(zero_path)))
+            alt_cost = sum(my_graph.get_edge_weight(alt_path[i - 1], alt_path[i]) for i in range(1, len(alt_path)))
+            self.assertEqual(zero_cost, alt_cost)
+        
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'landmarks.bin')
+            heuristic.save(path)
+            started_at = time.time()
+            loaded = landmarks.LandmarkHeuristic.load(path)
+            load_time = time.time() - started_at
+            loaded.close()
+        
+        print('{} vertices: build {}s, load {}s, no heuristic expanded {} ({}s), landmarks expanded {} ({}s)'.format(
+            len(heuristic.vertices), round(build_time, 4), round(load_time, 4),
+            zero_expanded, round(zero_time, 4), alt_expanded, round(alt_time, 4)))
+        self.assertLess(alt_expanded * 2, zero_expanded)
+
+class TestContractionHierarchy(unittest.TestCase):
+    def setUp(self):
+        self.my_graph = road_graph(12, 5)
+        self.hierarchy = contraction.ContractionHierarchy(self.my_graph)
+    
+    def path_cost(self, path):
+        return sum(self.my_graph.get_edge_weight(path[i - 1], path[i]) for i in range(1, len(path)))
+    
+    def test_matches_dijkstra(self):
+        distances, _ = dijkstra.Dijkstra().shortest_path_tree(self.my_graph, 0)
+        for end, dist in distances.items():
+            path = self.hierarchy.find_path(self.my_graph, 0, end)
+            self.assertEqual(0, path[0])
+            self.assertEqual(end, path[-1])
+            for i in range(1, len(path)):
+                self.assertIsNotNone(self.my_graph.get_edge_weight(path[i - 1], path[i]))
+            self.assertAlmostEqual(dist, self.path_cost(path))
+        
+        rng = random.Random(2)
+        vertices = list(self.my_graph.graph)
+        for _ in range(50):
+            start = rng.choice(vertices)
+            end = rng.choice(vertices)
+            expected = dijkstra.Dijkstra().find_path(self.my_graph, start, end)
+            self.assertAlmostEqual(self.path_cost(expected), self.path_cost(self.hierarchy.find_path(None, start, end)))
+    
+    def test_grid_graph(self):
+        my_graph = graph.GridGraph(10)
+        for y in range(8):
+            my_graph.set_blocked((5, y))
+        hierarchy = contraction.ContractionHierarchy(my_graph)
+        path = hierarchy.find_path(my_graph, (0, 0), (9, 0))
+        expected = astar.OneDirectionalAStar().find_path(my_graph, (0, 0), (9, 0), euclidean_heuristic)
+        total = sum(my_graph.get_edge_weight(path[i - 1], path[i]) for i in range(1, len(path)))
+        expected_total = sum(my_graph.get_edge_weight(expected[i - 1], expected[i]) for i in range(1, len(expected)))
+        self.assertAlmostEqual(expected_total, total)
+    
+    def test_edge_cases(self):
+        self.assertEqual([5], self.hierarchy.find_path(self.my_graph, 5, 5))
+        self.assertIsNone(self.hierarchy.find_path(self.my_graph, 5, 'not in graph'))
+        
+        self.my_graph.add_edge('a', 'b', 1)
+        hierarchy = contraction.ContractionHierarchy(self.my_graph)
+        self.assertEqual(['a', 'b'], hierarchy.find_path(self.my_graph, 'a', 'b'))
+        self.assertIsNone(hierarchy.find_path(self.my_graph, 0, 'a'))
+    
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'hierarchy.bin')
+            self.hierarchy.save(path)
+            loaded = contraction.ContractionHierarchy.load(path)
+            try:
+                self.assertIsInstance(loaded.targets, memoryview)
+                self.assertEqual(list(self.hierarchy.targets), list(loaded.targets))
+                self.assertEqual(list(self.hierarchy.weights), list(loaded.weights))
+                for end in (17, 80, 143):
+                    self.assertEqual(self.hierarchy.find_path(None, 0, end), loaded.find_path(None, 0, end))
+                
+                copied = pickle.loads(pickle.dumps(loaded))
+                self.assertEqual(self.hierarchy.find_path(None, 3, 99), copied.find_path(None, 3, 99))
+            finally:
+                loaded.close()
+            
+            with open(path, 'wb') as out:
+                out.write(b'not a hierarchy' * 10)
+            self.assertRaises(ValueError, contraction.ContractionHierarchy.load, path)
+
+class TestContractionHierarchyBenchmark(unittest.TestCase):
+    # Compares queries on a contraction hierarchy with bidirectional
+    # A* (without a heuristic, as road networks have none) on the same
+    # random pairs, after building the hierarchy once. The times are
+    # printed rather than compared, as they depend on the machine's load.
+    size = 40
+    queries = 100
+    
+    def test_road_network(self):
+        my_graph = road_graph(self.size, 11)
+        started_at = time.time()
+        hierarchy = contraction.ContractionHierarchy(my_graph)
+        build_time = time.time() - started_at
+        
+        rng = random.Random(4)
+        vertices = list(my_graph.graph)
+        pairs = []
+        while len(pairs) < self.queries:
+            start = rng.choice(vertices)
+            end = rng.choice(vertices)
+            if start != end:
+                pairs.append((start, end))
+        
+        results = []
+        for find_path in (lambda start, end: astar.BiDirectionalAStar().find_path(my_graph, start, end, zero_heuristic),
+                          lambda start, end: hierarchy.find_path(my_graph, start, end)):
+            started_at = time.time()
+            paths = [find_path(start, end) for start, end in pairs]
+            results.append((time.time() - started_at, paths))
+        
+        (astar_time, astar_paths), (hierarchy_time, hierarchy_paths) = results
+        # bidirectional A* stops at the first vertex both sides reach,
+        # which isn't always optimal, so compare costs with Dijkstra
+        for (start, end), hierarchy_path in zip(pairs, hierarchy_paths):
+            expected = dijkstra.Dijkstra().find_path(my_graph, start, end)
+            self.assertEqual(expected is None, hierarchy_path is None)
+            if expected is not None:
+                expected_cost = sum(my_graph.get_edge_weight(expected[i - 1], expected[i]) for i in range(1, len(expected)))
+                hierarchy_cost = sum(my_graph.get_edge_weight(hierarchy_path[i - 1], hierarchy_path[i]) for i in range(1, len(hierarchy_path)))
+                self.assertAlmostEqual(expected_cost, hierarchy_cost)
+        
+        print('{} vertices: build {}s ({} upward edges), {} queries: bidirectional A* {}s, hierarchy {}s'.format(
+            len(vertices), round(build_time, 4), len(hierarchy.targets), self.queries,
+            round(astar_time, 4), round(hierarchy_time, 4)))
+
+class TestFlowField(unittest.TestCase):
+    def setUp(self):
+        self.my_graph = graph.GridGraph(20)
+        for y in range(0, 18):
+            self.my_graph.set_blocked((7, y))
+        self.goal = (19, 0)
+        self.field = flow_field.FlowField(self.my_graph, self.goal)
+    
+    def test_grid_graph(self):
+        self.assertIsInstance(self.field.steps, bytearray)
+        self.assertEqual(400, len(self.field.steps))
+        self.assertIsNone(self.field.next_step(self.goal))
+        self.assertIsNone(self.field.next_step((7, 0)))
+        self.assertIsNone(self.field.next_step((-1, 0)))
+        self.assertEqual(0, self.field.distance(self.goal))
+        
+        for start in ((0, 0), (6, 10), (19, 19)):
+            path = self.field.path(start)
+            expected = dijkstra.Dijkstra().find_path(self.my_graph, start, self.goal)
+            self.assertEqual(start, path[0])
+            self.assertEqual(self.goal, path[-1])
+            cost = sum(self.my_graph.get_edge_weight(path[i - 1], path[i]) for i in range(1, len(path)))
+            expected_cost = sum(self.my_graph.get_edge_weight(expected[i - 1], expected[i]) for i in range(1, len(expected)))
+            self.assertAlmostEqual(expected_cost, cost)
+            self.assertAlmostEqual(cost, self.field.distance(start))
+    
+    def test_find_path_rebuilds(self):
+        self.assertIsNotNone(self.field.find_path(self.my_graph, (0, 0), self.goal))
+        self.my_graph.set_blocked((7, 18))
+        self.my_graph.set_blocked((7, 19))
+        self.assertIsNone(self.field.find_path(self.my_graph, (0, 0), self.goal))
+        self.assertEqual(float('inf'), self.field.distance((0, 0)))
+        self.assertRaises(ValueError, self.field.find_path, self.my_graph, (0, 0), (0, 1))
+    
+    def test_weighted_undirected_graph(self):
+        my_graph = road_graph(10, 5)
+        field = flow_field.FlowField(my_graph, 0)
+        distances, _ = dijkstra.Dijkstra().shortest_path_tree(my_graph, 0)
+        for vertex, dist in distances.items():
+            path = field.path(vertex)
+            self.assertEqual(0, path[-1])
+            self.assertEqual(dist, sum(my_graph.get_edge_weight(path[i - 1], path[i]) for i in range(1, len(path))))
+        self.assertIsNone(field.next_step('not in graph'))
+        self.assertIsNone(flow_field.FlowField(my_graph, 'not in graph').path(0))
+
+class TestFlowFieldBenchmark(unittest.TestCase):
+    # Compares one A* search per agent with one flow field shared by
+    # every agent heading to the same goal. The times are printed; the
+    # assert is on the vertices expanded, as the times depend on the
+    # machine's load.
+    size = 100
+    agents = 20
+    
+    def test_many_agents(self):
+        my_graph = graph.GridGraph(self.size)
+        for i in range(1, 5):
+            x = i * self.size // 5
+            gap = (i * 37) % self.size
+            for y in range(self.size):
+                if abs(y - gap) > 2:
+                    my_graph.set_blocked((x, y))
+        goal = (self.size - 1, self.size // 2)
+        rng = random.Random(6)
+        starts = []
+        while len(starts) < self.agents:
+            start = (rng.randrange(self.size // 5), rng.randrange(self.size))
+            if start in my_graph.graph:
+                starts.append(start)
+        
+        counting_graph = CountingGraph(my_graph)
+        started_at = time.time()
+        astar_paths = [astar.OneDirectionalAStar().find_path(counting_graph, start, goal, euclidean_heuristic) for start in starts]
+        astar_time = time.time() - started_at
+        
+        started_at = time.time()
+        field = flow_field.FlowField(my_graph, goal)
+        build_time = time.time() - started_at
+        started_at = time.time()
+        field_paths = [field.path(start) for start in starts]
+        follow_time = time.time() - started_at
+        
+        for astar_path, field_path in zip(astar_paths, field_paths):
+            astar_cost = sum(my_graph.get_edge_weight(astar_path[i - 1], astar_path[i]) for i in range(1, len(astar_path)))
+            field_cost = sum(my_graph.get_edge_weight(field_path[i - 1], field_path[i]) for i in range(1, len(field_path)))
+            self.assertAlmostEqual(astar_cost, field_cost)
+        
+        # the field's Dijkstra search expands every vertex that can reach the goal once
+        field_expanded = sum(1 for distance in field.distances if distance != flow_field.INFINITY)
+        print('{} agents on {}x{}: A* per agent {}s ({} expanded), flow field build {}s ({} expanded) + follow {}s'.format(
+            self.agents, self.size, self.size, round(astar_time, 4), counting_graph.expanded,
+            round(build_time, 4), field_expanded, round(follow_time, 4)))
+        self.assertLess(field_expanded * 10, counting_graph.expanded)
+
+class TestCSRGraphPathfinding(unittest.TestCase):
+    def setUp(self):
+        self.my_graph = road_graph(12, 8)
+        self.csr = graph.CSRGraph.from_graph(self.my_graph)
+    
+    def path_cost(self, path):
+        return sum(self.my_graph.get_edge_weight(path[i - 1], path[i]) for i in range(1, len(path)))
+    
+    def test_pathfinders(self):
+        expected = self.path_cost(dijkstra.Dijkstra().find_path(self.my_graph, 0, 143))
+        paths = [
+            dijkstra.Dijkstra().find_path(self.csr, 0, 143),
+            astar.OneDirectionalAStar().find_path(self.csr, 0, 143, zero_heuristic),
+            dstar_lite.DStarLite().find_path(self.csr, 0, 143, zero_heuristic),
+            contraction.ContractionHierarchy(self.csr).find_path(self.csr, 0, 143),
+            flow_field.FlowField(self.csr, 143).path(0),
+            astar.OneDirectionalAStar().find_path(self.csr, 0, 143, landmarks.LandmarkHeuristic(self.csr, 2)),
+            path_cache.PathCache(dijkstra.Dijkstra()).find_path(self.csr, 0, 143)
+        ]
+        for path in paths:
+            self.assertEqual(0, path[0])
+            self.assertEqual(143, path[-1])
+            self.assertAlmostEqual(expected, self.path_cost(path))
+    
+    def test_grid(self):
+        my_graph = graph.GridGraph(10)
+        for y in range(8):
+            my_graph.set_blocked((5, y))
+        csr = graph.CSRGraph.from_graph(my_graph)
+        self.assertEqual(len(my_graph.graph), len(csr))
+        expected = astar.OneDirectionalAStar().find_path(my_graph, (0, 0), (9, 0), euclidean_heuristic)
+        for path in (astar.OneDirectionalAStar().find_path(csr, (0, 0), (9, 0), euclidean_heuristic),
+                     jps.JumpPointSearch().find_path(csr, (0, 0), (9, 0), euclidean_heuristic)):
+            self.assertAlmostEqual(
+                sum(my_graph.get_edge_weight(expected[i - 1], expected[i]) for i in range(1, len(expected))),
+                sum(csr.get_edge_weight(path[i - 1], path[i]) for i in range(1, len(path))))
+
+class TestCSRGraphBenchmark(unittest.TestCase):
+    # Compares the memory used by a road network as a
+    # WeightedUndirectedGraph and as a CSRGraph, and Dijkstra
+    # over every vertex on each.
+    size = 60
+    
+    def test_memory_and_dijkstra(self):
+        tracemalloc.start()
+        my_graph = road_graph(self.size, 9)
+        dict_size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        
+        tracemalloc.start()
+        csr = graph.CSRGraph.from_graph(my_graph)
+        csr_size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        
+        results = []
+        for graph_to_search in (my_graph, csr):
+            started_at = time.time()
+            distances, _ = dijkstra.Dijkstra().shortest_path_tree(graph_to_search, 0)
+            results.append((time.time() - started_at, distances))
+        (dict_time, dict_distances), (csr_time, csr_distances) = results
+        self.assertEqual(dict_distances, csr_distances)
+        
+        print('{} vertices, {} edges: WeightedUndirectedGraph {}KiB, Dijkstra {}s; CSRGraph {}KiB, Dijkstra {}s'.format(
+            len(csr), len(csr.targets) // 2, dict_size // 1024, round(dict_time, 4),
+            csr_size // 1024, round(csr_time, 4)))
+        self.assertLess(csr_size * 2, dict_size)
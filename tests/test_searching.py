@@ -1,3 +1,7 @@
+import itertools
+import os
+import random
+import time
 import unittest
 
 from pygorithm.searching import (
@@ -8,6 +12,7 @@ from pygorithm.searching import (
     exponential_search,
     interpolation_search,
     ternary_search)
+from pygorithm.data_structures import graph
 
 
 class TestSearchingAlgorithm(unittest.TestCase):
@@ -60,6 +65,30 @@ class TestBFSSearch(unittest.TestCase):
         result = breadth_first_search.search(self.graph, 'G')
         self.assertEqual(result, {'G', 'C', 'A', 'B', 'D', 'F', 'E'})
 
+    def test_bfs_csr_graph(self):
+        csr = graph.CSRGraph.from_graph({'A': ['B', 'C'], 'B': ['D'], 'C': [], 'E': ['A']})
+        self.assertEqual({'A', 'B', 'C', 'D'}, breadth_first_search.search(csr.graph, 'A'))
+
+    def test_search_tree_and_levels(self):
+        self.graph = {
+            'A': ['B', 'C'],
+            'B': ['A', 'D'],
+            'C': ['A', 'D'],
+            'D': ['B', 'C', 'E'],
+            'E': ['D'],
+            'F': ['A']
+        }
+        distances, parents = breadth_first_search.search_tree(self.graph, 'A')
+        self.assertEqual({'A': 0, 'B': 1, 'C': 1, 'D': 2, 'E': 3}, distances)
+        self.assertEqual({'A': None, 'B': 'A', 'C': 'A', 'D': 'B', 'E': 'D'}, parents)
+        self.assertEqual([['A'], ['B', 'C'], ['D'], ['E']], breadth_first_search.levels(self.graph, 'A'))
+        self.assertEqual(['A', 'B', 'C', 'D', 'E'], list(breadth_first_search.traverse(self.graph, 'A')))
+
+        csr = graph.CSRGraph.from_graph(self.graph)
+        distances, parents = breadth_first_search.frontier_search(csr, 'A')
+        self.assertEqual([0, 1, 1, 2, 3, -1], list(distances))
+        self.assertEqual([-1, 0, 0, 1, 3, -1], list(parents))
+
 
 class TestDFSSearch(unittest.TestCase):
     def test_dfs(self):
@@ -77,6 +106,122 @@ class TestDFSSearch(unittest.TestCase):
         result = depth_first_search.search(self.graph, 'G')
         self.assertEqual(result, ['G', 'C', 'A', 'B', 'D', 'F', 'E'])
 
+    def test_dfs_csr_graph(self):
+        csr = graph.CSRGraph.from_graph({
+            'A': ['B', 'C', 'E'],
+            'B': ['A', 'D', 'F'],
+            'C': ['A', 'G'],
+            'D': ['B'],
+            'F': ['B'],
+            'E': ['A'],
+            'G': ['C']
+        })
+        result = depth_first_search.search(csr.graph, 'A')
+        self.assertEqual(result, ['A', 'B', 'D', 'F', 'C', 'G', 'E'])
+
+    def test_dfs_deep(self):
+        deep_graph = dict((vertex, [vertex + 1]) for vertex in range(100000))
+        deep_graph[100000] = [0]
+        result = depth_first_search.search(deep_graph, 0)
+        self.assertEqual(list(range(100001)), result)
+
+    def test_dfs_path(self):
+        self.graph = {
+            'A': ['B', 'C'],
+            'B': ['A', 'D'],
+            'C': ['A'],
+            'D': ['B']
+        }
+        self.assertEqual(['C', 'A', 'B', 'D'], depth_first_search.search(self.graph, 'A', ['C']))
+        # the default path isn't shared between calls
+        self.assertEqual(['A', 'B', 'D', 'C'], depth_first_search.search(self.graph, 'A'))
+        self.assertEqual(['A', 'B', 'D', 'C'], depth_first_search.search(self.graph, 'A'))
+
+    def test_traverse(self):
+        self.graph = {
+            'A': ['B', 'C'],
+            'B': ['D'],
+            'C': None
+        }
+        self.assertEqual(['A', 'B', 'D', 'C'], list(depth_first_search.traverse(self.graph, 'A')))
+        self.assertEqual(['Z'], list(depth_first_search.traverse(self.graph, 'Z')))
+
+        # lazy: only the visited part of an endless graph is generated
+        class Endless(object):
+            def __contains__(self, vertex):
+                return True
+
+            def __getitem__(self, vertex):
+                return [vertex + 1]
+
+        self.assertEqual([0, 1, 2], list(itertools.islice(depth_first_search.traverse(Endless(), 0), 3)))
+
+
+class TestBFSBenchmark(unittest.TestCase):
+    # Compares breadth first search over every reachable vertex of
+    # random graphs: the list.pop(0) and set difference search this
+    # module used to have, the deque based search_tree on a dict of
+    # lists, and frontier_search on the same graph as a CSRGraph. The
+    # 100,000 and 1,000,000 edge runs take seconds, so they only run
+    # with PYGORITHM_LARGE_BENCHMARKS set.
+    def random_edges(self, edge_count):
+        rng = random.Random(edge_count)
+        vertex_count = edge_count // 4
+        # a path through every vertex makes them all reachable
+        edges = [(rng.randrange(v), v) for v in range(1, vertex_count)]
+        while len(edges) < edge_count:
+            edges.append((rng.randrange(vertex_count), rng.randrange(vertex_count)))
+        return vertex_count, edges
+
+    @staticmethod
+    def list_search(graph_sets, start_vertex):
+        visited, queue = set(), [start_vertex]
+        while queue:
+            vertex = queue.pop(0)
+            if vertex not in visited:
+                visited.add(vertex)
+                queue.extend(graph_sets[vertex] - visited)
+        return visited
+
+    def compare(self, edge_count, with_list_search):
+        vertex_count, edges = self.random_edges(edge_count)
+        adjacency = dict((v, []) for v in range(vertex_count))
+        for u, v in edges:
+            adjacency[u].append(v)
+            adjacency[v].append(u)
+        csr = graph.CSRGraph.from_edges(edges, False, range(vertex_count))
+
+        timings = []
+        if with_list_search:
+            graph_sets = dict((v, set(neighbors)) for v, neighbors in adjacency.items())
+            started_at = time.time()
+            reached = self.list_search(graph_sets, 0)
+            timings.append('list.pop(0) {}s'.format(round(time.time() - started_at, 4)))
+            self.assertEqual(vertex_count, len(reached))
+
+        started_at = time.time()
+        distances, _ = breadth_first_search.search_tree(adjacency, 0)
+        timings.append('deque {}s'.format(round(time.time() - started_at, 4)))
+
+        started_at = time.time()
+        frontier_distances, _ = breadth_first_search.frontier_search(csr, 0)
+        timings.append('frontier on CSRGraph {}s'.format(round(time.time() - started_at, 4)))
+
+        self.assertEqual([distances[v] for v in range(vertex_count)], list(frontier_distances))
+        print('{} vertices, {} edges: {}'.format(vertex_count, edge_count, ', '.join(timings)))
+
+    def test_10k_edges(self):
+        self.compare(10000, True)
+
+    @unittest.skipUnless(os.environ.get('PYGORITHM_LARGE_BENCHMARKS'), 'set PYGORITHM_LARGE_BENCHMARKS to run')
+    def test_100k_edges(self):
+        self.compare(100000, True)
+
+    @unittest.skipUnless(os.environ.get('PYGORITHM_LARGE_BENCHMARKS'), 'set PYGORITHM_LARGE_BENCHMARKS to run')
+    def test_1m_edges(self):
+        self.compare(1000000, False)
+
+
 class TestExponentialSearch(TestSearchingAlgorithm):
     def test_exponential_search(self):
         self.assertEqual(exponential_search.search(self.array, 7), 7)